@@ -0,0 +1,404 @@
+"""
+Application Automator Module - Submits tailored resumes through job-board application forms
+
+A fixed pool of warm headless browser contexts (Playwright) is shared by every
+submission, so a job costs one navigation rather than one browser launch.
+Images, fonts, media and analytics are blocked at the network layer. The
+first visit to a site discovers which form field is which; that mapping is
+cached (optionally on disk) and reused for every later application to the
+same site.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, Any, List, Iterable, AsyncIterator
+from urllib.parse import urlsplit
+
+from metrics import MetricsRegistry, default_registry
+
+logger = logging.getLogger("autoapply.application_automator")
+
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+BLOCKED_HOSTS_RE = re.compile(
+    r"google-analytics|googletagmanager|doubleclick|segment\.(?:io|com)|hotjar|facebook\.net"
+    r"|mixpanel|optimizely|newrelic|nr-data|sentry\.io|fullstory|clarity\.ms"
+)
+
+# Ordered: specific roles before the ones whose patterns would also match them
+FIELD_ROLES = [
+    ('cover_letter', re.compile(r"cover")),
+    ('resume', re.compile(r"resume|r[eé]sum[eé]|\bcv\b|curriculum")),
+    ('first_name', re.compile(r"first.?name|given.?name|\bfname\b|forename")),
+    ('last_name', re.compile(r"last.?name|family.?name|surname|\blname\b")),
+    ('email', re.compile(r"\be.?mail")),
+    ('phone', re.compile(r"phone|mobile|\btel\b|telephone")),
+    ('linkedin', re.compile(r"linkedin")),
+    ('github', re.compile(r"github")),
+    ('website', re.compile(r"website|portfolio|personal.?(?:site|url)")),
+    ('full_name', re.compile(r"full.?name|\bname\b")),
+]
+
+AUTOCOMPLETE_ROLES = {'given-name': 'first_name', 'family-name': 'last_name', 'name': 'full_name',
+                      'email': 'email', 'tel': 'phone', 'url': 'website'}
+
+# Roles a form must expose before we submit anything
+REQUIRED_ROLES = ('email', 'resume')
+
+_ID_SEGMENT_RE = re.compile(r"/(?:\d+|[0-9a-f]{8,}|[0-9a-f-]{36})(?=/|$)", re.IGNORECASE)
+
+DISCOVER_FORM_JS = """
+() => {
+  const selectorFor = (el) => {
+    if (el.id && document.querySelectorAll('#' + CSS.escape(el.id)).length === 1) return '#' + CSS.escape(el.id);
+    if (el.name) {
+      const byName = `${el.tagName.toLowerCase()}[name="${el.name.replace(/"/g, '\\\\"')}"]`;
+      if (document.querySelectorAll(byName).length === 1) return byName;
+    }
+    const parts = [];
+    for (let node = el; node && node.nodeType === 1 && node !== document.body; node = node.parentElement) {
+      let index = 1;
+      for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+        if (sib.tagName === node.tagName) index++;
+      }
+      parts.unshift(`${node.tagName.toLowerCase()}:nth-of-type(${index})`);
+    }
+    return 'body > ' + parts.join(' > ');
+  };
+  const labelFor = (el) => {
+    if (el.labels && el.labels.length) return el.labels[0].innerText;
+    const wrapper = el.closest('label');
+    return el.getAttribute('aria-label') || (wrapper ? wrapper.innerText : '');
+  };
+  const skip = ['hidden', 'submit', 'button', 'image', 'reset', 'checkbox', 'radio'];
+  const fields = [...document.querySelectorAll('input, textarea')]
+    .filter((el) => !skip.includes(el.type))
+    .map((el) => ({
+      selector: selectorFor(el), tag: el.tagName.toLowerCase(), type: el.type || '',
+      name: el.name || '', id: el.id || '', label: labelFor(el), placeholder: el.placeholder || '',
+      autocomplete: el.getAttribute('autocomplete') || '', accept: el.accept || '',
+    }));
+  const submit = document.querySelector('button[type=submit], input[type=submit]')
+    || [...document.querySelectorAll('button, [role=button]')]
+         .find((el) => /submit|apply|send/i.test(el.innerText || el.value || ''));
+  return {fields, submit: submit ? selectorFor(submit) : null};
+}
+"""
+
+CONFIRMATION_JS = """
+() => /thank you|thanks for applying|application (?:was |has been )?(?:received|submitted)/i
+  .test(document.body ? document.body.innerText : '')
+"""
+
+
+class BrowserUnavailableError(RuntimeError):
+    """Playwright or its browser binary is missing, so no context pool can start"""
+
+
+@dataclass
+class Applicant:
+    """The person applying; everything the form mapper knows how to fill"""
+    first_name: str
+    last_name: str
+    email: str
+    phone: str = ""
+    linkedin: str = ""
+    github: str = ""
+    website: str = ""
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}".strip()
+
+    @classmethod
+    def from_file(cls, path: str) -> "Applicant":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def value_for(self, role: str) -> str:
+        return getattr(self, role, "") or ""
+
+
+@dataclass
+class ApplicationRequest:
+    """One form to fill: the posting URL and the compiled resume to attach"""
+    url: str
+    resume_path: str
+    cover_letter_path: Optional[str] = None
+    job_hash: Optional[str] = None
+
+
+@dataclass
+class SubmissionResult:
+    """Outcome of one submission: 'submitted', 'unmapped' (form not understood) or 'failed'"""
+    url: str
+    status: str
+    job_hash: Optional[str] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+    mapping_cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'submitted'
+
+
+@dataclass
+class FormMapping:
+    """Role -> CSS selector for one site's application form"""
+    fields: Dict[str, str] = field(default_factory=dict)
+    submit: Optional[str] = None
+
+    @property
+    def usable(self) -> bool:
+        return self.submit is not None and all(role in self.fields for role in REQUIRED_ROLES)
+
+
+def site_key(url: str) -> str:
+    """Forms are shared per host and path shape: numeric / hex ids in the path are wildcarded"""
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{_ID_SEGMENT_RE.sub('/*', parts.path.rstrip('/'))}"
+
+
+def map_fields(fields: Iterable[Dict[str, str]], submit: Optional[str] = None) -> FormMapping:
+    """
+    Assign form roles to discovered fields using autocomplete hints, input types and
+    the name/id/label/placeholder text. Each role goes to the first field that matches.
+    """
+    mapping = FormMapping(submit=submit)
+    for descriptor in fields:
+        role = _field_role(descriptor)
+        if role is not None and role not in mapping.fields:
+            mapping.fields[role] = descriptor['selector']
+    return mapping
+
+
+def _field_role(descriptor: Dict[str, str]) -> Optional[str]:
+    text = " ".join(descriptor.get(key, '') for key in ('name', 'id', 'label', 'placeholder')).lower()
+    text = text.replace('_', ' ').replace('-', ' ')
+    if descriptor.get('type') == 'file':
+        return 'cover_letter' if FIELD_ROLES[0][1].search(text) else 'resume'
+    autocomplete = descriptor.get('autocomplete', '').lower()
+    if autocomplete in AUTOCOMPLETE_ROLES:
+        return AUTOCOMPLETE_ROLES[autocomplete]
+    if descriptor.get('type') == 'email':
+        return 'email'
+    if descriptor.get('type') == 'tel':
+        return 'phone'
+    for role, pattern in FIELD_ROLES:
+        if role in ('resume', 'cover_letter'):
+            # Text boxes mentioning a resume/cover letter are free-text answers, not uploads
+            continue
+        if pattern.search(text):
+            return role
+    return None
+
+
+class FormMappingCache:
+    """Site key -> FormMapping, optionally persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._mappings: Dict[str, FormMapping] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._mappings = {key: FormMapping(**value) for key, value in json.load(f).items()}
+
+    def get(self, url: str) -> Optional[FormMapping]:
+        return self._mappings.get(site_key(url))
+
+    def put(self, url: str, mapping: FormMapping) -> None:
+        self._mappings[site_key(url)] = mapping
+
+    def forget(self, url: str) -> None:
+        self._mappings.pop(site_key(url), None)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({key: asdict(mapping) for key, mapping in self._mappings.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self._mappings)
+
+
+class BrowserContextPool:
+    """
+    One browser, `size` long-lived contexts (each with a warm page). Contexts are
+    handed out exclusively and returned after use with their cookies cleared.
+    """
+
+    def __init__(self, size: int = 4, headless: bool = True, block_resources: bool = True,
+                 browser_type: str = 'chromium', launch_options: Optional[Dict[str, Any]] = None):
+        self.size = max(1, size)
+        self.headless = headless
+        self.block_resources = block_resources
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {}
+        self.blocked_requests = 0
+        self._playwright = None
+        self._browser = None
+        self._contexts: List[Any] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    async def start(self) -> None:
+        try:
+            from playwright.async_api import async_playwright, Error as PlaywrightError
+        except ImportError as e:
+            raise BrowserUnavailableError(
+                "playwright is not installed (pip install playwright && playwright install chromium)") from e
+        self._playwright = await async_playwright().start()
+        try:
+            launcher = getattr(self._playwright, self.browser_type)
+            try:
+                self._browser = await launcher.launch(headless=self.headless, **self.launch_options)
+            except PlaywrightError as e:
+                # Usually the browser binary was never downloaded (playwright install)
+                raise BrowserUnavailableError(f"{self.browser_type} could not be launched: "
+                                              f"{str(e).splitlines()[0]}") from e
+            for _ in range(self.size):
+                context = await self._browser.new_context()
+                if self.block_resources:
+                    await context.route("**/*", self._route)
+                await context.new_page()
+                self._contexts.append(context)
+                self._idle.put_nowait(context)
+        except Exception:
+            await self.close()
+            raise
+        logger.info(f"🌐 Started {self.size} warm {self.browser_type} context(s)")
+
+    async def _route(self, route, request) -> None:
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_HOSTS_RE.search(urlsplit(request.url).netloc):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Borrow a context's warm page; waits while every context is busy"""
+        context = await self._idle.get()
+        try:
+            pages = [page for page in context.pages if not page.is_closed()]
+            yield pages[0] if pages else await context.new_page()
+        finally:
+            try:
+                await context.clear_cookies()
+            finally:
+                self._idle.put_nowait(context)
+
+    async def close(self) -> None:
+        for context in self._contexts:
+            await context.close()
+        self._contexts.clear()
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+class ApplicationAutomator:
+    """Fills and submits application forms in parallel over a BrowserContextPool"""
+
+    def __init__(self, applicant: Applicant, pool_size: int = 4, mapping_cache: Optional[str] = None,
+                 timeout: float = 30.0, headless: bool = True, block_resources: bool = True,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.applicant = applicant
+        self.pool = BrowserContextPool(pool_size, headless=headless, block_resources=block_resources)
+        self.mappings = FormMappingCache(mapping_cache)
+        self.timeout_ms = timeout * 1000
+        self.metrics = metrics or default_registry()
+
+    async def __aenter__(self) -> "ApplicationAutomator":
+        await self.start()
+        return self
+
+    async def start(self) -> None:
+        await self.pool.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self.mappings.save()
+        await self.pool.close()
+
+    async def _discover(self, page, url: str) -> FormMapping:
+        form = await page.evaluate(DISCOVER_FORM_JS)
+        mapping = map_fields(form['fields'], form['submit'])
+        if mapping.usable:
+            self.mappings.put(url, mapping)
+            logger.info(f"🗺️ Mapped form for {site_key(url)}: {sorted(mapping.fields)}")
+        return mapping
+
+    async def _fill(self, page, mapping: FormMapping, request: ApplicationRequest) -> None:
+        files = {'resume': request.resume_path, 'cover_letter': request.cover_letter_path}
+        for role, selector in mapping.fields.items():
+            if role in files:
+                if files[role]:
+                    await page.set_input_files(selector, files[role], timeout=self.timeout_ms)
+                continue
+            value = self.applicant.full_name if role == 'full_name' else self.applicant.value_for(role)
+            if value:
+                await page.fill(selector, value, timeout=self.timeout_ms)
+
+    async def submit(self, request: ApplicationRequest) -> SubmissionResult:
+        """Open the posting, fill the form (cached mapping first), submit and wait for a confirmation"""
+        start = time.perf_counter()
+        result = SubmissionResult(request.url, 'failed', request.job_hash)
+        with self.metrics.span('application_submit') as span:
+            async with self.pool.page() as page:
+                try:
+                    await page.goto(request.url, wait_until='domcontentloaded', timeout=self.timeout_ms)
+                    mapping = self.mappings.get(request.url)
+                    result.mapping_cached = mapping is not None
+                    if mapping is not None:
+                        try:
+                            await self._fill(page, mapping, request)
+                        except Exception as e:
+                            # The site changed its form; learn it again
+                            logger.warning(f"⚠️ Cached form mapping for {site_key(request.url)} failed ({e}); remapping")
+                            self.mappings.forget(request.url)
+                            mapping = None
+                            result.mapping_cached = False
+                    if mapping is None:
+                        mapping = await self._discover(page, request.url)
+                        if not mapping.usable:
+                            result.status = 'unmapped'
+                            result.error = f"form lacks {[r for r in REQUIRED_ROLES if r not in mapping.fields]} or a submit button"
+                            return result
+                        await self._fill(page, mapping, request)
+                    await page.click(mapping.submit, timeout=self.timeout_ms)
+                    await page.wait_for_load_state('domcontentloaded', timeout=self.timeout_ms)
+                    await page.wait_for_function(CONFIRMATION_JS, timeout=self.timeout_ms)
+                    result.status = 'submitted'
+                except Exception as e:
+                    result.error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    logger.error(f"❌ Application to {request.url} failed: {result.error}")
+                finally:
+                    result.duration = time.perf_counter() - start
+                    span['outcome'] = result.status
+                    self.metrics.inc('applications_total', status=result.status,
+                                     mapping='cached' if result.mapping_cached else 'discovered')
+        return result
+
+    async def submit_many(self, requests: Iterable[ApplicationRequest]) -> AsyncIterator[SubmissionResult]:
+        """Submit with one worker per pooled context; results are yielded in completion order"""
+        pending = [asyncio.ensure_future(self.submit(request)) for request in requests]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for task in pending:
+                task.cancel()
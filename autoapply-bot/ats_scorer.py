@@ -0,0 +1,113 @@
+"""
+ATS Scorer Module - Local keyword/BM25 match scoring between a resume and job postings
+
+Postings are scanned with the technology taxonomy into one term-count matrix and
+scored against the resume's technology inventory in a handful of NumPy
+operations, so a few thousand postings can be ranked and thresholded before any
+Gemini quota is spent. The same term space scores generated resume variants
+against a single posting.
+"""
+
+import logging
+from typing import Optional, Dict, List, Iterable, Sequence
+
+import numpy as np
+
+from tech_extractor import TechTaxonomy, default_taxonomy
+
+logger = logging.getLogger("autoapply.ats_scorer")
+
+
+class MatchScorer:
+    """
+    Scores how well a fixed resume covers job postings.
+
+    score = keyword_weight * coverage + (1 - keyword_weight) * bm25_share, where
+    coverage is the fraction of a posting's technologies the resume has and
+    bm25_share is the fraction of the posting's BM25 mass (idf over the scored
+    batch) that falls on those technologies. Both parts, and the score, are in [0, 1].
+    """
+
+    def __init__(self, resume_terms: Iterable[str], taxonomy: Optional[TechTaxonomy] = None,
+                 k1: float = 1.5, b: float = 0.75, keyword_weight: float = 0.5):
+        self.taxonomy = taxonomy or default_taxonomy()
+        self.vocabulary = self.taxonomy.terms
+        self._index = {term: column for column, term in enumerate(self.vocabulary)}
+        self.k1 = k1
+        self.b = b
+        self.keyword_weight = keyword_weight
+        self.resume_terms = [term for term in resume_terms if term in self._index]
+        self.resume_vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        self.resume_vector[[self._index[term] for term in self.resume_terms]] = 1.0
+
+    @classmethod
+    def from_resume(cls, resume: str, taxonomy: Optional[TechTaxonomy] = None, **options) -> "MatchScorer":
+        taxonomy = taxonomy or default_taxonomy()
+        return cls(taxonomy.scan(resume), taxonomy, **options)
+
+    def term_counts(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), vocabulary) matrix of taxonomy term counts"""
+        counts = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            for term, match in self.taxonomy.scan(text).items():
+                rows.append(row)
+                columns.append(self._index[term])
+                values.append(match.count)
+        counts[rows, columns] = values
+        return counts
+
+    def score_postings(self, descriptions: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Vectorized scores for a batch: {'score', 'coverage', 'bm25', 'bm25_share'} arrays"""
+        if not descriptions:
+            empty = np.zeros(0, dtype=np.float32)
+            return {'score': empty, 'coverage': empty, 'bm25': empty, 'bm25_share': empty}
+        tf = self.term_counts(descriptions)
+        present = tf > 0
+        n_terms = present.sum(axis=1)
+        coverage = (present @ self.resume_vector) / np.maximum(n_terms, 1)
+
+        df = present.sum(axis=0)
+        idf = np.log1p((len(descriptions) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        lengths = np.fromiter((len(text.split()) for text in descriptions), dtype=np.float32,
+                              count=len(descriptions))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(float(lengths.mean()), 1.0))
+        weights = tf * (self.k1 + 1) / (tf + norm[:, None]) * idf
+        bm25 = weights @ self.resume_vector
+        bm25_share = bm25 / np.maximum(weights.sum(axis=1), 1e-9)
+
+        score = self.keyword_weight * coverage + (1 - self.keyword_weight) * bm25_share
+        return {'score': score, 'coverage': coverage, 'bm25': bm25, 'bm25_share': bm25_share}
+
+    def score_variants(self, job_description: str, variants: Sequence[str]) -> np.ndarray:
+        """
+        Score resume variants against one posting: the mean of plain and
+        count-weighted coverage of the posting's technologies by each variant.
+        """
+        if not variants:
+            return np.zeros(0, dtype=np.float32)
+        job = self.term_counts([job_description])[0]
+        present = self.term_counts(variants) > 0
+        if not job.any():
+            return np.zeros(len(variants), dtype=np.float32)
+        plain = (present @ (job > 0)) / np.count_nonzero(job)
+        weighted = (present @ job) / job.sum()
+        return (plain + weighted) / 2
+
+    def explain(self, description: str) -> Dict[str, List[str]]:
+        """Which of a posting's technologies the resume has and which it lacks"""
+        found = self.taxonomy.scan(description)
+        have = set(self.resume_terms)
+        return {'matched': [term for term in found if term in have],
+                'missing': [term for term in found if term not in have]}
+
+
+def select_top(scores: np.ndarray, min_score: Optional[float] = None, top_k: Optional[int] = None) -> List[int]:
+    """Indices passing min_score, best first, capped at top_k"""
+    candidates = np.arange(len(scores))
+    if min_score is not None:
+        candidates = candidates[scores >= min_score]
+    if top_k is not None and top_k < len(candidates):
+        # argpartition keeps selection linear; only the survivors get sorted
+        candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+    return candidates[np.argsort(-scores[candidates], kind='stable')].tolist()
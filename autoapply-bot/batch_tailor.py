@@ -0,0 +1,265 @@
+"""
+Batch Tailor - Tailor resumes for many job descriptions read from JSONL (file or stdin)
+
+Each input line is either a JSON object with "job_description" (plus optional "id",
+"company_info" and "profile") or a bare JSON string. With --templates, "profile" picks
+`<profile>.tex` from that directory; jobs without one use the built-in template. Results are written as JSONL in the
+order they finish.
+
+Each result carries a "guard" report: the local check of the output against the
+template's dates, company names, titles, heading and section structure, and which
+sections were restored, repaired with a small follow-up request, or reverted.
+--no-guard turns the check off.
+
+With --journal, every finished job is checkpointed; rerunning the same command
+skips jobs that already succeeded and retries only fallbacks and errors.
+
+--metrics / --metrics-json export latency histograms, token usage and
+retry/fallback counters at the end of the run; --profile writes cProfile stats
+(the run is also safe to attach py-spy to).
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Dict, Any, List, TextIO
+
+from checkpoint import CheckpointJournal, job_key
+from database import content_hash
+from gemini_client import GeminiClient, DEFAULT_API_URL, api_url_for
+from latex_compiler import LatexCompilerPool
+from metrics import default_registry, json_log_listener
+from prompt_builder import PromptBuilder
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from resume_optimizer import ResumeOptimizer
+from template_registry import TemplateRegistry
+
+logger = logging.getLogger("autoapply.batch_tailor")
+
+
+def read_jobs(stream: TextIO) -> List[Dict[str, Any]]:
+    """
+    Parse JSONL job descriptions, skipping blank or malformed lines. Ids default to
+    the line number; an id that is not a string or integer, or that an earlier line
+    already used, skips its line.
+    """
+    jobs = []
+    seen_ids = set()
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ Skipping line {line_number}: {e}")
+            continue
+        if isinstance(record, str):
+            record = {'job_description': record}
+        if not isinstance(record, dict):
+            logger.error(f"❌ Skipping line {line_number}: expected an object or a string, "
+                         f"got {type(record).__name__}")
+            continue
+        if not record.get('job_description'):
+            logger.error(f"❌ Skipping line {line_number}: missing job_description")
+            continue
+        record.setdefault('id', line_number)
+        job_id = record['id']
+        if not isinstance(job_id, (str, int)) or isinstance(job_id, bool):
+            logger.error(f"❌ Skipping line {line_number}: id must be a string or an integer")
+            continue
+        if job_id in seen_ids:
+            logger.error(f"❌ Skipping line {line_number}: duplicate id {job_id!r}")
+            continue
+        seen_ids.add(job_id)
+        jobs.append(record)
+    return jobs
+
+
+async def run_batch(jobs: List[Dict[str, Any]], api_key: str, output: TextIO,
+                    workers: int, requests_per_minute: int, tokens_per_minute: int,
+                    max_retries: int, cache: Optional[ResponseCache] = None,
+                    sections_only: bool = False, token_budget: Optional[int] = 6000,
+                    compiler: Optional[LatexCompilerPool] = None, compile_dir: Optional[Path] = None,
+                    journal: Optional[CheckpointJournal] = None, min_score: Optional[float] = None,
+                    top_k: Optional[int] = None, base_url: Optional[str] = None,
+                    templates: Optional[TemplateRegistry] = None, enforce_invariants: bool = True) -> int:
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    api_url = api_url_for(base_url) if base_url else DEFAULT_API_URL
+    client = GeminiClient(api_key, api_url, rate_limiter=limiter, max_retries=max_retries, pool_size=workers,
+                          cache=cache)
+    optimizer = ResumeOptimizer(api_key, client=client, prompt_builder=PromptBuilder(token_budget),
+                                templates=templates)
+    optimizer.enforce_invariants = enforce_invariants
+    written = 0
+    unknown = [job for job in jobs if job.get('profile') is not None and job['profile'] not in optimizer.templates]
+    for job in unknown:
+        logger.error(f"❌ Skipping job {job['id']}: unknown template profile {job['profile']!r}")
+    if unknown:
+        jobs = [job for job in jobs if job.get('profile') is None or job['profile'] in optimizer.templates]
+    if min_score is not None or top_k is not None:
+        # Skip weak matches before they cost any Gemini quota; each profile is scored
+        # against its own template, then the best are taken across all of them
+        by_profile: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for job in jobs:
+            by_profile.setdefault(job.get('profile'), []).append(job)
+        jobs = [selected for profile, group in by_profile.items()
+                for selected in optimizer.select_jobs(group, min_score, None, profile=profile)]
+        jobs.sort(key=lambda job: -job['match_score'])
+        jobs = jobs[:top_k] if top_k is not None else jobs
+
+    # Checkpoint keys by input position: ids are caller data and may collide
+    keys: List[Optional[str]] = [None] * len(jobs)
+    remaining = list(range(len(jobs)))
+    if journal is not None:
+        settings = {'model': client.api_url, 'sections': sections_only, 'token_budget': token_budget,
+                    'guard': enforce_invariants}
+        base_template = content_hash(optimizer.base_resume_template)
+
+        def template_marker(profile: Optional[str]) -> Any:
+            # Profiles are keyed by (name, mtime, size) so checking the journal reads no templates
+            return base_template if profile is None else [profile, *optimizer.templates.fingerprint(profile)]
+
+        keys = [job_key(job, {**settings, 'template': template_marker(job.get('profile'))}) for job in jobs]
+        remaining = [position for position, key in enumerate(keys) if not journal.is_complete(key)]
+        logger.info(f"📒 Resuming: {len(jobs) - len(remaining)} done, {len(remaining)} to go")
+    # tailor_batch reports each result under its job's id; the position stands in for it
+    # until the result is written, so every result finds its own job and checkpoint key
+    pending = [{**jobs[position], 'id': position} for position in remaining]
+
+    def emit(result: Dict[str, Any], position: int) -> None:
+        nonlocal written
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        written += 1
+        # Checkpoint only after the result is safely in the output
+        if journal is not None:
+            journal.record(keys[position], result['status'], result['id'], result.get('error'))
+
+    async def compile_and_emit(result: Dict[str, Any], position: int) -> None:
+        compiled = await compiler.compile(result['content'])
+        result['compiled'] = compiled.ok
+        result['pages'] = compiled.pages
+        result['compile_errors'] = compiled.errors
+        if compiled.pdf is not None and compile_dir is not None:
+            pdf_path = compile_dir / f"{result['id']}.pdf"
+            pdf_path.write_bytes(compiled.pdf)
+            result['pdf'] = str(pdf_path)
+        emit(result, position)
+
+    async with client, optimizer:
+        # Compiles overlap with the remaining Gemini calls; the pool bounds TeX concurrency
+        compile_tasks = []
+        async for result in optimizer.tailor_batch(pending, workers=workers, sections_only=sections_only):
+            position = result['id']
+            result['id'] = jobs[position]['id']
+            if compiler is None:
+                emit(result, position)
+            else:
+                compile_tasks.append(asyncio.create_task(compile_and_emit(result, position)))
+        await asyncio.gather(*compile_tasks)
+        logger.info(f"📏 Prompt metrics: {optimizer.prompt_metrics}")
+    if cache is not None:
+        logger.info(f"📦 Response cache: {cache.stats()}")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tailor resumes for a batch of job descriptions")
+    parser.add_argument('input', nargs='?', help="JSONL file of job descriptions (default: stdin)")
+    parser.add_argument('-o', '--output', help="Write JSONL results here (default: stdout)")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent Gemini calls")
+    parser.add_argument('--rpm', type=int, default=15, help="Gemini requests-per-minute quota")
+    parser.add_argument('--tpm', type=int, default=1_000_000, help="Gemini input tokens-per-minute quota")
+    parser.add_argument('--max-retries', type=int, default=5, help="Retries on 429/5xx")
+    parser.add_argument('--cache', default='gemini_cache.sqlite3', help="SQLite response cache path")
+    parser.add_argument('--cache-ttl', type=float, default=7 * 24 * 3600, help="Cache TTL in seconds")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the response cache")
+    parser.add_argument('--sections', action='store_true',
+                        help="Regenerate only the Experience/Projects/Skills sections")
+    parser.add_argument('--token-budget', type=int, default=6000, help="Estimated prompt token budget per job")
+    parser.add_argument('--no-guard', action='store_true',
+                        help="Skip the local invariant check and section repair of tailored output")
+    parser.add_argument('--compile-dir', help="Validate, compile and page-check each resume, writing PDFs here")
+    parser.add_argument('--compile-workers', type=int, default=None, help="Concurrent TeX processes (default: CPUs)")
+    parser.add_argument('--compile-timeout', type=float, default=60.0, help="Per-resume compile timeout in seconds")
+    parser.add_argument('--min-score', type=float, help="Skip jobs whose local match score (0-1) is below this")
+    parser.add_argument('--top-k', type=int, help="Tailor only the K best-matching jobs")
+    parser.add_argument('--templates', help="Directory of <profile>.tex templates selected by each job's \"profile\"")
+    parser.add_argument('--max-active-templates', type=int, default=128,
+                        help="Template profiles kept loaded at once (least recently used are dropped)")
+    parser.add_argument('--base-url', default=os.getenv('GEMINI_BASE_URL'),
+                        help="Gemini API host override, e.g. a local stub (default: $GEMINI_BASE_URL or Google)")
+    parser.add_argument('--metrics', help="Write Prometheus text-format metrics here at the end")
+    parser.add_argument('--metrics-json', help="Write a JSON metrics snapshot here at the end")
+    parser.add_argument('--log-spans', action='store_true', help="Log every timing span as a JSON line")
+    parser.add_argument('--profile', help="Profile the run with cProfile and write pstats output here")
+    parser.add_argument('--journal', help="Checkpoint journal; rerun with the same path to resume")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        sys.exit("Please set GEMINI_API_KEY environment variable")
+
+    if args.input:
+        with open(args.input) as f:
+            jobs = read_jobs(f)
+    else:
+        jobs = read_jobs(sys.stdin)
+
+    cache = None if args.no_cache else ResponseCache(args.cache, ttl_seconds=args.cache_ttl)
+    compiler = compile_dir = None
+    if args.compile_dir:
+        compile_dir = Path(args.compile_dir)
+        compile_dir.mkdir(parents=True, exist_ok=True)
+        compiler = LatexCompilerPool(workers=args.compile_workers, timeout=args.compile_timeout)
+    journal = CheckpointJournal(args.journal) if args.journal else None
+    # A resumed run appends to the results of the earlier attempts
+    output = open(args.output, 'a' if journal else 'w') if args.output else sys.stdout
+    metrics = default_registry()
+    if args.log_spans:
+        logging.getLogger("autoapply.spans").setLevel(logging.DEBUG)
+        metrics.add_listener(json_log_listener(logging.getLogger("autoapply.spans")))
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        written = asyncio.run(run_batch(
+            jobs, api_key, output,
+            workers=args.workers, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+            max_retries=args.max_retries, cache=cache, sections_only=args.sections,
+            token_budget=args.token_budget, compiler=compiler, compile_dir=compile_dir, journal=journal,
+            min_score=args.min_score, top_k=args.top_k, base_url=args.base_url,
+            templates=TemplateRegistry(args.templates, args.max_active_templates) if args.templates else None,
+            enforce_invariants=not args.no_guard,
+        ))
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            logger.info(f"🔬 Profile written to {args.profile} (inspect with python -m pstats)")
+        if args.metrics:
+            Path(args.metrics).write_text(metrics.to_prometheus(), encoding='utf-8')
+        if args.metrics_json:
+            Path(args.metrics_json).write_text(json.dumps(metrics.snapshot(), indent=2), encoding='utf-8')
+        if output is not sys.stdout:
+            output.close()
+        if cache is not None:
+            cache.close()
+        if compiler is not None:
+            compiler.close()
+        if journal is not None:
+            logger.info(f"📒 Checkpoints: {journal.counts()}")
+            journal.close()
+    logger.info(f"✅ Tailored {written}/{len(jobs)} job descriptions")
+
+
+if __name__ == "__main__":
+    main()
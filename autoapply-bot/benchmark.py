@@ -0,0 +1,590 @@
+"""
+Benchmark Module - Measures ResumeOptimizer and its Gemini client against a local stub server
+
+The stub emulates generateContent / streamGenerateContent with configurable
+latency, injected 429/5xx answers and canned LaTeX, so every scenario runs
+without an API key. Results are JSON (with run metadata) and can be written to
+a file and compared against an earlier run with --compare.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from gemini_client import GeminiClient, api_url_for, extract_text
+from metrics import MetricsRegistry
+from response_cache import ResponseCache
+from tech_extractor import TechTaxonomy, default_taxonomy, DEFAULT_TAXONOMY_PATH
+
+STUB_RESPONSE = {
+    "candidates": [{
+        "content": {"parts": [{"text": "\\documentclass{article}\\begin{document}stub\\end{document}"}]}
+    }],
+    "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 18, "totalTokenCount": 30},
+}
+
+# Request counters kept on each mock server's app, read back with stub_stats()
+STATS_KEY = web.AppKey('stats', dict)
+
+STUB_ERROR_MESSAGES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 502: "BAD_GATEWAY",
+                       503: "UNAVAILABLE", 504: "DEADLINE_EXCEEDED"}
+
+
+def _stub_chunks(text: str, chunks: int) -> list:
+    size = max(1, len(text) // chunks)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _stub_answer(text: str) -> Dict[str, Any]:
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}],
+            "usageMetadata": STUB_RESPONSE["usageMetadata"]}
+
+
+def canned_resume() -> str:
+    """A realistic answer: the bundled template inside a markdown fence, as Gemini tends to reply"""
+    from resume_optimizer import ResumeOptimizer
+    return f"```latex\n{ResumeOptimizer('bench').base_resume_template}\n```"
+
+
+async def start_stub_server(latency: float = 0.0, stream_chunks: int = 8, error_rate: float = 0.0,
+                            error_statuses: Tuple[int, ...] = (429, 503), response_text: Optional[str] = None,
+                            seed: int = 0, stream_error_after: Optional[int] = None,
+                            stream_error_mode: str = 'event') -> web.AppRunner:
+    """
+    Start a local aiohttp server that mimics Gemini's generateContent endpoint and,
+    for ':streamGenerateContent?alt=sse', streams the same text as SSE events
+    spread over the configured latency.
+
+    error_rate of the calls are answered with one of error_statuses (429s carry
+    Retry-After: 0). JSON-mode requests (responseMimeType application/json, as sent
+    by the batched ATS path) get every item echoed back. Request and injected-error
+    counts are kept in stub_stats(runner).
+
+    stream_error_after breaks streams after that many chunks, either with an SSE
+    error event (stream_error_mode='event') or by dropping the connection ('disconnect').
+    """
+    text = response_text or STUB_RESPONSE['candidates'][0]['content']['parts'][0]['text']
+    rng = random.Random(seed)
+    stats = {'requests': 0, 'injected_errors': 0}
+
+    async def generate_content(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        stats['requests'] += 1
+        if error_rate and rng.random() < error_rate:
+            stats['injected_errors'] += 1
+            status = rng.choice(error_statuses)
+            return web.json_response(
+                {"error": {"code": status, "message": "injected by stub", "status": STUB_ERROR_MESSAGES.get(status)}},
+                status=status, headers={'Retry-After': '0'} if status == 429 else None,
+            )
+        if request.match_info['model'].endswith(':streamGenerateContent'):
+            response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await response.prepare(request)
+            pieces = _stub_chunks(f"```latex\n{text}\n```", stream_chunks)
+            for index, piece in enumerate(pieces):
+                if stream_error_after is not None and index == stream_error_after:
+                    stats['injected_errors'] += 1
+                    if stream_error_mode == 'disconnect':
+                        request.transport.close()
+                        return response
+                    error = {"error": {"code": 500, "message": "injected by stub", "status": "INTERNAL"}}
+                    await response.write(f"data: {json.dumps(error)}\r\n\r\n".encode('utf-8'))
+                    await response.write_eof()
+                    return response
+                if latency:
+                    await asyncio.sleep(latency / len(pieces))
+                event = {"candidates": [{"content": {"parts": [{"text": piece}]}}]}
+                if index == len(pieces) - 1:
+                    event["usageMetadata"] = STUB_RESPONSE["usageMetadata"]
+                await response.write(f"data: {json.dumps(event)}\r\n\r\n".encode('utf-8'))
+            await response.write_eof()
+            return response
+        if latency:
+            await asyncio.sleep(latency)
+        if body.get('generationConfig', {}).get('responseMimeType') == 'application/json':
+            prompt = body['contents'][0]['parts'][0]['text']
+            items = json.loads(prompt[prompt.rindex('\n[') + 1:])
+            return web.json_response(_stub_answer(json.dumps([{"id": item["id"], "latex": item["latex"]}
+                                                              for item in items])))
+        return web.json_response(_stub_answer(text))
+
+    app = web.Application()
+    app[STATS_KEY] = stats
+    app.router.add_post('/v1beta/models/{model}', generate_content)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner
+
+
+def stub_base_url(runner: web.AppRunner) -> str:
+    host, port = runner.addresses[0][:2]
+    return f"http://{host}:{port}"
+
+
+def stub_url(runner: web.AppRunner) -> str:
+    return api_url_for(stub_base_url(runner))
+
+
+def stub_stats(runner: web.AppRunner) -> Dict[str, int]:
+    return dict(runner.app[STATS_KEY])
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99)}
+
+
+def _bench_optimizer(runner: web.AppRunner, **client_options):
+    """An optimizer that owns its client, pointed at the stub via base_url, with fast retries"""
+    from resume_optimizer import ResumeOptimizer
+    options = {'max_retries': 5, 'backoff_base': 0.01, 'metrics': MetricsRegistry(), **client_options}
+    return ResumeOptimizer("bench", base_url=stub_base_url(runner), **options)
+
+
+async def _run_pooled(url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with GeminiClient("bench", url, pool_size=concurrency) as client:
+        async def one():
+            async with semaphore:
+                await client.generate("ping", {"temperature": 0.0})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - start
+
+
+async def _run_unpooled(url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    payload = {"contents": [{"parts": [{"text": "ping"}]}], "generationConfig": {"temperature": 0.0}}
+
+    async def one():
+        async with semaphore:
+            # Old behaviour: a brand new session (and connection) per call
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, params={'key': 'bench'}, json=payload) as response:
+                    extract_text(await response.json())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def bench_pooling(requests: int, concurrency: int, latency: float) -> Dict[str, Any]:
+    runner = await start_stub_server(latency)
+    try:
+        url = stub_url(runner)
+        unpooled = await _run_unpooled(url, requests, concurrency)
+        pooled = await _run_pooled(url, requests, concurrency)
+    finally:
+        await runner.cleanup()
+    return {
+        "scenario": "pooling",
+        "requests": requests,
+        "concurrency": concurrency,
+        "unpooled_rps": round(requests / unpooled, 1),
+        "pooled_rps": round(requests / pooled, 1),
+    }
+
+
+def bench_extraction(repeats: int = 20) -> Dict[str, Any]:
+    """Time a taxonomy scan while growing the text and, separately, the taxonomy"""
+    from resume_optimizer import ResumeOptimizer
+    sample = ResumeOptimizer("bench").base_resume_template
+    base = default_taxonomy()
+
+    def timed(taxonomy: TechTaxonomy, text: str) -> float:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            taxonomy.scan(text)
+        return (time.perf_counter() - start) / repeats * 1000
+
+    by_text = {f"x{n}": round(timed(base, sample * n), 3) for n in (1, 4, 16)}
+
+    with open(DEFAULT_TAXONOMY_PATH, encoding='utf-8') as f:
+        bundled = json.load(f)['categories']
+    by_taxonomy = {}
+    for extra in (0, 1000, 5000):
+        categories = {category: list(terms) for category, terms in bundled.items()}
+        categories['synthetic'] = [f"Synthtech{i}" for i in range(extra)]
+        taxonomy = TechTaxonomy(categories)
+        by_taxonomy[str(len(taxonomy))] = round(timed(taxonomy, sample), 3)
+
+    return {
+        "scenario": "extraction",
+        "ms_by_text_multiple": by_text,
+        "ms_by_taxonomy_size": by_taxonomy,
+    }
+
+
+async def bench_streaming(latency: float) -> Dict[str, Any]:
+    """Time-to-first-fragment vs total time for a streamed tailoring call"""
+    from resume_optimizer import ResumeOptimizer
+    runner = await start_stub_server(latency)
+    try:
+        client = GeminiClient("bench", stub_url(runner))
+        async with client, ResumeOptimizer("bench", client=client) as optimizer:
+            start = time.perf_counter()
+            first = None
+            fragments = []
+            async for fragment in optimizer.stream_tailored_resume("Software Engineer"):
+                if first is None:
+                    first = time.perf_counter() - start
+                fragments.append(fragment)
+            total = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    return {
+        "scenario": "streaming",
+        "first_fragment_ms": round((first or total) * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "fence_stripped": not ''.join(fragments).startswith('```'),
+    }
+
+
+def bench_scoring(postings: int = 5000) -> Dict[str, Any]:
+    """Time local match scoring and top-K selection over a synthetic batch of postings"""
+    import random
+    from ats_scorer import select_top
+    from resume_optimizer import ResumeOptimizer
+    optimizer = ResumeOptimizer("bench")
+    terms = default_taxonomy().terms
+    rng = random.Random(7)
+    filler = "We are hiring a motivated engineer to join a fast-growing team and ship features. " * 8
+    descriptions = [f"{filler} Requirements: {', '.join(rng.sample(terms, 12))}." for _ in range(postings)]
+
+    start = time.perf_counter()
+    scores = optimizer.match_scorer.score_postings(descriptions)['score']
+    scored = time.perf_counter() - start
+    top = select_top(scores, min_score=0.2, top_k=100)
+    return {
+        "scenario": "scoring",
+        "postings": postings,
+        "score_seconds": round(scored, 3),
+        "select_seconds": round(time.perf_counter() - start - scored, 4),
+        "selected": len(top),
+    }
+
+
+async def bench_latency(calls: int, latency: float) -> Dict[str, Any]:
+    """Sequential tailoring calls: end-to-end latency and the optimizer's overhead over the stub's"""
+    runner = await start_stub_server(latency, response_text=canned_resume())
+    try:
+        async with _bench_optimizer(runner) as optimizer:
+            await optimizer.tailor_resume_for_job("warm-up")
+            samples = []
+            for index in range(calls):
+                start = time.perf_counter()
+                await optimizer.tailor_resume_for_job(f"Software Engineer {index}: Python, AWS, React")
+                samples.append(time.perf_counter() - start)
+    finally:
+        await runner.cleanup()
+    result = {"scenario": "latency", "calls": calls, "stub_latency_ms": latency * 1000, **_percentiles(samples)}
+    result["overhead_p50_ms"] = round(result["p50_ms"] - latency * 1000, 2)
+    return result
+
+
+async def bench_throughput(jobs: int, workers: int, latency: float, error_rate: float) -> Dict[str, Any]:
+    """tailor_batch under injected 429/503s: jobs per second, retries and outcomes"""
+    runner = await start_stub_server(latency, response_text=canned_resume(), error_rate=error_rate)
+    try:
+        async with _bench_optimizer(runner, pool_size=workers) as optimizer:
+            batch = [{'id': i, 'job_description': f"Backend Engineer {i}: Go, Kubernetes"} for i in range(jobs)]
+            start = time.perf_counter()
+            statuses = [result['status'] async for result in optimizer.tailor_batch(batch, workers=workers)]
+            elapsed = time.perf_counter() - start
+            retries = sum(entry['value'] for entry in
+                          optimizer.metrics.snapshot()['counters'].get('gemini_retries_total', []))
+    finally:
+        await runner.cleanup()
+    return {
+        "scenario": "throughput",
+        "jobs": jobs,
+        "workers": workers,
+        "error_rate": error_rate,
+        "jobs_per_second": round(jobs / elapsed, 1),
+        "succeeded": statuses.count('success'),
+        "retries": retries,
+        "stub": stub_stats(runner),
+    }
+
+
+async def bench_batch(items: int, batch_size: int, latency: float) -> Dict[str, Any]:
+    """
+    ATS optimization one resume per request vs batched JSON requests, at the real
+    output-token limit: whole resumes are large, so fewer than batch_size may fit.
+    The stub answers in fixed time whatever the output length, so this measures the
+    request count saved, not a speed-up - a real model still generates every token
+    """
+    from resume_optimizer import ResumeOptimizer, ATS_GENERATION_CONFIG
+    runner = await start_stub_server(latency, response_text=canned_resume())
+    resumes = [ResumeOptimizer("bench").base_resume_template.replace("Python", f"Python{i}") for i in range(items)]
+    try:
+        async with _bench_optimizer(runner) as optimizer:
+            before = stub_stats(runner)['requests']
+            start = time.perf_counter()
+            await asyncio.gather(*(optimizer.optimize_for_ats(resume) for resume in resumes))
+            single_seconds = time.perf_counter() - start
+            single_requests = stub_stats(runner)['requests'] - before
+
+            before = stub_stats(runner)['requests']
+            start = time.perf_counter()
+            await optimizer.optimize_for_ats_batch(resumes, max_items=batch_size)
+            batch_seconds = time.perf_counter() - start
+            batch_requests = stub_stats(runner)['requests'] - before
+    finally:
+        await runner.cleanup()
+    return {
+        "scenario": "batch",
+        "items": items,
+        "batch_size": batch_size,
+        "single_requests": single_requests,
+        "single_seconds": round(single_seconds, 3),
+        "max_output_tokens": ATS_GENERATION_CONFIG["maxOutputTokens"],
+        "batched_requests": batch_requests,
+        "items_per_request": round(items / max(batch_requests, 1), 2),
+        "batched_seconds": round(batch_seconds, 3),
+    }
+
+
+async def bench_cache(jobs: int, repeats: int, latency: float) -> Dict[str, Any]:
+    """Cold pass then repeated passes over the same jobs through an in-memory ResponseCache"""
+    runner = await start_stub_server(latency, response_text=canned_resume())
+    cache = ResponseCache()
+    try:
+        async with _bench_optimizer(runner, cache=cache) as optimizer:
+            descriptions = [f"Data Engineer {i}: Spark, SQL" for i in range(jobs)]
+            start = time.perf_counter()
+            await asyncio.gather(*(optimizer.tailor_resume_for_job(d) for d in descriptions))
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(repeats):
+                await asyncio.gather(*(optimizer.tailor_resume_for_job(d) for d in descriptions))
+            warm = (time.perf_counter() - start) / max(repeats, 1)
+    finally:
+        await runner.cleanup()
+        cache.close()
+    stats = cache.stats()
+    return {
+        "scenario": "cache",
+        "jobs": jobs,
+        "repeats": repeats,
+        "hit_ratio": round(stats['hit_ratio'], 3),
+        "cold_seconds": round(cold, 3),
+        "warm_seconds": round(warm, 3),
+        "stub_requests": stub_stats(runner)['requests'],
+    }
+
+
+JOB_BOARD_ASSETS = """<img src="/static/logo.png" alt="logo">
+<style>@font-face { font-family: Brand; src: url(/static/brand.woff2); } body { font-family: Brand; }</style>"""
+
+# Three form layouts the automator has to understand without site-specific code
+JOB_BOARD_LAYOUTS = {
+    # Labelled inputs with ids, typed email/tel, explicit submit button
+    'a': """<form method="post" enctype="multipart/form-data">
+  <label for="candidate-name">Full name</label><input id="candidate-name" name="name">
+  <label for="candidate-email">Email</label><input id="candidate-email" type="email" name="email">
+  <label for="candidate-phone">Phone</label><input id="candidate-phone" type="tel" name="phone">
+  <label for="candidate-resume">Resume</label><input id="candidate-resume" type="file" name="resume">
+  <button type="submit">Submit application</button>
+</form>""",
+    # No ids or labels: names and placeholders only, button without a type
+    'b': """<form method="post" enctype="multipart/form-data">
+  <input name="first_name" placeholder="First name"><input name="last_name" placeholder="Last name">
+  <input name="contact" placeholder="E-mail address"><input name="cv" type="file" accept=".pdf">
+  <input name="linkedin_url" placeholder="LinkedIn profile">
+  <button>Apply now</button>
+</form>""",
+    # Script-driven: aria-labels, upload wrapped in a label, fetch() submission
+    'c': """<div id="app">
+  <input aria-label="Your name" class="f"><input aria-label="Email" class="f">
+  <label>Upload your r\u00e9sum\u00e9 <input type="file" class="f"></label>
+  <div role="button" id="send">Send application</div>
+</div>
+<script>
+document.getElementById('send').addEventListener('click', async () => {
+  const [name, email, file] = document.querySelectorAll('.f');
+  const body = new FormData();
+  body.append('name', name.value); body.append('email', email.value); body.append('resume', file.files[0]);
+  await fetch(location.pathname, {method: 'POST', body});
+  document.getElementById('app').innerHTML = '<h1>Thank you for applying!</h1>';
+});
+</script>""",
+}
+
+
+async def start_job_board_server(latency: float = 0.0) -> web.AppRunner:
+    """
+    Local job board serving JOB_BOARD_LAYOUTS at /<layout>/jobs/<id>. Every page also
+    references an image and a web font, so blocked asset requests can be verified.
+    Accepted submissions and asset hits are kept in stub_stats(runner).
+    """
+    stats = {'pages': 0, 'submissions': 0, 'rejected': 0, 'asset_requests': 0}
+
+    async def job_page(request: web.Request) -> web.Response:
+        stats['pages'] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        layout = JOB_BOARD_LAYOUTS[request.match_info['layout']]
+        return web.Response(text=f"<html><body><h1>Engineer</h1>{JOB_BOARD_ASSETS}{layout}</body></html>",
+                            content_type='text/html')
+
+    async def submit(request: web.Request) -> web.Response:
+        form = await request.post()
+        has_email = any('@' in str(value) for value in form.values())
+        has_file = any(getattr(value, 'filename', None) for value in form.values())
+        if not (has_email and has_file):
+            stats['rejected'] += 1
+            return web.Response(status=422, text="<html><body>Missing email or resume</body></html>",
+                                content_type='text/html')
+        stats['submissions'] += 1
+        return web.Response(text="<html><body>Thank you, your application was received.</body></html>",
+                            content_type='text/html')
+
+    async def asset(request: web.Request) -> web.Response:
+        stats['asset_requests'] += 1
+        return web.Response(body=b"", content_type='application/octet-stream')
+
+    app = web.Application()
+    app[STATS_KEY] = stats
+    app.router.add_get('/{layout:[abc]}/jobs/{job_id}', job_page)
+    app.router.add_post('/{layout:[abc]}/jobs/{job_id}', submit)
+    app.router.add_get('/static/{name}', asset)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner
+
+
+async def bench_automator(applications: int, pool_sizes: Tuple[int, ...], latency: float) -> Dict[str, Any]:
+    """Submissions per second against the mock job board as the browser-context pool grows"""
+    import tempfile
+    from application_automator import Applicant, ApplicationAutomator, ApplicationRequest, BrowserUnavailableError
+    applicant = Applicant("Ada", "Lovelace", "ada@example.com", "+1 555 0100", linkedin="https://linkedin.com/in/ada")
+    runner = await start_job_board_server(latency)
+    result: Dict[str, Any] = {"scenario": "automator", "applications": applications, "by_pool_size": {}}
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as resume:
+            resume.write(b"%PDF-1.4\n%stub\n")
+            resume.flush()
+            base = stub_base_url(runner)
+            requests = [ApplicationRequest(f"{base}/{'abc'[i % 3]}/jobs/{1000 + i}", resume.name)
+                        for i in range(applications)]
+            for size in pool_sizes:
+                before = stub_stats(runner)
+                async with ApplicationAutomator(applicant, pool_size=size, metrics=MetricsRegistry()) as automator:
+                    start = time.perf_counter()
+                    outcomes = [outcome async for outcome in automator.submit_many(requests)]
+                    elapsed = time.perf_counter() - start
+                    blocked = automator.pool.blocked_requests
+                after = stub_stats(runner)
+                result["by_pool_size"][str(size)] = {
+                    "per_second": round(applications / elapsed, 2),
+                    "submitted": sum(outcome.ok for outcome in outcomes),
+                    "mapping_cache_hits": sum(outcome.mapping_cached for outcome in outcomes),
+                    "server_submissions": after['submissions'] - before['submissions'],
+                    "asset_requests": after['asset_requests'] - before['asset_requests'],
+                    "blocked_requests": blocked,
+                }
+    except BrowserUnavailableError as e:
+        result["skipped"] = str(e)
+    finally:
+        await runner.cleanup()
+    return result
+
+
+SCENARIOS = ("latency", "throughput", "batch", "cache", "pooling", "extraction", "streaming", "scoring", "automator")
+
+
+def _flatten(result: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-metric relative change between two result documents (scenarios present in both)"""
+    before = {result['scenario']: _flatten(result) for result in baseline['results']}
+    changes = []
+    for result in current['results']:
+        old = before.get(result['scenario'])
+        if old is None:
+            continue
+        for metric, value in _flatten(result).items():
+            if metric in old and old[metric] and value != old[metric]:
+                changes.append({'scenario': result['scenario'], 'metric': metric, 'baseline': old[metric],
+                                'current': value, 'change_pct': round((value - old[metric]) / old[metric] * 100, 1)})
+    return changes
+
+
+async def run_scenario(scenario: str, args: argparse.Namespace) -> Dict[str, Any]:
+    if scenario == "latency":
+        return await bench_latency(args.calls, args.latency or 0.05)
+    if scenario == "throughput":
+        return await bench_throughput(args.requests, args.concurrency, args.latency or 0.05, args.error_rate)
+    if scenario == "batch":
+        return await bench_batch(args.items, args.batch_size, args.latency or 0.2)
+    if scenario == "cache":
+        return await bench_cache(args.items, 3, args.latency or 0.05)
+    if scenario == "pooling":
+        return await bench_pooling(args.requests, args.concurrency, args.latency)
+    if scenario == "extraction":
+        return bench_extraction()
+    if scenario == "streaming":
+        return await bench_streaming(args.latency or 0.5)
+    if scenario == "automator":
+        return await bench_automator(args.applications, tuple(args.pool_sizes), args.latency or 0.05)
+    return bench_scoring()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ResumeOptimizer and its Gemini client against a local stub")
+    parser.add_argument('--requests', type=int, default=500, help="Calls for pooling / jobs for throughput")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.0, help="Stub latency per call in seconds")
+    parser.add_argument('--calls', type=int, default=50, help="Sequential calls for the latency scenario")
+    parser.add_argument('--items', type=int, default=40, help="Resumes for batch / jobs for cache")
+    parser.add_argument('--batch-size', type=int, default=4, help="Resumes per batched ATS request")
+    parser.add_argument('--error-rate', type=float, default=0.1, help="Share of stub answers that are 429/503")
+    parser.add_argument('--applications', type=int, default=24, help="Form submissions for the automator scenario")
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Browser-context pool sizes for the automator scenario")
+    parser.add_argument('--scenario', choices=SCENARIOS, action='append', help="Run only these scenarios")
+    parser.add_argument('--output', help="Also write the results document here")
+    parser.add_argument('--compare', help="Earlier results document to diff against")
+    args = parser.parse_args()
+
+    document = {
+        "meta": {"timestamp": time.time(), "python": platform.python_version(), "platform": platform.platform(),
+                 "args": vars(args)},
+        "results": [asyncio.run(run_scenario(scenario, args)) for scenario in args.scenario or SCENARIOS],
+    }
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            document["comparison"] = compare(json.load(f), document)
+    print(json.dumps(document, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
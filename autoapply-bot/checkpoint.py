@@ -0,0 +1,104 @@
+"""
+Checkpoint Module - Append-only journal that makes batch tailoring runs resumable
+
+Every finished job is appended as one JSON line keyed by a hash of the job and
+the settings that shape its output. A restarted run replays the journal, skips
+keys whose latest record succeeded and retries only fallbacks and errors.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional, Dict, Any, Iterable, List
+
+logger = logging.getLogger("autoapply.checkpoint")
+
+SUCCESS = 'success'
+FALLBACK = 'fallback'
+ERROR = 'error'
+STATUSES = (SUCCESS, FALLBACK, ERROR)
+
+
+def job_key(job: Dict[str, Any], settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Idempotent key for one unit of work: the job description, company info and
+    output-affecting settings (model URL, template hash, sections flag, budget).
+    The caller-supplied id is deliberately left out, so renumbered inputs still match.
+    """
+    material = json.dumps([job.get('job_description', ''), job.get('company_info') or {}, settings or {}],
+                          sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class CheckpointJournal:
+    """
+    JSONL journal of {'key', 'id', 'status', 'error', 'at'} records; the last
+    record for a key wins. Each record is flushed and fsynced as it is written, and
+    a torn final line from a crash is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+        if self._file.tell() and not self._ends_with_newline():
+            # Terminate a torn line so the next record starts cleanly
+            self._file.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        skipped = 0
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._latest[record['key']] = record
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    skipped += 1
+        if skipped:
+            logger.warning(f"⚠️ Ignored {skipped} unreadable checkpoint line(s) in {self.path}")
+        logger.info(f"📒 Loaded {len(self._latest)} checkpoint(s), {len(self.completed())} complete")
+
+    def is_complete(self, key: str) -> bool:
+        record = self._latest.get(key)
+        return record is not None and record['status'] == SUCCESS
+
+    def completed(self) -> List[str]:
+        return [key for key, record in self._latest.items() if record['status'] == SUCCESS]
+
+    def pending(self, keys: Iterable[str]) -> List[str]:
+        """The subset of keys that still need (re)doing"""
+        return [key for key in keys if not self.is_complete(key)]
+
+    def record(self, key: str, status: str, job_id: Any = None, error: Optional[str] = None) -> None:
+        if status not in STATUSES:
+            raise ValueError(f"Unknown checkpoint status: {status}")
+        entry = {'key': key, 'id': job_id, 'status': status, 'error': error, 'at': time.time()}
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._latest[key] = entry
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        for record in self._latest.values():
+            counts[record['status']] += 1
+        return counts
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'CheckpointJournal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,374 @@
+"""
+Database Module - Persistent store for jobs, tailored resumes, ATS versions and call metrics
+
+SQLite in WAL mode, with indexes on the columns the dashboard filters on. Resume
+bodies are stored as compressed line deltas against their base template, and
+AsyncStoreWriter batches writes into transactions on a dedicated thread so the
+event loop never blocks on disk.
+"""
+
+import asyncio
+import difflib
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+logger = logging.getLogger("autoapply.database")
+
+# Job statuses a re-scrape may overwrite; anything past these (tailored, applied, ...) is kept
+INITIAL_JOB_STATUSES = ('new', 'queued')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    created REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_hash TEXT NOT NULL UNIQUE,
+    company TEXT,
+    title TEXT,
+    url TEXT,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'new',
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, updated);
+
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY,
+    job_hash TEXT NOT NULL,
+    template_id INTEGER NOT NULL REFERENCES templates (id),
+    version INTEGER NOT NULL DEFAULT 1,
+    status TEXT NOT NULL,
+    error TEXT,
+    delta BLOB NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resumes_job ON resumes (job_hash, created);
+CREATE INDEX IF NOT EXISTS idx_resumes_status ON resumes (status);
+
+CREATE TABLE IF NOT EXISTS ats_versions (
+    id INTEGER PRIMARY KEY,
+    resume_id INTEGER NOT NULL REFERENCES resumes (id),
+    job_hash TEXT NOT NULL,
+    template_id INTEGER NOT NULL REFERENCES templates (id),
+    delta BLOB NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ats_resume ON ats_versions (resume_id);
+CREATE INDEX IF NOT EXISTS idx_ats_job ON ats_versions (job_hash);
+
+CREATE TABLE IF NOT EXISTS call_metrics (
+    id INTEGER PRIMARY KEY,
+    job_hash TEXT,
+    operation TEXT NOT NULL,
+    status TEXT NOT NULL,
+    latency_ms REAL,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_job ON call_metrics (job_hash);
+CREATE INDEX IF NOT EXISTS idx_metrics_operation ON call_metrics (operation, created);
+"""
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a text with whitespace normalized"""
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+def make_delta(base: str, text: str) -> bytes:
+    """
+    Line delta from base to text: a compressed JSON list of ["=", n] (copy n base
+    lines), ["-", n] (skip n base lines) and ["+", lines] (insert lines).
+    """
+    base_lines = base.splitlines(keepends=True)
+    text_lines = text.splitlines(keepends=True)
+    ops: List[list] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, text_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(['=', i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append(['-', i2 - i1])
+        if j2 > j1:
+            ops.append(['+', text_lines[j1:j2]])
+    return zlib.compress(json.dumps(ops, separators=(',', ':')).encode('utf-8'))
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild a text from its base and a make_delta() result"""
+    base_lines = base.splitlines(keepends=True)
+    out: List[str] = []
+    position = 0
+    for op, value in json.loads(zlib.decompress(delta)):
+        if op == '=':
+            out.extend(base_lines[position:position + value])
+            position += value
+        elif op == '-':
+            position += value
+        else:
+            out.extend(value)
+    return ''.join(out)
+
+
+class ApplicationStore:
+    """Synchronous SQLite store; use AsyncStoreWriter for writes from async code"""
+
+    def __init__(self, path: str = "autoapply.sqlite3"):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+        self._templates: Dict[int, str] = {}
+
+    def _migrate(self) -> None:
+        """Bring stores created by older versions up to SCHEMA"""
+        columns = {row['name'] for row in self._db.execute("PRAGMA table_info(resumes)")}
+        if 'error' not in columns:
+            with self._db:
+                self._db.execute("ALTER TABLE resumes ADD COLUMN error TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def register_template(self, content: str) -> int:
+        """Store a base template once and return its id"""
+        digest = content_hash(content)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR IGNORE INTO templates (hash, content, created) VALUES (?, ?, ?)",
+                             (digest, content, time.time()))
+            template_id = self._db.execute("SELECT id FROM templates WHERE hash = ?", (digest,)).fetchone()[0]
+        self._templates[template_id] = content
+        return template_id
+
+    def _template(self, template_id: int) -> str:
+        if template_id not in self._templates:
+            self._templates[template_id] = self._query(
+                "SELECT content FROM templates WHERE id = ?", (template_id,))[0][0]
+        return self._templates[template_id]
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # -- batched writes (each call is one transaction) ------------------------
+
+    def upsert_jobs(self, jobs: Iterable[Dict[str, Any]]) -> None:
+        """Insert jobs; a job seen again only has its status reset while it is still initial"""
+        now = time.time()
+        rows = [(job.get('job_hash') or content_hash(job['description']), job.get('company'), job.get('title'),
+                 job.get('url'), job['description'], job.get('status', 'new'), now, now) for job in jobs]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO jobs (job_hash, company, title, url, description, status, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (job_hash) DO UPDATE SET"
+                " status = CASE WHEN jobs.status IN (%s) THEN excluded.status ELSE jobs.status END,"
+                " updated = excluded.updated" % ', '.join('?' * len(INITIAL_JOB_STATUSES)),
+                [row + INITIAL_JOB_STATUSES for row in rows],
+            )
+
+    def set_job_status(self, updates: Iterable[Tuple[str, str]]) -> None:
+        """Apply (job_hash, status) pairs"""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany("UPDATE jobs SET status = ?, updated = ? WHERE job_hash = ?",
+                                 [(status, now, job_hash) for job_hash, status in updates])
+
+    def add_resumes(self, resumes: Iterable[Dict[str, Any]]) -> List[int]:
+        """Insert tailored resumes ({job_hash, template_id, content, status, error, version}); returns row ids"""
+        now = time.time()
+        ids = []
+        with self._lock, self._db:
+            for resume in resumes:
+                delta = make_delta(self._template(resume['template_id']), resume['content'])
+                cursor = self._db.execute(
+                    "INSERT INTO resumes (job_hash, template_id, version, status, error, delta, created)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (resume['job_hash'], resume['template_id'], resume.get('version', 1),
+                     resume.get('status', 'success'), resume.get('error'), delta, now),
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def add_ats_versions(self, versions: Iterable[Dict[str, Any]]) -> None:
+        """Insert ATS-optimized versions ({resume_id, job_hash, template_id, content})"""
+        now = time.time()
+        rows = [(version['resume_id'], version['job_hash'], version['template_id'],
+                 make_delta(self._template(version['template_id']), version['content']), now)
+                for version in versions]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO ats_versions (resume_id, job_hash, template_id, delta, created) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def add_metrics(self, metrics: Iterable[Dict[str, Any]]) -> None:
+        now = time.time()
+        rows = [(metric.get('job_hash'), metric['operation'], metric.get('status', 'success'),
+                 metric.get('latency_ms'), metric.get('prompt_tokens'), metric.get('output_tokens'),
+                 int(bool(metric.get('cache_hit'))), metric.get('created', now)) for metric in metrics]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO call_metrics (job_hash, operation, status, latency_ms, prompt_tokens,"
+                " output_tokens, cache_hit, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    # -- dashboard queries ----------------------------------------------------
+
+    def get_job(self, job_hash: str) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM jobs WHERE job_hash = ?", (job_hash,))
+        return dict(rows[0]) if rows else None
+
+    def jobs_by_status(self, status: str, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT job_hash, company, title, url, status, updated FROM jobs"
+            " WHERE status = ? ORDER BY updated DESC LIMIT ?", (status, limit))
+        return [dict(row) for row in rows]
+
+    def jobs_for_company(self, company: str, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT job_hash, company, title, url, status, updated FROM jobs"
+            " WHERE company = ? ORDER BY updated DESC LIMIT ?", (company, limit))
+        return [dict(row) for row in rows]
+
+    def status_counts(self) -> Dict[str, int]:
+        return {row[0]: row[1] for row in self._query("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+
+    def latest_resume(self, job_hash: str) -> Optional[str]:
+        """Most recent tailored resume for a job, rebuilt from its delta"""
+        rows = self._query(
+            "SELECT template_id, delta FROM resumes WHERE job_hash = ? ORDER BY created DESC, id DESC LIMIT 1",
+            (job_hash,))
+        return apply_delta(self._template(rows[0]['template_id']), rows[0]['delta']) if rows else None
+
+    def latest_resume_status(self, job_hash: str) -> Optional[Dict[str, Any]]:
+        """Tailoring outcome ({status, error}) of the most recent resume for a job"""
+        rows = self._query(
+            "SELECT status, error FROM resumes WHERE job_hash = ? ORDER BY created DESC, id DESC LIMIT 1",
+            (job_hash,))
+        return dict(rows[0]) if rows else None
+
+    def latest_ats_version(self, job_hash: str) -> Optional[str]:
+        rows = self._query(
+            "SELECT template_id, delta FROM ats_versions WHERE job_hash = ? ORDER BY created DESC, id DESC LIMIT 1",
+            (job_hash,))
+        return apply_delta(self._template(rows[0]['template_id']), rows[0]['delta']) if rows else None
+
+    def metrics_summary(self, since: float = 0.0) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT operation, status, COUNT(*) AS calls, AVG(latency_ms) AS avg_latency_ms,"
+            " SUM(prompt_tokens) AS prompt_tokens, SUM(output_tokens) AS output_tokens,"
+            " SUM(cache_hit) AS cache_hits FROM call_metrics WHERE created >= ?"
+            " GROUP BY operation, status", (since,))
+        return [dict(row) for row in rows]
+
+
+class AsyncStoreWriter:
+    """
+    Non-blocking writer: callers enqueue rows, a background task groups them into
+    batches (up to batch_size or every flush_interval seconds) and writes each batch
+    in one transaction on a single dedicated thread.
+    """
+
+    def __init__(self, store: ApplicationStore, batch_size: int = 200, flush_interval: float = 0.5,
+                 max_pending: int = 10_000):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autoapply-db")
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "AsyncStoreWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, kind: str, row: Dict[str, Any]) -> None:
+        """Queue a row; kind is 'job', 'status', 'resume', 'ats_version' or 'metric'"""
+        await self._queue.put((kind, row))
+
+    async def run_in_thread(self, function, *args):
+        """Run a store call on the writer thread (e.g. add_resumes, which returns ids)"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, row in batch:
+            grouped.setdefault(kind, []).append(row)
+        if 'job' in grouped:
+            self.store.upsert_jobs(grouped['job'])
+        if 'status' in grouped:
+            self.store.set_job_status((row['job_hash'], row['status']) for row in grouped['status'])
+        if 'resume' in grouped:
+            self.store.add_resumes(grouped['resume'])
+        if 'ats_version' in grouped:
+            self.store.add_ats_versions(grouped['ats_version'])
+        if 'metric' in grouped:
+            self.store.add_metrics(grouped['metric'])
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                await self.run_in_thread(self._write, batch)
+            except Exception as e:
+                # Keep draining: a dead writer would leave every later put() blocked on a full queue
+                logger.error(f"❌ Failed to write {len(batch)} rows: {e}")
+            if stop:
+                return
+
+    async def close(self) -> None:
+        """Flush everything queued so far and stop the writer"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        self._executor.shutdown(wait=True)
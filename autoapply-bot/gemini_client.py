@@ -0,0 +1,396 @@
+"""
+Gemini Client Module - One long-lived, pooled HTTP client for the Gemini API
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, List
+import aiohttp
+
+from metrics import MetricsRegistry, TOKEN_BUCKETS, default_registry
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache, cache_key
+from prompt_builder import estimate_tokens
+
+logger = logging.getLogger("autoapply.gemini_client")
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+MODEL_PATH = "/v1beta/models/gemini-2.0-flash-exp:generateContent"
+DEFAULT_API_URL = DEFAULT_BASE_URL + MODEL_PATH
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Labels (operation, job_hash) for the per-call records handed to call listeners
+_call_labels: ContextVar[Dict[str, Any]] = ContextVar('gemini_call_labels', default={})
+
+CallListener = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@contextmanager
+def call_labels(**labels) -> Iterator[None]:
+    """Label every Gemini call made inside the block, including from tasks it starts"""
+    token = _call_labels.set({**_call_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _call_labels.reset(token)
+
+
+class GeminiAPIError(Exception):
+    """Raised when Gemini answers with a non-200 status (or an error event mid-stream)"""
+
+    def __init__(self, status: int, payload: Any):
+        super().__init__(f"Gemini API error ({status}): {payload}")
+        self.status = status
+        self.payload = payload
+
+
+@dataclass
+class Generation:
+    """One generate call's text and the tokens Gemini reported for it ({} when served from the cache)"""
+    text: str
+    usage: Dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+
+
+class GeminiStream:
+    """
+    Async iterator over one streamed completion's text fragments. Once the stream
+    has been read to the end, usage holds the tokens Gemini reported for this call.
+    """
+
+    def __init__(self, fragments: Callable[["GeminiStream"], AsyncIterator[str]]):
+        self.usage: Dict[str, int] = {}
+        self._fragments = fragments(self)
+
+    def __aiter__(self) -> "GeminiStream":
+        return self
+
+    async def __anext__(self) -> str:
+        return await self._fragments.__anext__()
+
+    async def aclose(self) -> None:
+        """Abort the request if it is still running"""
+        await self._fragments.aclose()
+
+
+class GeminiClient:
+    """
+    Shared aiohttp session for Gemini calls.
+
+    The session is created lazily on first use (it has to live inside a running
+    event loop) and reused for every request afterwards, so connections stay
+    alive between calls instead of paying a TCP+TLS handshake each time.
+    """
+
+    def __init__(self, api_key: str, api_url: str = DEFAULT_API_URL,
+                 pool_size: int = 32, keepalive_timeout: float = 60.0,
+                 dns_cache_ttl: int = 300, total_timeout: float = 120.0,
+                 connect_timeout: float = 10.0, rate_limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 cache: Optional[ResponseCache] = None, metrics: Optional[MetricsRegistry] = None):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.metrics = metrics or default_registry()
+        self._call_listeners: List[CallListener] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "GeminiClient":
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={'Content-Type': 'application/json'},
+            )
+        return self._session
+
+    def add_call_listener(self, listener: CallListener) -> None:
+        """
+        Await listener(record) after every generate / stream call, with record =
+        {operation, job_hash, status, latency_ms, prompt_tokens, output_tokens, cache_hit}
+        (operation and job_hash come from call_labels)
+        """
+        self._call_listeners.append(listener)
+
+    async def _notify_call(self, start: float, status: str, usage: Dict[str, int], cache_hit: bool = False,
+                           labels: Optional[Dict[str, Any]] = None) -> None:
+        if not self._call_listeners:
+            return
+        labels = _call_labels.get() if labels is None else labels
+        record = {
+            'operation': labels.get('operation', 'generate'),
+            'job_hash': labels.get('job_hash'),
+            'status': status,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+            'prompt_tokens': usage.get('prompt'),
+            'output_tokens': usage.get('output'),
+            'cache_hit': cache_hit,
+        }
+        for listener in self._call_listeners:
+            try:
+                await listener(record)
+            except Exception as e:
+                logger.warning(f"⚠️ Call listener failed: {e}")
+
+    async def close(self) -> None:
+        """Close the pooled session and its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def generate_content(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a raw generateContent payload and return the decoded response.
+
+        429/5xx answers and connection errors are retried with exponential backoff
+        (honouring Retry-After when Gemini sends one), up to max_retries times.
+        """
+        session = self._get_session()
+        estimated_tokens = estimate_payload_tokens(payload)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                with self.metrics.span('gemini_rate_limit_wait'):
+                    await self.rate_limiter.acquire(estimated_tokens)
+            retry_after = None
+            try:
+                with self.metrics.span('gemini_request') as span:
+                    async with session.post(self.api_url, params={'key': self.api_key}, json=payload) as response:
+                        span['status'] = response.status
+                        self.metrics.inc('gemini_requests_total', status=response.status)
+                        if response.status == 200:
+                            body = await response.read()
+                            with self.metrics.span('gemini_json_decode'):
+                                data = json.loads(body)
+                            self._record_usage(usage_counts(data))
+                            return data
+                        try:
+                            error_data = await response.json()
+                        except (aiohttp.ContentTypeError, ValueError):
+                            error_data = await response.text()
+                        error = GeminiAPIError(response.status, error_data)
+                        if response.status not in RETRYABLE_STATUSES:
+                            raise error
+                        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.metrics.inc('gemini_requests_total', status='connection_error')
+                error = e
+
+            if attempt >= self.max_retries:
+                self.metrics.inc('gemini_failures_total')
+                raise error
+            delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+            attempt += 1
+            self.metrics.inc('gemini_retries_total', reason=getattr(error, 'status', type(error).__name__))
+            logger.warning(f"🔁 Gemini call failed ({error}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _record_usage(self, usage: Dict[str, int]) -> None:
+        """Count one call's reported tokens (prompt, output, total)"""
+        for kind, count in usage.items():
+            self.metrics.inc('gemini_tokens_total', count, kind=kind)
+            self.metrics.observe('gemini_call_tokens', count, TOKEN_BUCKETS, kind=kind)
+
+    @property
+    def stream_url(self) -> str:
+        return self.api_url.replace(':generateContent', ':streamGenerateContent')
+
+    def stream_generate(self, prompt: str, generation_config: Dict[str, Any]) -> GeminiStream:
+        """
+        Stream a single-turn prompt through streamGenerateContent (SSE); the returned
+        GeminiStream yields text fragments as Gemini produces them and carries the call's
+        usage once finished. Closing it early aborts the request. Streams bypass the
+        response cache and are not retried once started.
+        """
+        # Labels are taken where the stream is opened, not wherever it is read
+        labels = _call_labels.get()
+        return GeminiStream(lambda stream: self._stream_fragments(prompt, generation_config, stream, labels))
+
+    async def _stream_fragments(self, prompt: str, generation_config: Dict[str, Any],
+                                stream: GeminiStream, labels: Dict[str, Any]) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        status = 'error'
+        events = self._stream_events(prompt, generation_config, stream)
+        try:
+            async for text in events:
+                yield text
+            status = 'success'
+        except GeneratorExit:
+            # Closed early by the consumer
+            status = 'aborted'
+            raise
+        finally:
+            # Closing the inner generator releases the connection now, not at garbage collection
+            await events.aclose()
+            await self._notify_call(start, status, stream.usage, labels=labels)
+
+    async def _stream_events(self, prompt: str, generation_config: Dict[str, Any],
+                             stream: GeminiStream) -> AsyncIterator[str]:
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": generation_config,
+        }
+        if self.rate_limiter is not None:
+            with self.metrics.span('gemini_rate_limit_wait'):
+                await self.rate_limiter.acquire(estimate_payload_tokens(payload))
+        session = self._get_session()
+        params = {'key': self.api_key, 'alt': 'sse'}
+        usage: Dict[str, Any] = {}
+        async with session.post(self.stream_url, params=params, json=payload) as response:
+            self.metrics.inc('gemini_stream_requests_total', status=response.status)
+            if response.status != 200:
+                try:
+                    error_data = await response.json()
+                except (aiohttp.ContentTypeError, ValueError):
+                    error_data = await response.text()
+                raise GeminiAPIError(response.status, error_data)
+
+            data_lines = []
+            async for raw_line in response.content:
+                line = raw_line.decode('utf-8').rstrip('\r\n')
+                if line.startswith('data:'):
+                    data_lines.append(line[5:].lstrip())
+                    continue
+                if line or not data_lines:
+                    continue
+                # Blank line terminates an SSE event
+                event = self._stream_event(data_lines)
+                data_lines = []
+                # Usage arrives with the final chunk; the last one seen is the total
+                usage = event.get('usageMetadata') or usage
+                text = extract_text(event)
+                if text:
+                    yield text
+            if data_lines:
+                event = self._stream_event(data_lines)
+                usage = event.get('usageMetadata') or usage
+                text = extract_text(event)
+                if text:
+                    yield text
+            stream.usage = usage_counts({'usageMetadata': usage})
+            self._record_usage(stream.usage)
+
+    @staticmethod
+    def _stream_event(data_lines: List[str]) -> Dict[str, Any]:
+        event = json.loads('\n'.join(data_lines))
+        if 'error' in event:
+            # Failures after the 200 header arrive as an error event inside the stream
+            error = event['error']
+            raise GeminiAPIError(error.get('code', 500) if isinstance(error, dict) else 500, error)
+        return event
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter keeps a batch of workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def generate(self, prompt: str, generation_config: Dict[str, Any], bypass_cache: bool = False) -> str:
+        """
+        Send a single-turn prompt and return the first candidate's text ('' if none).
+
+        With a cache configured, identical (URL, prompt, config) requests are served
+        locally; bypass_cache forces a fresh sample (the result still refreshes the cache).
+        """
+        return (await self.generate_result(prompt, generation_config, bypass_cache)).text
+
+    async def generate_result(self, prompt: str, generation_config: Dict[str, Any],
+                              bypass_cache: bool = False) -> Generation:
+        """Like generate, but also returns this call's token usage (see Generation)"""
+        start = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.api_url, prompt, generation_config)
+            if not bypass_cache:
+                cached = await self.cache.aget(key)
+                self.metrics.inc('gemini_cache_total', result='hit' if cached is not None else 'miss')
+                if cached is not None:
+                    await self._notify_call(start, 'success', {}, cache_hit=True)
+                    return Generation(cached, cached=True)
+
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": generation_config,
+        }
+        try:
+            data = await self.generate_content(payload)
+        except Exception:
+            await self._notify_call(start, 'error', {})
+            raise
+        text = extract_text(data)
+        if key is not None and text:
+            await self.cache.aput(key, text)
+        result = Generation(text, usage_counts(data))
+        await self._notify_call(start, 'success' if text else 'empty', result.usage)
+        return result
+
+
+def api_url_for(base_url: str) -> str:
+    """generateContent URL for the default model on another host (e.g. a local stub or proxy)"""
+    return base_url.rstrip('/') + MODEL_PATH
+
+
+def extract_text(data: Dict[str, Any]) -> str:
+    """Pull the first candidate's text out of a generateContent response"""
+    candidates = data.get('candidates') or [{}]
+    parts = candidates[0].get('content', {}).get('parts') or [{}]
+    return parts[0].get('text', '')
+
+
+def usage_counts(data: Dict[str, Any]) -> Dict[str, int]:
+    """Gemini's usageMetadata as {prompt, output, total} token counts ({} when absent)"""
+    usage = data.get('usageMetadata')
+    if not usage:
+        return {}
+    return {
+        'prompt': usage.get('promptTokenCount', 0),
+        'output': usage.get('candidatesTokenCount', 0),
+        'total': usage.get('totalTokenCount', 0),
+    }
+
+
+def estimate_payload_tokens(payload: Dict[str, Any]) -> int:
+    """Estimated input tokens of a payload, for quota accounting"""
+    return max(1, sum(estimate_tokens(part.get('text', '')) for content in payload.get('contents', [])
+                      for part in content.get('parts', [])))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
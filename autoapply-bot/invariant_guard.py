@@ -0,0 +1,226 @@
+"""
+Invariant Guard Module - Local checks that tailored LaTeX kept what must not change
+
+The tailoring prompts forbid touching dates, company names and position titles
+and ask for the template's structure and one-page length. InvariantGuard checks
+a response against the template without calling TeX or Gemini:
+
+- document level: preamble, heading block and the set of sections; drift here is
+  undone locally by putting the template's version back
+- section level: the protected \\resumeSubheading / \\resumeSubSubheading arguments
+  and project names/dates, brace/environment/macro structure, and growth against
+  the template section (a proxy for the one-page rule)
+- length budget: the sections' lengths summed against the template's total, so
+  several sections each growing within their own limit cannot add up to a second
+  page; the sections that grew most are asked to shrink
+
+Section-level violations are what a targeted repair request has to fix.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, Any, List, Tuple
+
+from latex_compiler import defined_macros, validate_fragment
+from latex_model import ResumeDocument, ResumeSection, parse_resume
+
+logger = logging.getLogger("autoapply.invariant_guard")
+
+# Argument positions that are facts, not wording: title/dates/company/location of jobs,
+# school/location/degree/date of education, title/dates of sub-roles and project dates
+PROTECTED_ARGS = {'resumeSubheading': (0, 1, 2, 3), 'resumeSubSubheading': (0, 1), 'resumeProjectHeading': (1,)}
+# Project headings read "{name $|$ \emph{tech stack}}"; the stack may be tailored, the name may not
+PROJECT_NAME_SEPARATOR = '$|$'
+
+# Violation kinds fixed by putting the template's part back, without a repair request
+RESTORABLE = ('preamble', 'heading', 'section_set')
+
+DEFAULT_MAX_GROWTH = 1.25
+# The whole document gets less headroom than any one section
+DEFAULT_MAX_TOTAL_GROWTH = 1.10
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.split())
+
+
+@dataclass
+class Violation:
+    """One broken invariant; section is None for document-level problems"""
+    kind: str
+    message: str
+    section: Optional[str] = None
+
+
+@dataclass
+class GuardReport:
+    """What the guard found and how each problem was resolved"""
+    violations: List[Violation] = field(default_factory=list)
+    restored: List[str] = field(default_factory=list)   # parts put back from the template locally
+    repaired: List[str] = field(default_factory=list)   # sections fixed by a repair request
+    reverted: List[str] = field(default_factory=list)   # sections replaced by the template's after a failed repair
+
+    @property
+    def ok(self) -> bool:
+        """True when the output needed no changes at all"""
+        return not self.violations
+
+    @property
+    def offending_sections(self) -> List[str]:
+        """Sections with violations that need a repair request, in document order"""
+        names: List[str] = []
+        for violation in self.violations:
+            if violation.kind not in RESTORABLE and violation.section is not None and violation.section not in names:
+                names.append(violation.section)
+        return names
+
+    def for_section(self, name: str) -> List[Violation]:
+        return [violation for violation in self.violations if violation.section == name]
+
+    @property
+    def outcome(self) -> str:
+        """
+        'clean', 'restored', 'repaired' or 'reverted' (the most drastic step taken), or
+        'unresolved' while violations have been found but not yet dealt with
+        """
+        if self.reverted:
+            return 'reverted'
+        if self.repaired:
+            return 'repaired'
+        if self.restored:
+            return 'restored'
+        return 'clean' if self.ok else 'unresolved'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'ok': self.ok, 'outcome': self.outcome}
+
+
+def protected_fields(section: ResumeSection) -> Counter:
+    """Multiset of the section's protected entry arguments (whitespace-normalized)"""
+    fields: Counter = Counter()
+    for entry in section.entries:
+        positions = PROTECTED_ARGS.get(entry.kind)
+        if positions is None:
+            continue
+        values = [_normalize(entry.args[index]) for index in positions if index < len(entry.args)]
+        if entry.kind == 'resumeProjectHeading' and entry.args:
+            values.insert(0, _normalize(entry.args[0].split(PROJECT_NAME_SEPARATOR, 1)[0]))
+        fields[(entry.kind, tuple(values))] += 1
+    return fields
+
+
+class InvariantGuard:
+    """
+    Checks tailored output against one template. Built once per template; the
+    per-section baselines (protected fields, length) are computed up front so a
+    check costs one parse of the output.
+    """
+
+    def __init__(self, template: ResumeDocument, max_growth: Optional[float] = DEFAULT_MAX_GROWTH,
+                 max_total_growth: Optional[float] = DEFAULT_MAX_TOTAL_GROWTH):
+        self.template = template
+        self.max_growth = max_growth
+        self.max_total_growth = max_total_growth
+        self.macros = defined_macros(template.preamble)
+        self._preamble = _normalize(template.preamble)
+        self._heading = _normalize(template.heading)
+        self._fields = {section.name.lower(): protected_fields(section) for section in template.sections}
+        self._lengths = {section.name.lower(): len(_normalize(section.source)) for section in template.sections}
+        self._total = sum(self._lengths.values())
+
+    def check(self, source: str) -> Tuple[ResumeDocument, GuardReport]:
+        """
+        Check a full tailored document. Returns the document with document-level
+        drift already undone (template preamble/heading/closing, template section
+        order, missing sections put back, unknown ones dropped) plus the report.
+        Raises LatexParseError when the output has no recognizable document body.
+        """
+        report = GuardReport()
+        output = parse_resume(source, strict=False)
+
+        if _normalize(output.preamble) != self._preamble:
+            report.violations.append(Violation('preamble', "preamble differs from the template"))
+            report.restored.append('preamble')
+        if _normalize(output.heading) != self._heading:
+            report.violations.append(Violation('heading', "heading block differs from the template"))
+            report.restored.append('heading')
+
+        by_name: Dict[str, ResumeSection] = {}
+        for section in output.sections:
+            key = section.name.lower()
+            if key not in self._fields:
+                report.violations.append(Violation('section_set', f"unexpected section '{section.name}' dropped",
+                                                   section.name))
+                report.restored.append(section.name)
+            elif key in by_name:
+                report.violations.append(Violation('section_set', f"duplicate section '{section.name}' dropped",
+                                                   section.name))
+                report.restored.append(section.name)
+            else:
+                by_name[key] = section
+
+        sections = []
+        for original in self.template.sections:
+            section = by_name.get(original.name.lower())
+            if section is None:
+                report.violations.append(Violation('section_set', f"section '{original.name}' missing; restored",
+                                                   original.name))
+                report.restored.append(original.name)
+                sections.append(original)
+                continue
+            report.violations.extend(self.check_section(original.name, section))
+            sections.append(section)
+
+        over = self.over_budget(sections)
+        if over:
+            total = sum(len(_normalize(section.source)) for section in sections)
+            for name in over:
+                report.violations.append(Violation('length', f"the sections together grew to {total / self._total:.0%}"
+                                                   f" of the template (limit {self.max_total_growth:.0%}); shorten "
+                                                   f"this section, it grew the most", name))
+
+        document = ResumeDocument(self.template.preamble, self.template.heading, sections, self.template.closing)
+        return document, report
+
+    def check_section(self, name: str, section: ResumeSection) -> List[Violation]:
+        """Section-level violations of one (tailored or repaired) section"""
+        if section.error is not None:
+            return [Violation('structure', f"unparseable entries: {section.error}", name)]
+        violations = [Violation('structure', error, name)
+                      for error in validate_fragment(section.source, self.macros).errors]
+
+        expected = self._fields[name.lower()]
+        actual = protected_fields(section)
+        for (kind, values), count in (expected - actual).items():
+            violations.append(Violation('protected', f"\\{kind} {{{'}{'.join(values)}}} changed or removed"
+                                        + (f" ({count}x)" if count > 1 else ""), name))
+        for (kind, values), _ in (actual - expected).items():
+            violations.append(Violation('protected', f"unexpected \\{kind} {{{'}{'.join(values)}}}", name))
+
+        if self.max_growth is not None:
+            baseline = self._lengths[name.lower()]
+            length = len(_normalize(section.source))
+            if baseline and length > baseline * self.max_growth:
+                violations.append(Violation('length', f"grew to {length / baseline:.0%} of the template section "
+                                            f"(limit {self.max_growth:.0%}); the page limit is at risk", name))
+        return violations
+
+    def over_budget(self, sections: List[ResumeSection]) -> List[str]:
+        """
+        Sections to shrink back, largest growth first, until their summed length fits
+        the document budget; [] when it already fits
+        """
+        if self.max_total_growth is None or not self._total:
+            return []
+        lengths = {section.name: len(_normalize(section.source)) for section in sections}
+        excess = sum(lengths.values()) - self._total * self.max_total_growth
+        growth = sorted(((length - self._lengths.get(name.lower(), 0), name) for name, length in lengths.items()),
+                        reverse=True)
+        names: List[str] = []
+        for grew, name in growth:
+            if excess <= 0 or grew <= 0:
+                break
+            names.append(name)
+            excess -= grew
+        return names
@@ -0,0 +1,384 @@
+"""
+Job Scraper Module - Incremental, deduplicating job-board crawler
+
+Source adapters (Greenhouse, Lever, generic JSON feeds) share one pooled HTTP
+client with per-host concurrency limits. Conditional GETs (ETag /
+If-Modified-Since) and a per-source last-seen cursor keep re-crawls cheap, and
+postings are deduplicated by a hash of their normalized text before anything
+reaches ResumeOptimizer.
+
+A source's new validators and cursor are only committed once the consumer has
+taken every posting it produced, so an interrupted run re-fetches instead of
+getting a 304 for postings nobody saw.
+"""
+
+import asyncio
+import copy
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, AsyncIterator, Iterable
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger("autoapply.job_scraper")
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^a-z ]+")
+
+
+def html_to_text(markup: str) -> str:
+    """Very small HTML-to-text conversion that keeps line structure"""
+    markup = html.unescape(markup)
+    markup = re.sub(r"(?i)<\s*(?:br|/p|/li|/h\d|/div)\s*/?>", "\n", markup)
+    markup = re.sub(r"(?i)<\s*li[^>]*>", "- ", markup)
+    text = html.unescape(_TAG_RE.sub("", markup))
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip markup, digits and punctuation, collapse whitespace"""
+    return " ".join(_NON_WORD_RE.sub(" ", html_to_text(text).lower()).split())
+
+
+def posting_hash(company: str, title: str, description: str) -> str:
+    """
+    Near-duplicate key: reposts that differ only in formatting, dates, numbers
+    or requisition ids hash the same
+    """
+    material = "\n".join(normalize_text(part) for part in (company, title, description))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _to_timestamp(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Lever uses epoch milliseconds
+        return value / 1000.0 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class JobPosting:
+    """A normalized posting, independent of the board it came from"""
+    source: str
+    external_id: str
+    title: str
+    company: str
+    description: str
+    url: str = ""
+    location: str = ""
+    posted_at: Optional[float] = None
+    content_hash: str = ""
+
+    def __post_init__(self):
+        if not self.content_hash:
+            self.content_hash = posting_hash(self.company, self.title, self.description)
+
+    def to_job(self) -> Dict[str, Any]:
+        """Shape expected by ResumeOptimizer.tailor_batch / batch_tailor.py"""
+        return {
+            'id': self.content_hash,
+            'job_description': f"{self.title} at {self.company}\n\n{self.description}",
+            'company_info': {'company_name': self.company},
+            'url': self.url,
+        }
+
+
+@dataclass
+class ScraperState:
+    """Persistent crawl state: validators per URL, cursor per source, recently seen hashes"""
+    validators: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    cursors: Dict[str, float] = field(default_factory=dict)
+    seen: List[str] = field(default_factory=list)
+    max_seen: int = 50_000
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "ScraperState":
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: Optional[str]) -> None:
+        if not path:
+            return
+        self.seen = self.seen[-self.max_seen:]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+
+class HttpFetcher:
+    """
+    Pooled aiohttp client with per-host limits and conditional GETs.
+
+    Validators from fresh responses are collected in `pending`, not written to the
+    state; the crawler commits them once the postings they cover have been consumed.
+    """
+
+    def __init__(self, state: ScraperState, pool_size: int = 64, per_host_limit: int = 4,
+                 timeout: float = 30.0, user_agent: str = "autoapply-bot/1.0"):
+        self.state = state
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.user_agent = user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.pending: Dict[str, Dict[str, str]] = {}
+
+    async def __aenter__(self) -> "HttpFetcher":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host_limit,
+                                           ttl_dns_cache=300),
+            timeout=self.timeout,
+            headers={'User-Agent': self.user_agent},
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def for_source(self) -> "HttpFetcher":
+        """A view sharing this fetcher's session and host limits, with its own pending validators"""
+        view = copy.copy(self)
+        view.pending = {}
+        return view
+
+    async def get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Optional[Any]:
+        """GET and decode JSON; returns None when the server answers 304 Not Modified"""
+        key = url if not params else f"{url}?{sorted(params.items())}"
+        headers = {}
+        validators = self.state.validators.get(key, {})
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        host = urlsplit(url).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with limit:
+            async with self._session.get(url, params=params, headers=headers) as response:
+                if response.status == 304:
+                    logger.info(f"💤 {url} not modified")
+                    return None
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+                fresh = {}
+                if response.headers.get('ETag'):
+                    fresh['etag'] = response.headers['ETag']
+                if response.headers.get('Last-Modified'):
+                    fresh['last_modified'] = response.headers['Last-Modified']
+                if fresh:
+                    self.pending[key] = fresh
+                return data
+
+
+class SourceAdapter(ABC):
+    """Base class: turn one job board's API into JobPostings"""
+
+    name = "source"
+
+    @abstractmethod
+    def fetch(self, fetcher: HttpFetcher) -> AsyncIterator[JobPosting]:
+        """Yield the board's current postings (an async generator in every adapter)"""
+
+
+@dataclass
+class _SourceFinished:
+    """Queued after a source's last posting; carries what to commit once it is consumed"""
+    source: str
+    ok: bool
+    cursor: Optional[float] = None
+    validators: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+
+class GreenhouseAdapter(SourceAdapter):
+    """Greenhouse job board API (boards-api.greenhouse.io)"""
+
+    def __init__(self, board_token: str, company: Optional[str] = None,
+                 base_url: str = "https://boards-api.greenhouse.io/v1/boards"):
+        self.board_token = board_token
+        self.company = company or board_token
+        self.base_url = base_url
+        self.name = f"greenhouse:{board_token}"
+
+    async def fetch(self, fetcher: HttpFetcher) -> AsyncIterator[JobPosting]:
+        data = await fetcher.get_json(f"{self.base_url}/{self.board_token}/jobs", {'content': 'true'})
+        for job in (data or {}).get('jobs', []):
+            yield JobPosting(
+                source=self.name,
+                external_id=str(job.get('id')),
+                title=job.get('title', ''),
+                company=self.company,
+                description=html_to_text(job.get('content', '')),
+                url=job.get('absolute_url', ''),
+                location=(job.get('location') or {}).get('name', ''),
+                posted_at=_to_timestamp(job.get('updated_at')),
+            )
+
+
+class LeverAdapter(SourceAdapter):
+    """Lever postings API (api.lever.co)"""
+
+    def __init__(self, company: str, base_url: str = "https://api.lever.co/v0/postings"):
+        self.company = company
+        self.base_url = base_url
+        self.name = f"lever:{company}"
+
+    async def fetch(self, fetcher: HttpFetcher) -> AsyncIterator[JobPosting]:
+        data = await fetcher.get_json(f"{self.base_url}/{self.company}", {'mode': 'json'})
+        for job in data or []:
+            sections = [job.get('descriptionPlain', '')]
+            for block in job.get('lists', []):
+                sections.append(f"{block.get('text', '')}\n{html_to_text(block.get('content', ''))}")
+            sections.append(job.get('additionalPlain', ''))
+            yield JobPosting(
+                source=self.name,
+                external_id=str(job.get('id')),
+                title=job.get('text', ''),
+                company=self.company,
+                description="\n\n".join(section for section in sections if section),
+                url=job.get('hostedUrl', ''),
+                location=(job.get('categories') or {}).get('location', ''),
+                posted_at=_to_timestamp(job.get('createdAt')),
+            )
+
+
+class JsonFeedAdapter(SourceAdapter):
+    """Generic JSON feed: a list of objects (optionally under `items_key`) mapped through `fields`"""
+
+    DEFAULT_FIELDS = {'id': 'id', 'title': 'title', 'company': 'company', 'description': 'description',
+                      'url': 'url', 'location': 'location', 'posted_at': 'posted_at'}
+
+    def __init__(self, url: str, name: Optional[str] = None, items_key: Optional[str] = None,
+                 fields: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.name = name or f"feed:{urlsplit(url).netloc}"
+        self.items_key = items_key
+        self.fields = {**self.DEFAULT_FIELDS, **(fields or {})}
+
+    async def fetch(self, fetcher: HttpFetcher) -> AsyncIterator[JobPosting]:
+        data = await fetcher.get_json(self.url)
+        items = (data or {}).get(self.items_key, []) if self.items_key else (data or [])
+        for item in items:
+            def get(name: str) -> Any:
+                return item.get(self.fields[name], '')
+            yield JobPosting(
+                source=self.name,
+                external_id=str(get('id')),
+                title=str(get('title')),
+                company=str(get('company')),
+                description=html_to_text(str(get('description'))),
+                url=str(get('url')),
+                location=str(get('location')),
+                posted_at=_to_timestamp(item.get(self.fields['posted_at'])),
+            )
+
+
+class JobScraper:
+    """Crawl several sources concurrently and stream new, de-duplicated postings"""
+
+    def __init__(self, adapters: Iterable[SourceAdapter], state_path: Optional[str] = "scraper_state.json",
+                 pool_size: int = 64, per_host_limit: int = 4, max_pending: int = 256):
+        self.adapters = list(adapters)
+        self.state_path = state_path
+        self.state = ScraperState.load(state_path)
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.max_pending = max_pending
+        self.stats = {'fetched': 0, 'skipped_old': 0, 'duplicates': 0, 'emitted': 0, 'errors': 0}
+
+    async def scrape(self) -> AsyncIterator[JobPosting]:
+        """Yield postings newer than each source's cursor and not seen before (by content hash)"""
+        seen = set(self.state.seen)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+
+        async with HttpFetcher(self.state, self.pool_size, self.per_host_limit) as fetcher:
+            async def crawl(adapter: SourceAdapter) -> None:
+                cursor = self.state.cursors.get(adapter.name)
+                newest = cursor
+                source_fetcher = fetcher.for_source()
+                finished = _SourceFinished(adapter.name, ok=False)
+                try:
+                    async for posting in adapter.fetch(source_fetcher):
+                        self.stats['fetched'] += 1
+                        if cursor is not None and posting.posted_at is not None and posting.posted_at <= cursor:
+                            self.stats['skipped_old'] += 1
+                            continue
+                        if posting.posted_at is not None:
+                            newest = max(newest or posting.posted_at, posting.posted_at)
+                        await queue.put(posting)
+                    finished = _SourceFinished(adapter.name, True, newest, source_fetcher.pending)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"❌ Failed to crawl {adapter.name}: {e}")
+                finally:
+                    await queue.put(finished)
+
+            tasks = [asyncio.create_task(crawl(adapter)) for adapter in self.adapters]
+            remaining = len(tasks)
+            try:
+                while remaining:
+                    posting = await queue.get()
+                    if isinstance(posting, _SourceFinished):
+                        remaining -= 1
+                        # Everything this source produced has been consumed: safe to skip it next time
+                        if posting.ok:
+                            if posting.cursor is not None:
+                                self.state.cursors[posting.source] = posting.cursor
+                            self.state.validators.update(posting.validators)
+                        continue
+                    if posting.content_hash in seen:
+                        self.stats['duplicates'] += 1
+                        continue
+                    seen.add(posting.content_hash)
+                    self.stats['emitted'] += 1
+                    yield posting
+                    # Only remembered once the consumer has come back for the next one
+                    self.state.seen.append(posting.content_hash)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.state.save(self.state_path)
+                logger.info(f"🔎 Scrape finished: {self.stats}")
+
+
+# Crawl from the command line and emit batch_tailor.py-ready JSONL
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Scrape new job postings as JSONL")
+    parser.add_argument('--greenhouse', action='append', default=[], help="Greenhouse board token")
+    parser.add_argument('--lever', action='append', default=[], help="Lever company slug")
+    parser.add_argument('--feed', action='append', default=[], help="Generic JSON feed URL")
+    parser.add_argument('--state', default='scraper_state.json', help="Crawl state file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    sources: List[SourceAdapter] = ([GreenhouseAdapter(token) for token in args.greenhouse]
+                                    + [LeverAdapter(company) for company in args.lever]
+                                    + [JsonFeedAdapter(url) for url in args.feed])
+
+    async def run_scraper():
+        async for posting in JobScraper(sources, args.state).scrape():
+            print(json.dumps(posting.to_job()), flush=True)
+
+    asyncio.run(run_scraper())
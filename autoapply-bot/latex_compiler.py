@@ -0,0 +1,271 @@
+"""
+LaTeX Compiler Module - Local validation and PDF compilation for tailored resumes
+
+validate_latex() is a fast structural check that catches most broken model
+output without running TeX. LatexCompilerPool then compiles with pdflatex (or
+tectonic) in a bounded pool of subprocesses, reusing a format file dumped from
+the fixed preamble so each job only typesets the document body.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, List, Set
+
+from latex_model import BEGIN_DOCUMENT, END_DOCUMENT
+
+logger = logging.getLogger("autoapply.latex_compiler")
+
+_COMMENT_RE = re.compile(r"(?<!\\)%[^\n]*")
+_DEFINITION_RE = re.compile(r"\\(?:re)?newcommand\*?\s*\{?\\([A-Za-z]+)\}?|\\def\\([A-Za-z]+)")
+_ENVIRONMENT_RE = re.compile(r"\\(begin|end)\{([^}]*)\}")
+_LIST_MACRO_RE = re.compile(r"\\([A-Za-z]+List)(Start|End)(?![A-Za-z])")
+_MACRO_RE = re.compile(r"\\([A-Za-z]+)")
+_PAGES_RE = re.compile(r"Output written on .*?\((\d+) pages?")
+_PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
+# Template macros that must have been defined in the preamble before use
+CUSTOM_MACRO_PREFIX = "resume"
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of the structural check"""
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+@dataclass
+class CompileResult:
+    """Outcome of one compile job"""
+    ok: bool
+    pdf: Optional[bytes] = None
+    pages: Optional[int] = None
+    errors: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    log_tail: str = ""
+
+
+def _strip_comments(source: str) -> str:
+    return _COMMENT_RE.sub("", source)
+
+
+def defined_macros(preamble: str) -> Set[str]:
+    """Names of macros defined with \\newcommand / \\renewcommand / \\def"""
+    return {a or b for a, b in _DEFINITION_RE.findall(_strip_comments(preamble))}
+
+
+def _brace_errors(text: str) -> List[str]:
+    errors = []
+    depth = 0
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth < 0:
+                line = text.count('\n', 0, index) + 1
+                errors.append(f"unmatched '}}' on line {line}")
+                depth = 0
+        index += 1
+    if depth > 0:
+        errors.append(f"{depth} unclosed '{{'")
+    return errors
+
+
+def _body_errors(body: str, macros: Set[str]) -> List[str]:
+    errors = []
+    stack: List[str] = []
+    tokens = sorted(
+        [(m.start(), m.group(1), m.group(2)) for m in _ENVIRONMENT_RE.finditer(body)]
+        + [(m.start(), 'begin' if m.group(2) == 'Start' else 'end', m.group(1))
+           for m in _LIST_MACRO_RE.finditer(body)]
+    )
+    for _, kind, name in tokens:
+        if kind == 'begin':
+            stack.append(name)
+        elif not stack:
+            errors.append(f"\\end{{{name}}} without a matching begin")
+        elif stack[-1] != name:
+            errors.append(f"\\end{{{name}}} closes '{stack[-1]}'")
+            stack.pop()
+        else:
+            stack.pop()
+    for name in stack:
+        errors.append(f"environment '{name}' is never closed")
+
+    unknown = {name for name in _MACRO_RE.findall(body)
+               if name.startswith(CUSTOM_MACRO_PREFIX) and name not in macros}
+    for name in sorted(unknown):
+        errors.append(f"undefined macro \\{name}")
+    return errors
+
+
+def validate_latex(source: str) -> ValidationResult:
+    """
+    Structural check: one document body, balanced braces, balanced environments
+    (including the template's *ListStart/*ListEnd pairs) and no undefined
+    \\resume* macros.
+    """
+    result = ValidationResult()
+    if source.count(BEGIN_DOCUMENT) != 1:
+        result.errors.append(f"expected exactly one {BEGIN_DOCUMENT}, found {source.count(BEGIN_DOCUMENT)}")
+    if source.count(END_DOCUMENT) != 1:
+        result.errors.append(f"expected exactly one {END_DOCUMENT}, found {source.count(END_DOCUMENT)}")
+    if not result.ok:
+        return result
+
+    text = _strip_comments(source)
+    result.errors.extend(_brace_errors(text))
+    begin = text.find(BEGIN_DOCUMENT)
+    preamble, body = text[:begin], text[begin + len(BEGIN_DOCUMENT):text.rfind(END_DOCUMENT)]
+    result.errors.extend(_body_errors(body, defined_macros(preamble)))
+    return result
+
+
+def validate_fragment(source: str, macros: Set[str]) -> ValidationResult:
+    """
+    The same brace, environment and macro checks for one piece of the document
+    body (e.g. a single section), given the macros the preamble defines.
+    """
+    text = _strip_comments(source)
+    return ValidationResult(_brace_errors(text) + _body_errors(text, macros))
+
+
+class LatexCompilerPool:
+    """
+    Bounded pool of pdflatex/tectonic subprocesses.
+
+    With pdflatex, the preamble (everything before \\begin{document}) is dumped once
+    into a format file via mylatexformat and reused by every job that shares it.
+    """
+
+    def __init__(self, engine: Optional[str] = None, workers: Optional[int] = None,
+                 timeout: float = 60.0, max_pages: Optional[int] = 1,
+                 work_dir: Optional[str] = None, use_format: bool = True):
+        self.engine = engine or ('pdflatex' if shutil.which('pdflatex') else 'tectonic')
+        self.workers = workers or os.cpu_count() or 2
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.use_format = use_format and self.engine == 'pdflatex'
+        self._owns_work_dir = work_dir is None
+        self.work_dir = Path(work_dir or tempfile.mkdtemp(prefix="autoapply-latex-"))
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._formats: dict = {}
+        self._format_lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        return shutil.which(self.engine) is not None
+
+    async def _run(self, args: List[str], cwd: Path, env: Optional[dict] = None) -> tuple:
+        process = await asyncio.create_subprocess_exec(
+            *args, cwd=str(cwd), env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        )
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, output.decode('utf-8', errors='replace')
+
+    async def _format_for(self, preamble: str) -> Optional[str]:
+        """Dump (once) and return the format name for this preamble, or None if dumping fails"""
+        digest = hashlib.sha256(preamble.encode('utf-8')).hexdigest()[:16]
+        async with self._format_lock:
+            if digest in self._formats:
+                return self._formats[digest]
+            name = f"preamble-{digest}"
+            fmt_dir = self.work_dir / "formats"
+            fmt_dir.mkdir(exist_ok=True)
+            (fmt_dir / f"{name}.tex").write_text(f"{preamble}{BEGIN_DOCUMENT}\n{END_DOCUMENT}\n", encoding='utf-8')
+            try:
+                code, output = await self._run(
+                    ['pdflatex', '-ini', '-interaction=nonstopmode', f'-jobname={name}',
+                     '&pdflatex', 'mylatexformat.ltx', f'{name}.tex'],
+                    fmt_dir,
+                )
+            except asyncio.TimeoutError:
+                code, output = -1, "timed out"
+            if code != 0 or not (fmt_dir / f"{name}.fmt").exists():
+                logger.warning(f"⚠️ Could not dump preamble format, compiling without it: {output[-300:]}")
+                self._formats[digest] = None
+            else:
+                logger.info(f"🧱 Dumped preamble format {name}")
+                self._formats[digest] = name
+            return self._formats[digest]
+
+    async def compile(self, source: str, validate: bool = True) -> CompileResult:
+        """Validate, compile and page-check one document"""
+        start = time.perf_counter()
+        if validate:
+            validation = validate_latex(source)
+            if not validation.ok:
+                return CompileResult(False, errors=validation.errors, duration=time.perf_counter() - start)
+        if not self.available:
+            return CompileResult(False, errors=[f"{self.engine} not found on PATH"])
+
+        async with self._semaphore:
+            job_dir = Path(tempfile.mkdtemp(prefix="job-", dir=self.work_dir))
+            try:
+                (job_dir / "resume.tex").write_text(source, encoding='utf-8')
+                env = None
+                if self.engine == 'pdflatex':
+                    args = ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', 'resume.tex']
+                    fmt = await self._format_for(source[:source.find(BEGIN_DOCUMENT)]) if self.use_format else None
+                    if fmt:
+                        env = {**os.environ, 'TEXFORMATS': f"{self.work_dir / 'formats'}{os.pathsep}"}
+                        args.insert(1, f'-fmt={fmt}')
+                else:
+                    args = ['tectonic', '--keep-logs', 'resume.tex']
+
+                try:
+                    code, output = await self._run(args, job_dir, env)
+                except asyncio.TimeoutError:
+                    return CompileResult(False, errors=[f"compile timed out after {self.timeout}s"],
+                                         duration=time.perf_counter() - start)
+
+                pdf_path = job_dir / "resume.pdf"
+                log_path = job_dir / "resume.log"
+                log = log_path.read_text(encoding='utf-8', errors='replace') if log_path.exists() else output
+                if code != 0 or not pdf_path.exists():
+                    errors = [line for line in log.splitlines() if line.startswith('!')] or [f"{self.engine} exited {code}"]
+                    return CompileResult(False, errors=errors, duration=time.perf_counter() - start,
+                                         log_tail=log[-2000:])
+
+                pdf = pdf_path.read_bytes()
+                pages_match = _PAGES_RE.search(log)
+                pages = int(pages_match.group(1)) if pages_match else len(_PDF_PAGE_RE.findall(pdf))
+                errors = []
+                if self.max_pages is not None and pages > self.max_pages:
+                    errors.append(f"document is {pages} pages, limit is {self.max_pages}")
+                return CompileResult(not errors, pdf=pdf, pages=pages, errors=errors,
+                                     duration=time.perf_counter() - start, log_tail=log[-2000:])
+            finally:
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+    def close(self) -> None:
+        """Remove dumped formats (and the work dir, if the pool created it)"""
+        if self._owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        else:
+            shutil.rmtree(self.work_dir / "formats", ignore_errors=True)
@@ -0,0 +1,216 @@
+"""
+LaTeX Resume Model - Parses the resume template into preamble, heading and sections
+
+The model keeps the original source of every part, so render() reproduces the
+input byte-for-byte and a tailored section can be spliced back in without
+touching the preamble.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple
+
+BEGIN_DOCUMENT = "\\begin{document}"
+END_DOCUMENT = "\\end{document}"
+
+# A section starts at its \section line, or at the comment banner right above it
+SECTION_RE = re.compile(r"^(?:[ \t]*%[^\n]*\n)?[ \t]*\\section\*?\{([^}]*)\}", re.MULTILINE)
+ENTRY_RE = re.compile(r"\\(resumeSubheading|resumeProjectHeading|resumeSubSubheading)(?![A-Za-z])")
+ITEM_RE = re.compile(r"\\resumeItem(?![A-Za-z])")
+
+ENTRY_ARITY = {'resumeSubheading': 4, 'resumeProjectHeading': 2, 'resumeSubSubheading': 2}
+
+
+class LatexParseError(ValueError):
+    """Raised when a template does not have the expected resume structure"""
+
+
+def read_group(source: str, pos: int) -> Tuple[str, int]:
+    """
+    Read one brace-delimited argument starting at or after pos (skipping whitespace).
+    Returns (contents, index just past the closing brace).
+    """
+    while pos < len(source) and source[pos].isspace():
+        pos += 1
+    if pos >= len(source) or source[pos] != '{':
+        raise LatexParseError(f"Expected '{{' at offset {pos}")
+    depth = 0
+    index = pos
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            # Skip the escaped character (\{, \}, \\, \%)
+            index += 2
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return source[pos + 1:index], index + 1
+        index += 1
+    raise LatexParseError(f"Unbalanced braces from offset {pos}")
+
+
+@dataclass
+class ResumeEntry:
+    """A \\resumeSubheading / \\resumeProjectHeading block and its bullets"""
+    kind: str
+    args: List[str]
+    items: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ResumeSection:
+    """One \\section{...} with its raw source and the entries parsed out of it"""
+    name: str
+    source: str
+    entries: List[ResumeEntry] = field(default_factory=list)
+    # Set instead of raising when the section was parsed leniently and is malformed
+    error: Optional[str] = None
+
+    @property
+    def items(self) -> List[str]:
+        return [item for entry in self.entries for item in entry.items]
+
+
+@dataclass
+class ResumeDocument:
+    """Typed view of a resume template"""
+    preamble: str
+    heading: str
+    sections: List[ResumeSection]
+    closing: str
+
+    def render(self) -> str:
+        return self.preamble + self.heading + ''.join(section.source for section in self.sections) + self.closing
+
+    def section(self, name: str) -> Optional[ResumeSection]:
+        for section in self.sections:
+            if section.name.lower() == name.lower():
+                return section
+        return None
+
+    def section_names(self) -> List[str]:
+        return [section.name for section in self.sections]
+
+    def with_sections(self, replacements: dict) -> "ResumeDocument":
+        """Copy of the document with the named sections' source swapped out"""
+        lowered = {name.lower(): source for name, source in replacements.items()}
+        sections = []
+        for section in self.sections:
+            source = lowered.get(section.name.lower())
+            sections.append(parse_section(section.name, source) if source is not None else section)
+        return ResumeDocument(self.preamble, self.heading, sections, self.closing)
+
+
+def parse_section(name: str, source: str) -> ResumeSection:
+    """Parse the entries and bullets out of a section's source"""
+    entries: List[ResumeEntry] = []
+    current: Optional[ResumeEntry] = None
+    pos = 0
+    while True:
+        entry_match = ENTRY_RE.search(source, pos)
+        item_match = ITEM_RE.search(source, pos)
+        if entry_match and (not item_match or entry_match.start() < item_match.start()):
+            kind = entry_match.group(1)
+            args, pos = [], entry_match.end()
+            for _ in range(ENTRY_ARITY[kind]):
+                arg, pos = read_group(source, pos)
+                args.append(arg.strip())
+            current = ResumeEntry(kind, args)
+            entries.append(current)
+        elif item_match:
+            item, pos = read_group(source, item_match.end())
+            if current is None:
+                current = ResumeEntry('items', [])
+                entries.append(current)
+            current.items.append(item.strip())
+        else:
+            break
+    return ResumeSection(name, source, entries)
+
+
+def parse_resume(source: str, strict: bool = True) -> ResumeDocument:
+    """
+    Split a LaTeX resume into preamble, heading block, sections and closing.
+    With strict=False a section whose entries cannot be parsed is kept with its
+    error set, so the rest of the document can still be inspected.
+    """
+    begin = source.find(BEGIN_DOCUMENT)
+    end = source.rfind(END_DOCUMENT)
+    if begin < 0 or end < begin:
+        raise LatexParseError("Template has no \\begin{document} ... \\end{document} body")
+    body_start = begin + len(BEGIN_DOCUMENT)
+    body = source[body_start:end]
+
+    matches = list(SECTION_RE.finditer(body))
+    if not matches:
+        raise LatexParseError("Template has no \\section commands")
+
+    sections = []
+    for index, match in enumerate(matches):
+        stop = matches[index + 1].start() if index + 1 < len(matches) else len(body)
+        name, section_source = match.group(1).strip(), body[match.start():stop]
+        try:
+            sections.append(parse_section(name, section_source))
+        except LatexParseError as e:
+            if strict:
+                raise
+            sections.append(ResumeSection(name, section_source, error=str(e)))
+
+    return ResumeDocument(
+        preamble=source[:body_start],
+        heading=body[:matches[0].start()],
+        sections=sections,
+        closing=source[end:],
+    )
+
+
+class LatexStreamCleaner:
+    """
+    Incremental version of ResumeOptimizer._clean_latex_response for streamed output.
+
+    feed() returns the text that is safe to emit so far: a leading ```latex fence is
+    dropped as soon as its line completes, and a trailing line that could still turn
+    out to be the closing fence (plus trailing whitespace) is held back until finish().
+    """
+
+    FENCE = "```"
+
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        if not self._started:
+            stripped = self._pending.lstrip()
+            if not stripped:
+                return ""
+            if stripped.startswith(self.FENCE) or self.FENCE.startswith(stripped):
+                newline = stripped.find("\n")
+                if newline < 0:
+                    return ""
+                stripped = stripped[newline + 1:]
+            self._started = True
+            self._pending = stripped
+
+        cut = len(self._pending.rstrip())
+        last_newline = self._pending.rfind("\n", 0, cut)
+        tail = self._pending[last_newline + 1:cut].strip()
+        if tail and (self.FENCE.startswith(tail) or tail.startswith(self.FENCE)):
+            # Hold back the whitespace before a possible closing fence too; finish() drops it
+            cut = len(self._pending[:max(last_newline, 0)].rstrip())
+        emitted, self._pending = self._pending[:cut], self._pending[cut:]
+        return emitted
+
+    def finish(self) -> str:
+        """Flush whatever is held back, minus a closing fence and trailing whitespace"""
+        if not self._started:
+            return ""
+        rest = self._pending.rstrip()
+        if rest.endswith(self.FENCE):
+            rest = rest[:rest.rfind("\n") + 1] if "\n" in rest else ""
+        self._pending = ""
+        return rest.rstrip()
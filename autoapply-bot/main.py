@@ -0,0 +1,386 @@
+"""
+AutoApply Bot - End-to-end pipeline: scrape -> dedupe -> analyze -> tailor -> ATS-optimize -> compile -> apply -> store
+
+Stages are connected by bounded asyncio queues, so a slow stage (usually Gemini
+or TeX) makes the stages before it wait instead of buffering without limit.
+Each stage has its own worker count and runs on the executor that suits it:
+network stages on the event loop, regex analysis in a process pool, disk work
+on threads. Per-stage queue depth and throughput are logged periodically.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator
+
+from application_automator import Applicant, ApplicationAutomator, ApplicationRequest
+from database import ApplicationStore, AsyncStoreWriter, INITIAL_JOB_STATUSES
+from gemini_client import GeminiClient, call_labels
+from job_scraper import JobScraper, JobPosting, GreenhouseAdapter, LeverAdapter, JsonFeedAdapter
+from latex_compiler import LatexCompilerPool
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from resume_optimizer import ResumeOptimizer, AtsBatcher
+from tech_extractor import default_taxonomy
+
+logger = logging.getLogger("autoapply.main")
+
+# Marks the end of the stream for one worker
+_STOP = object()
+
+# Stored job statuses dedupe lets through again: never finished, or tailoring failed
+RETRY_JOB_STATUSES = INITIAL_JOB_STATUSES + ('tailor_failed',)
+
+
+@dataclass
+class StageStats:
+    """Counters for one stage"""
+    processed: int = 0
+    dropped: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+    def snapshot(self, queue_depth: int) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            'queue': queue_depth,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'per_second': round(self.processed / elapsed, 2),
+            'busy_seconds': round(self.busy_seconds, 2),
+        }
+
+
+class Stage:
+    """
+    One pipeline step. `handler` is an async callable, or a plain function when
+    `executor` is given (it then runs via run_in_executor). Returning None drops
+    the item; exceptions are counted and the item is dropped.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Any], concurrency: int = 1,
+                 queue_size: int = 32, executor: Optional[Executor] = None):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.executor = executor
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = StageStats()
+
+    async def _call(self, item: Any) -> Any:
+        if self.executor is not None:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.handler, item)
+        return await self.handler(item)
+
+    async def worker(self, output: Optional[asyncio.Queue]) -> None:
+        while True:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            start = time.monotonic()
+            try:
+                result = await self._call(item)
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(f"❌ Stage {self.name} failed: {e}")
+                continue
+            finally:
+                self.stats.busy_seconds += time.monotonic() - start
+            if result is None:
+                self.stats.dropped += 1
+                continue
+            self.stats.processed += 1
+            if output is not None:
+                # Blocks when the next stage is behind: this is the backpressure
+                await output.put(result)
+
+
+class Pipeline:
+    """Runs stages in order, feeding the first from an async source, and drains on shutdown"""
+
+    def __init__(self, stages: List[Stage], report_interval: float = 10.0):
+        self.stages = stages
+        self.report_interval = report_interval
+        self.stopping = asyncio.Event()
+        self.source_stats = StageStats()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and throughput per stage"""
+        report = {'source': self.source_stats.snapshot(0)}
+        for stage in self.stages:
+            report[stage.name] = stage.stats.snapshot(stage.queue.qsize())
+        return report
+
+    def request_stop(self) -> None:
+        if not self.stopping.is_set():
+            logger.info("🛑 Shutdown requested; draining in-flight work")
+            self.stopping.set()
+
+    async def _feed(self, source: AsyncIterator[Any]) -> None:
+        """Pull from the source until it ends or a stop is requested (without waiting for the next item)"""
+        first = self.stages[0].queue
+        iterator = source.__aiter__()
+        stop_wait = asyncio.create_task(self.stopping.wait())
+        try:
+            while True:
+                next_item = asyncio.create_task(iterator.__anext__())
+                done, _ = await asyncio.wait({next_item, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if next_item not in done:
+                    next_item.cancel()
+                    await asyncio.gather(next_item, return_exceptions=True)
+                    break
+                try:
+                    item = next_item.result()
+                except StopAsyncIteration:
+                    break
+                self.source_stats.processed += 1
+                await first.put(item)
+        finally:
+            stop_wait.cancel()
+            aclose = getattr(iterator, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info(f"📊 {self.snapshot()}")
+
+    async def run(self, source: AsyncIterator[Any]) -> Dict[str, Dict[str, Any]]:
+        workers = []
+        for index, stage in enumerate(self.stages):
+            output = self.stages[index + 1].queue if index + 1 < len(self.stages) else None
+            workers.append([asyncio.create_task(stage.worker(output)) for _ in range(stage.concurrency)])
+        reporter = asyncio.create_task(self._report())
+        try:
+            await self._feed(source)
+            # Drain stage by stage: once every worker of a stage has seen _STOP,
+            # nothing more can reach the next stage, so it is told to stop too
+            for stage, stage_workers in zip(self.stages, workers):
+                for _ in range(stage.concurrency):
+                    await stage.queue.put(_STOP)
+                await asyncio.gather(*stage_workers)
+        finally:
+            reporter.cancel()
+            for task in (task for stage_workers in workers for task in stage_workers):
+                task.cancel()
+        report = self.snapshot()
+        logger.info(f"✅ Pipeline drained: {report}")
+        return report
+
+
+@dataclass
+class Application:
+    """The item that flows through the pipeline"""
+    posting: JobPosting
+    technologies: List[str] = field(default_factory=list)
+    tailored: Optional[str] = None
+    tailor_status: Optional[str] = None  # TailorResult.status: 'success', 'fallback' or 'error'
+    tailor_error: Optional[str] = None
+    ats: Optional[str] = None
+    compiled: Optional[bool] = None
+    pages: Optional[int] = None
+    pdf_path: Optional[str] = None
+    applied: Optional[bool] = None
+
+
+def analyze_application(application: Application) -> Application:
+    """
+    Process-pool stage: each worker process compiles the taxonomy once and reuses it.
+    The technologies found feed the tailor stage's overlap pre-filter.
+    """
+    application.technologies = list(default_taxonomy().scan(application.posting.description))
+    return application
+
+
+async def run_autoapply(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    api_key = os.environ['GEMINI_API_KEY']
+    sources = ([GreenhouseAdapter(token) for token in args.greenhouse]
+               + [LeverAdapter(company) for company in args.lever]
+               + [JsonFeedAdapter(url) for url in args.feed])
+    scraper = JobScraper(sources, args.scraper_state)
+
+    cache = ResponseCache(args.cache) if args.cache else None
+    client = GeminiClient(api_key, rate_limiter=RateLimiter(args.rpm, args.tpm), cache=cache,
+                          pool_size=args.tailor_workers + args.ats_workers)
+    optimizer = ResumeOptimizer(api_key, client=client)
+    ats_batcher = AtsBatcher(optimizer, max_items=args.ats_batch)
+    store = ApplicationStore(args.db)
+    template_id = store.register_template(optimizer.base_resume_template)
+    compiler = LatexCompilerPool(workers=args.compile_workers) if args.compile_dir else None
+    compile_dir = Path(args.compile_dir) if args.compile_dir else None
+    if compile_dir is not None:
+        compile_dir.mkdir(parents=True, exist_ok=True)
+    process_pool = ProcessPoolExecutor(max_workers=args.analyze_workers)
+    automator = None
+    if args.apply:
+        automator = ApplicationAutomator(Applicant.from_file(args.apply), pool_size=args.apply_workers,
+                                         mapping_cache=args.form_cache)
+
+    # Technologies the resume can speak to; jobs sharing fewer than --min-tech-overlap
+    # of them are skipped before any Gemini call is spent on them
+    inventory = {term for terms in optimizer.template_analysis.technologies.values() for term in terms}
+
+    async with client, optimizer, AsyncStoreWriter(store) as writer:
+        async def record_call(record: Dict[str, Any]) -> None:
+            # Latency and tokens of every Gemini call, for ApplicationStore.metrics_summary
+            await writer.put('metric', record)
+
+        client.add_call_listener(record_call)
+
+        async def dedupe(posting: JobPosting) -> Optional[Application]:
+            existing = await writer.run_in_thread(store.get_job, posting.content_hash)
+            # Jobs that never got past the queue (e.g. an interrupted run) or whose tailoring
+            # failed are picked up again
+            if existing is not None and existing['status'] not in RETRY_JOB_STATUSES:
+                return None
+            await writer.put('job', {'job_hash': posting.content_hash, 'company': posting.company,
+                                     'title': posting.title, 'url': posting.url,
+                                     'description': posting.description, 'status': 'queued'})
+            return Application(posting)
+
+        async def tailor(application: Application) -> Optional[Application]:
+            overlap = inventory.intersection(application.technologies)
+            if len(overlap) < args.min_tech_overlap:
+                logger.info(f"⏭️ Skipping {application.posting.title} at {application.posting.company}: "
+                            f"{len(overlap)} of {len(application.technologies)} technologies match the resume")
+                await writer.put('status', {'job_hash': application.posting.content_hash,
+                                            'status': 'skipped_low_match'})
+                return None
+            job = application.posting.to_job()
+            with call_labels(job_hash=application.posting.content_hash):
+                result = await optimizer.tailor_resume_with_status(job['job_description'], job['company_info'],
+                                                                   sections_only=args.sections)
+            application.tailored = result.content
+            application.tailor_status, application.tailor_error = result.status, result.error
+            return application
+
+        async def optimize(application: Application) -> Application:
+            # A fallback is the untouched template: nothing downstream should treat it as tailored
+            if application.tailor_status != 'success':
+                return application
+            application.ats = await ats_batcher.optimize(application.tailored)
+            return application
+
+        async def compile_pdf(application: Application) -> Application:
+            if application.ats is None:
+                return application
+            result = await compiler.compile(application.ats)
+            application.compiled, application.pages = result.ok, result.pages
+            if result.pdf is not None:
+                pdf_path = compile_dir / f"{application.posting.content_hash[:16]}.pdf"
+                pdf_path.write_bytes(result.pdf)
+                application.pdf_path = str(pdf_path)
+            return application
+
+        async def apply(application: Application) -> Application:
+            # Only resumes that compiled within the page limit are sent out
+            if application.compiled and application.pdf_path and application.posting.url:
+                result = await automator.submit(ApplicationRequest(
+                    application.posting.url, application.pdf_path, job_hash=application.posting.content_hash,
+                ))
+                application.applied = result.ok
+            return application
+
+        async def persist(application: Application) -> Application:
+            job_hash = application.posting.content_hash
+            resume_ids = await writer.run_in_thread(store.add_resumes, [{
+                'job_hash': job_hash, 'template_id': template_id, 'content': application.tailored,
+                'status': application.tailor_status, 'error': application.tailor_error,
+            }])
+            if application.ats is not None:
+                await writer.put('ats_version', {'resume_id': resume_ids[0], 'job_hash': job_hash,
+                                                 'template_id': template_id, 'content': application.ats})
+            if application.tailor_status != 'success':
+                status = 'tailor_failed'
+            elif application.applied is not None:
+                status = 'applied' if application.applied else 'apply_failed'
+            else:
+                status = 'ready' if application.compiled in (None, True) else 'compile_failed'
+            await writer.put('status', {'job_hash': job_hash, 'status': status})
+            return application
+
+        stages = [
+            Stage('dedupe', dedupe, concurrency=4),
+            Stage('analyze', analyze_application, concurrency=args.analyze_workers, executor=process_pool),
+            Stage('tailor', tailor, concurrency=args.tailor_workers),
+            # Each in-flight ATS request carries up to --ats-batch resumes
+            Stage('ats', optimize, concurrency=args.ats_workers * args.ats_batch),
+        ]
+        if compiler is not None:
+            stages.append(Stage('compile', compile_pdf, concurrency=compiler.workers))
+        if automator is not None:
+            stages.append(Stage('apply', apply, concurrency=automator.pool.size))
+        stages.append(Stage('store', persist, concurrency=2))
+
+        pipeline = Pipeline(stages, report_interval=args.report_interval)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, pipeline.request_stop)
+            except NotImplementedError:
+                pass
+
+        try:
+            if automator is not None:
+                await automator.start()
+            return await pipeline.run(scraper.scrape())
+        finally:
+            if automator is not None:
+                await automator.close()
+            process_pool.shutdown()
+            if compiler is not None:
+                compiler.close()
+            if cache is not None:
+                cache.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scrape jobs and produce tailored, ATS-optimized resumes")
+    parser.add_argument('--greenhouse', action='append', default=[], help="Greenhouse board token")
+    parser.add_argument('--lever', action='append', default=[], help="Lever company slug")
+    parser.add_argument('--feed', action='append', default=[], help="Generic JSON feed URL")
+    parser.add_argument('--db', default='autoapply.sqlite3', help="Application store path")
+    parser.add_argument('--scraper-state', default='scraper_state.json', help="Crawl state file")
+    parser.add_argument('--cache', default='gemini_cache.sqlite3', help="Gemini response cache ('' to disable)")
+    parser.add_argument('--sections', action='store_true', help="Tailor only the mutable sections")
+    parser.add_argument('--min-tech-overlap', type=int, default=1,
+                        help="Skip jobs sharing fewer technologies with the resume (0 tailors everything)")
+    parser.add_argument('--compile-dir', help="Compile resumes and write PDFs here")
+    parser.add_argument('--apply', metavar='APPLICANT_JSON',
+                        help="Submit compiled resumes with this applicant's details (needs --compile-dir)")
+    parser.add_argument('--form-cache', default='form_mappings.json', help="Learned form-field mappings")
+    parser.add_argument('--rpm', type=int, default=15, help="Gemini requests-per-minute quota")
+    parser.add_argument('--tpm', type=int, default=1_000_000, help="Gemini input tokens-per-minute quota")
+    parser.add_argument('--analyze-workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--tailor-workers', type=int, default=8)
+    parser.add_argument('--ats-workers', type=int, default=4)
+    parser.add_argument('--ats-batch', type=int, default=1,
+                        help="Max resumes per ATS request (1 disables); saves requests, not generation time")
+    parser.add_argument('--compile-workers', type=int, default=None)
+    parser.add_argument('--apply-workers', type=int, default=4, help="Warm browser contexts for submissions")
+    parser.add_argument('--report-interval', type=float, default=10.0, help="Seconds between stage reports")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if not os.getenv('GEMINI_API_KEY'):
+        sys.exit("Please set GEMINI_API_KEY environment variable")
+    if not (args.greenhouse or args.lever or args.feed):
+        sys.exit("Give at least one --greenhouse, --lever or --feed source")
+    if args.apply and not args.compile_dir:
+        sys.exit("--apply needs --compile-dir: only compiled PDFs can be attached")
+
+    asyncio.run(run_autoapply(args))
+
+
+if __name__ == "__main__":
+    main()
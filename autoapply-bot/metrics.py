@@ -0,0 +1,186 @@
+"""
+Metrics Module - In-process counters, latency histograms and timing spans
+
+A MetricsRegistry collects labelled counters and histograms from the Gemini
+client and the optimizer. It can be rendered in Prometheus text exposition
+format or as a JSON snapshot, and listeners (such as json_log_listener) see
+every span as it finishes, for structured logging.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator
+
+# Seconds; spans from sub-millisecond cleanup up to long Gemini generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Token counts per call; resumes and prompts sit in the low thousands
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _render_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound below which at least q of the observations fall (None past the last bucket)"""
+        for bound, total in self.cumulative():
+            if self.count and total >= q * self.count:
+                return bound
+        return None
+
+
+class MetricsRegistry:
+    """Thread-safe registry of labelled counters and histograms"""
+
+    def __init__(self, prefix: str = "autoapply"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels) -> None:
+        """Record value; buckets only apply when the series is first created"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener(event) for every finished span"""
+        self._listeners.append(listener)
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block into the '<name>_seconds' histogram. Works around awaits too.
+        The yielded dict can be used to add labels (e.g. an outcome) before exit.
+        """
+        extra: Dict[str, Any] = {}
+        start = time.perf_counter()
+        try:
+            yield extra
+        except BaseException:
+            extra.setdefault('outcome', 'error')
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            all_labels = {**labels, **extra}
+            self.observe(f"{name}_seconds", seconds, **all_labels)
+            if self._listeners:
+                event = {'event': 'span', 'name': name, 'seconds': round(seconds, 6), 'labels': all_labels}
+                for listener in self._listeners:
+                    listener(event)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_render_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, total in histogram.cumulative():
+                        lines.append(f"{metric}_bucket{_render_labels(key, ('le', f'{bound:g}'))} {total}")
+                    lines.append(f"{metric}_bucket{_render_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_render_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{_render_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable view: counters by label set, histograms summarized"""
+        with self._lock:
+            counters = {name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                        for name, series in sorted(self._counters.items())}
+            histograms = {
+                name: [{'labels': dict(key), 'count': h.count, 'sum': round(h.sum, 6),
+                        'p50': h.quantile(0.5), 'p95': h.quantile(0.95), 'p99': h.quantile(0.99)}
+                       for key, h in sorted(series.items())]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {'counters': counters, 'histograms': histograms}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def json_log_listener(logger: logging.Logger, level: int = logging.DEBUG) -> Callable[[Dict[str, Any]], None]:
+    """Listener that writes each span as one JSON log line"""
+    def listener(event: Dict[str, Any]) -> None:
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(event, default=str))
+    return listener
+
+
+_default_registry: Optional[MetricsRegistry] = None
+
+
+def default_registry() -> MetricsRegistry:
+    """Process-wide registry shared by every client and optimizer that is not given one"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = MetricsRegistry()
+    return _default_registry
@@ -0,0 +1,161 @@
+"""
+Prompt Builder Module - Token-budgeted prompt assembly for resume tailoring
+
+Scraped postings carry a lot of text Gemini does not need (EEO statements,
+benefits lists, footers, repeated lines). The builder strips that, caps the
+company block and trims the job description to fit a token budget, and reports
+the estimated size of every prompt it builds.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Headings that open a section we can drop wholesale; the whole heading must be one
+# of these, so job titles like "Privacy Engineer" or "Benefits Platform Lead" survive
+BOILERPLATE_HEADING_RE = re.compile(
+    r"equal (?:employment )?opportunity(?: employer)?|eeo(?: statement)?|(?:our )?benefits(?: (?:and|&) perks)?"
+    r"|perks(?: (?:and|&) benefits)?|what we offer|compensation(?: and| &) benefits|privacy(?: notice| policy)?"
+    r"|accommodations?|diversity(?:,| and| &) inclusion|legal(?: notice)?|disclaimer",
+    re.IGNORECASE,
+)
+
+# Lines that are boilerplate wherever they appear. Page chrome and footers must make
+# up the whole line; legal sentences are recognised by how they open. Requirement
+# lines that merely mention a word like "cookie" or "privacy" are kept
+BOILERPLATE_LINE_RE = re.compile(
+    r"(?:apply now|apply for this job|share this job|back to (?:all )?(?:jobs|search)"
+    r"|privacy (?:policy|notice)|cookie (?:policy|settings|preferences)|(?:accept|manage) (?:all )?cookies"
+    r"|powered by (?:greenhouse|lever|workday)|(?:©|copyright\b).*|.*\ball rights reserved)[\s.!:›»>]*"
+    r"|(?:[\w&.,'’ -]+ (?:is|are) (?:an? )?(?:proud )?equal (?:employment )?opportunity"
+    r"|(?:all )?qualified applicants will receive consideration"
+    r"|[\w&.,'’ -]+ participates? in e-verify"
+    r"|(?:if you (?:need|require)|to request) (?:an? )?(?:reasonable )?accommodation"
+    r"|pay transparency\b).*",
+    re.IGNORECASE,
+)
+
+_HEADING_MAX_CHARS = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local token estimate: one token per punctuation mark and roughly one per
+    four characters of each word, which tracks Gemini's tokenizer closely enough
+    for budgeting and quota accounting.
+    """
+    return sum(max(1, math.ceil(len(token) / 4)) for token in _TOKEN_RE.findall(text))
+
+
+def _is_heading(line: str) -> bool:
+    return len(line) <= _HEADING_MAX_CHARS and (line.endswith(':') or line.isupper() or line.istitle())
+
+
+def _heading_text(line: str) -> str:
+    """A heading without markdown markers or its trailing colon ("**Benefits:**" -> "Benefits")"""
+    return line.strip('#*-•_ ').rstrip(':').rstrip('*_ ')
+
+
+def compact_job_description(text: str) -> str:
+    """Drop boilerplate sections/lines and duplicate lines, collapsing whitespace"""
+    kept: List[str] = []
+    seen = set()
+    skipping = False
+    for raw_line in text.splitlines():
+        line = ' '.join(raw_line.split())
+        if not line:
+            continue
+        if _is_heading(line):
+            skipping = bool(BOILERPLATE_HEADING_RE.fullmatch(_heading_text(line)))
+            if skipping:
+                continue
+        elif skipping:
+            continue
+        if BOILERPLATE_LINE_RE.fullmatch(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return '\n'.join(kept)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep whole lines from the start of text until the budget is used up"""
+    kept: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return '\n'.join(kept)
+
+
+def render_company_context(company_info: Optional[Dict[str, Any]], max_field_chars: int = 120,
+                           max_values: int = 5) -> str:
+    """Company block for the prompt, with every field capped"""
+    if not company_info:
+        return ""
+
+    def cap(value: Any) -> str:
+        value = str(value)
+        return value if len(value) <= max_field_chars else value[:max_field_chars].rstrip() + "..."
+
+    values = [cap(value) for value in company_info.get('values', [])[:max_values]]
+    return f"""
+
+Company Information:
+- Company: {cap(company_info.get('company_name', 'Unknown'))}
+- Industry: {cap(company_info.get('industry', 'Technology'))}
+- Size: {cap(company_info.get('size', 'Unknown'))}
+- Values: {', '.join(values)}
+"""
+
+
+@dataclass
+class BuiltPrompt:
+    """An assembled prompt plus its size accounting"""
+    text: str
+    estimated_tokens: int
+    job_tokens_raw: int
+    job_tokens_sent: int
+
+    @property
+    def trimmed(self) -> bool:
+        return self.job_tokens_sent < self.job_tokens_raw
+
+
+class PromptBuilder:
+    """Assembles prefix + company block + job description + suffix within a token budget"""
+
+    def __init__(self, token_budget: Optional[int] = 6000, min_job_tokens: int = 256,
+                 compact: bool = True):
+        self.token_budget = token_budget
+        self.min_job_tokens = min_job_tokens
+        self.compact = compact
+
+    def build(self, prefix: str, suffix: str, job_description: str,
+              company_info: Optional[Dict[str, Any]] = None) -> BuiltPrompt:
+        company_context = render_company_context(company_info)
+        job_tokens_raw = estimate_tokens(job_description)
+        job = compact_job_description(job_description) if self.compact else job_description.strip()
+
+        fixed = f"{prefix}{company_context}\n\nJob Description:\n\n\n{suffix}"
+        fixed_tokens = estimate_tokens(fixed)
+        job_tokens = estimate_tokens(job)
+        if self.token_budget is not None:
+            allowance = max(self.min_job_tokens, self.token_budget - fixed_tokens)
+            if job_tokens > allowance:
+                job = truncate_to_tokens(job, allowance)
+                job_tokens = estimate_tokens(job)
+
+        text = (f"{prefix}{company_context}\n\n"
+                f"Job Description:\n{job}\n\n"
+                f"{suffix}")
+        return BuiltPrompt(text, fixed_tokens + job_tokens, job_tokens_raw, job_tokens)
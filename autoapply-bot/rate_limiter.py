@@ -0,0 +1,49 @@
+"""
+Rate Limiter Module - Token buckets sized to the Gemini quota (requests/min and tokens/min)
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to `capacity` tokens, refilled continuously at `rate` per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` tokens are available and take them"""
+        # A request larger than the bucket could never be served; clamp it so it waits for a full bucket
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter for Gemini calls"""
+
+    def __init__(self, requests_per_minute: int = 15, tokens_per_minute: Optional[int] = 1_000_000):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute else None
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Block until both one request slot and `tokens` input tokens fit in the quota"""
+        await self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
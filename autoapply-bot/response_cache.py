@@ -0,0 +1,136 @@
+"""
+Response Cache Module - Content-addressed cache for Gemini responses
+
+An in-memory LRU sits in front of a SQLite store so a re-run of a batch only
+hits the network for prompts it has not seen before.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger("autoapply.response_cache")
+
+
+def cache_key(api_url: str, prompt: str, generation_config: Dict[str, Any]) -> str:
+    """Hash of (model URL, prompt, generationConfig) - the key never contains the API key"""
+    material = json.dumps([api_url, prompt, generation_config], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Two-level LRU/TTL cache: bounded in-memory OrderedDict plus an optional SQLite file"""
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 512,
+                 max_disk_entries: int = 50_000, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed)")
+            self._db.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Look a key up in memory, then on disk; counts a hit or a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[0]
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl_seconds is not None:
+                self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            # Evict least recently used rows beyond the size limit
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
+            self._db.commit()
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async lookup; disk access runs off the event loop"""
+        if self._db is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, value: str) -> None:
+        if self._db is None:
+            self.put(key, value)
+        else:
+            await asyncio.to_thread(self.put, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
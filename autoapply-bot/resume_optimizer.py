@@ -3,22 +3,340 @@ Resume Optimizer Module - Integrates with your Chrome Extension's Gemini AI
 """
 
 import asyncio
+import functools
 import json
 import logging
 import os
-from typing import Optional, Dict, Any
-import aiohttp
+import re
+from typing import Optional, Dict, Any, List, Iterable, AsyncIterator, Union, Tuple
 from pathlib import Path
+from dataclasses import dataclass
+
+from ats_scorer import MatchScorer, select_top
+from gemini_client import GeminiClient, DEFAULT_API_URL, api_url_for, call_labels
+from invariant_guard import InvariantGuard, GuardReport
+from metrics import MetricsRegistry, TOKEN_BUCKETS
+from tech_extractor import TechTaxonomy, default_taxonomy
+from prompt_builder import PromptBuilder, BuiltPrompt, estimate_tokens
+from latex_model import BEGIN_DOCUMENT, ResumeDocument, LatexParseError, LatexStreamCleaner, parse_resume, parse_section
+from template_registry import TemplateRegistry
 
 logger = logging.getLogger("autoapply.resume_optimizer")
 
+TAILOR_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 8192,
+}
+
+# Sampling presets cycled through by generate_multiple_versions
+VERSION_GENERATION_CONFIGS = [
+    {"temperature": 0.4, "topK": 20, "topP": 0.85, "maxOutputTokens": 8192},
+    {"temperature": 0.7, "topK": 40, "topP": 0.95, "maxOutputTokens": 8192},
+    {"temperature": 1.0, "topK": 64, "topP": 0.98, "maxOutputTokens": 8192},
+]
+
+TAILOR_INSTRUCTIONS = """As an expert resume writer and ATS optimization specialist, please intelligently tailor the following LaTeX resume to match the job description. 
+
+CRITICAL ANALYSIS STEPS:
+1. **Extract Current Resume Assets**: Carefully analyze the existing resume to identify:
+   - All programming languages, frameworks, libraries, and technologies mentioned
+   - Project technologies and tools used (React, Node.js, Python, PyTorch, etc.)
+   - Existing skills from the Skills section
+   - Technical methodologies and approaches used in experience/projects
+   - Quantifiable achievements and metrics
+
+2. **Job Requirements Analysis**: Extract from the job description:
+   - Required programming languages and technologies
+   - Preferred frameworks and tools
+   - Specific skills and qualifications needed
+   - Industry-specific terminology and keywords
+
+3. **Strategic Enhancement**: Based on the analysis above:
+   - **Skills Section**: Reorganize and emphasize relevant technologies from the resume that match job requirements
+   - **Experience Bullets**: Rewrite to highlight relevant technologies and methodologies already present
+   - **Project Descriptions**: Emphasize project technologies that align with job requirements
+   - **Keyword Integration**: Naturally weave job description keywords using existing resume content as foundation
+   - **Technology Stacking**: If the resume shows experience with related technologies, subtly indicate familiarity with job-required ones
+
+FORMATTING REQUIREMENTS:
+- Keep the same LaTeX structure and formatting exactly
+- DO NOT change: graduation dates, company names, or position titles
+- MUST maximize content to fill exactly ONE PAGE
+- Maintain professional language and accuracy
+- Use quantifiable achievements and technical skills that match the role
+- Preserve all LaTeX document structure and commands
+
+ENHANCEMENT STRATEGY:
+- If resume shows Python experience and job requires Django, emphasize Python web development experience
+- If resume shows JavaScript and job needs TypeScript, highlight JavaScript expertise and modern frameworks
+- If resume shows ML experience (PyTorch/TensorFlow) and job needs data science, emphasize AI/ML project aspects
+- Reorganize Skills section to lead with most relevant technologies for this role
+- Rewrite experience bullets to showcase relevant technical accomplishments using existing projects as proof points"""
+
+# Sections regenerated by tailor_sections_for_job; the preamble and heading are reused verbatim
+MUTABLE_SECTIONS = ("Experience", "Projects", "Skills")
+
+SECTION_GENERATION_CONFIG = {**TAILOR_GENERATION_CONFIG, "maxOutputTokens": 4096}
+
+SECTION_MARKER_RE = re.compile(
+    r"^%%% BEGIN SECTION: (?P<name>[^\n]+?)[ \t]*\n(?P<body>.*?)^%%% END SECTION: (?P=name)[ \t]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+SECTION_INSTRUCTIONS = """As an expert resume writer and ATS optimization specialist, tailor the following sections of a LaTeX resume to match the job description.
+
+RULES:
+- Each section is wrapped in "%%% BEGIN SECTION: <name>" / "%%% END SECTION: <name>" marker lines; return every section with the same markers and nothing outside them
+- Keep each section's \\section line, list environments and custom resume macros (\\resumeSubheading, \\resumeProjectHeading, \\resumeItem, ...) exactly as used
+- DO NOT change: graduation dates, company names, or position titles
+- Keep roughly the same length per section so the resume still fills exactly ONE PAGE
+- Reorganize the Skills section to lead with the technologies most relevant to this role
+- Rewrite experience and project bullets to highlight relevant technologies already present, weaving in job keywords naturally
+- Maintain professional language and accuracy; enhance rather than fabricate"""
+
+REPAIR_INSTRUCTIONS = """Fix the listed problems in the following tailored sections of a LaTeX resume. Each section comes with its problems and the original (template) version.
+
+RULES:
+- Return every section wrapped in its "%%% BEGIN SECTION: <name>" / "%%% END SECTION: <name>" marker lines and nothing outside them
+- Copy the arguments of \\resumeSubheading, \\resumeSubSubheading and \\resumeProjectHeading (dates, company names, position titles, project names) exactly from the original version
+- Keep the \\section line, list environments and custom resume macros exactly as in the original version, with balanced braces
+- If a section grew too long, shorten it to about the original length so the resume still fits on ONE PAGE
+- Otherwise keep the tailored wording as it is"""
+
+# Repairs copy most of their input back, so sampling stays close to deterministic
+REPAIR_GENERATION_CONFIG = {**SECTION_GENERATION_CONFIG, "temperature": 0.2, "maxOutputTokens": 2048}
+
+TAILOR_CLOSING = "Please return ONLY the tailored LaTeX code. Make this resume perfectly aligned with the job requirements while building upon the existing skills and experience foundation:"
+
+ATS_INSTRUCTIONS = """Please intelligently optimize this LaTeX resume for Applicant Tracking Systems (ATS) while preserving and enhancing the existing content foundation.
+
+INTELLIGENT ATS OPTIMIZATION APPROACH:
+1. **Content Analysis**: Identify all existing technologies, skills, and achievements in the resume
+2. **ATS Enhancement**: Optimize structure and keywords while building upon existing content
+3. **Skill Amplification**: Use existing technical foundation to create ATS-friendly skill presentations
+
+ATS OPTIMIZATION STRATEGIES:
+- **Section Headers**: Ensure standard, ATS-readable section names (Skills, Experience, Projects, Education)
+- **Technology Keywords**: Extract and emphasize existing technologies from projects and experience
+- **Skill Organization**: Reorganize Skills section for optimal ATS parsing and keyword density
+- **Achievement Quantification**: Ensure all quantifiable metrics are clearly formatted
+- **Keyword Integration**: Naturally integrate industry-standard terms based on existing experience
+
+TECHNICAL REQUIREMENTS:
+- Use existing technical stack as foundation for keyword optimization
+- Maintain consistent formatting throughout for ATS parsing
+- Remove complex LaTeX formatting that might confuse ATS systems
+- Ensure proper keyword density without keyword stuffing
+- Keep the same overall structure and content length
+- Build upon existing achievements and technologies
+
+CONTENT ENHANCEMENT RULES:
+- Use existing project technologies to create comprehensive skill listings
+- Leverage current experience patterns for industry-standard terminology
+- Ensure all technical terms are industry-standard and ATS-recognizable
+- Maintain authenticity - enhance rather than fabricate
+
+"""
+
+ATS_GENERATION_CONFIG = {
+    "temperature": 0.3,  # Lower temperature for consistency
+    "topK": 20,
+    "topP": 0.8,
+    "maxOutputTokens": 8192,
+}
+
+# Several resumes (or sections) per request, answered as a JSON array
+ATS_BATCH_INSTRUCTIONS = """BATCH FORMAT:
+- You are given a JSON array of items, each {"id": <int>, "latex": <LaTeX resume or resume section>}
+- Optimize every item independently, applying all of the rules above to each
+- Respond with a JSON array containing one {"id": <same id>, "latex": <optimized LaTeX>} object per item
+- Return the complete LaTeX for each item, not a diff or a summary"""
+
+ATS_BATCH_GENERATION_CONFIG = {
+    **ATS_GENERATION_CONFIG,
+    "responseMimeType": "application/json",
+    "responseSchema": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {"id": {"type": "INTEGER"}, "latex": {"type": "STRING"}},
+            "required": ["id", "latex"],
+        },
+    },
+}
+
+
+class TailoringFallback(Exception):
+    """Gemini answered, but nothing usable could be made of the response"""
+
+
+@dataclass
+class TailorResult:
+    """Tailored content plus an explicit outcome: 'success', 'fallback' or 'error'"""
+    content: str
+    status: str
+    error: Optional[str] = None
+    # Invariant check of the tailored output (None when it was not checked)
+    guard: Optional[GuardReport] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'success'
+
+
+@dataclass
+class TemplateAnalysis:
+    """Everything derived from a base template that does not depend on the job"""
+    template: str
+    technologies: Dict[str, list]
+    tech_context: str
+    prompt_prefix: str
+    prompt_suffix: str
+    document: Optional[ResumeDocument] = None
+    guard: Optional[InvariantGuard] = None
+
+    @classmethod
+    def build(cls, template: str, taxonomy: TechTaxonomy) -> "TemplateAnalysis":
+        technologies = taxonomy.by_category(template)
+        tech_context = "\n\nCURRENT RESUME TECHNOLOGY INVENTORY:"
+        for category, techs in technologies.items():
+            if techs:
+                tech_context += f"\n- {category.replace('_', ' ').title()}: {', '.join(techs)}"
+        try:
+            document = parse_resume(template)
+        except LatexParseError as e:
+            logger.warning(f"⚠️ Template is not section-structured, section tailoring disabled: {e}")
+            document = None
+        return cls(
+            template=template,
+            technologies=technologies,
+            tech_context=tech_context,
+            prompt_prefix=f"{TAILOR_INSTRUCTIONS}\n\n{tech_context}\n\n",
+            prompt_suffix=f"Current Resume (LaTeX):\n{template}\n\n{TAILOR_CLOSING}",
+            document=document,
+            guard=InvariantGuard(document) if document is not None else None,
+        )
+
+
 class ResumeOptimizer:
     """Enhanced Resume Optimizer that integrates with your Chrome Extension"""
     
-    def __init__(self, gemini_api_key: str):
+    def __init__(self, gemini_api_key: str, client: Optional[GeminiClient] = None,
+                 taxonomy: Optional[TechTaxonomy] = None, prompt_builder: Optional[PromptBuilder] = None,
+                 base_url: Optional[str] = None, templates: Union[str, TemplateRegistry, None] = None,
+                 **client_options):
+        """
+        Args:
+            gemini_api_key: Gemini API key
+            client: Optional shared GeminiClient; when omitted the optimizer owns one
+            taxonomy: Technology taxonomy for extraction (defaults to tech_taxonomy.json)
+            prompt_builder: Prompt assembly/token budget settings (defaults to a 6000-token budget)
+            base_url: Send requests to this host instead of Google's (a local stub or proxy);
+                only used for the owned client
+            templates: Directory of per-profile `<name>.tex` templates (or a shared
+                TemplateRegistry); profiles are loaded on first use. Without a profile
+                the built-in base template is used.
+            **client_options: Pool/timeout settings forwarded to the owned GeminiClient
+                (pool_size, keepalive_timeout, dns_cache_ttl, total_timeout, connect_timeout)
+        """
         self.api_key = gemini_api_key
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+        if client is not None:
+            self.api_url = client.api_url
+        else:
+            self.api_url = api_url_for(base_url) if base_url else DEFAULT_API_URL
+        self._owns_client = client is None
+        self.client = client or GeminiClient(gemini_api_key, self.api_url, **client_options)
+        self.taxonomy = taxonomy or default_taxonomy()
+        # Spans and counters land in the client's registry, next to the HTTP metrics
+        self.metrics: MetricsRegistry = self.client.metrics
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.prompt_metrics = {'prompts': 0, 'estimated_tokens_total': 0,
+                               'last_estimated_tokens': 0, 'trimmed_job_descriptions': 0}
+        self._analysis: Optional[TemplateAnalysis] = None
+        self._scorer: Optional[MatchScorer] = None
+        # Check tailored output against the template and repair offending sections
+        self.enforce_invariants = True
         self.base_resume_template = self._load_base_resume()
+        self.templates = templates if isinstance(templates, TemplateRegistry) else TemplateRegistry(templates)
+        if self.templates.analyzer is None:
+            self.templates.analyzer = lambda template: TemplateAnalysis.build(template, self.taxonomy)
+
+    @property
+    def base_resume_template(self) -> str:
+        return self._base_resume_template
+
+    @base_resume_template.setter
+    def base_resume_template(self, template: str) -> None:
+        # Swapping the template invalidates the cached analysis
+        self._base_resume_template = template
+        self._analysis = None
+        self._scorer = None
+
+    @property
+    def template_analysis(self) -> TemplateAnalysis:
+        """Parsed base template (technology inventory, prompt prefix/suffix), built once per template"""
+        if self._analysis is None:
+            self._analysis = TemplateAnalysis.build(self._base_resume_template, self.taxonomy)
+        return self._analysis
+
+    def analysis_for(self, profile: Optional[str] = None) -> TemplateAnalysis:
+        """Template analysis for a profile (the base template when profile is None)"""
+        if profile is None:
+            return self.template_analysis
+        return self.templates.get(profile).analysis
+
+    @property
+    def match_scorer(self) -> MatchScorer:
+        """Local ATS match scorer over the template's technology inventory"""
+        if self._scorer is None:
+            self._scorer = self._build_scorer(self.template_analysis)
+        return self._scorer
+
+    def scorer_for(self, profile: Optional[str] = None) -> MatchScorer:
+        """Match scorer for a profile, cached alongside the loaded profile"""
+        if profile is None:
+            return self.match_scorer
+        entry = self.templates.get(profile)
+        scorer = entry.extras.get('match_scorer')
+        if scorer is None:
+            scorer = entry.extras['match_scorer'] = self._build_scorer(entry.analysis)
+        return scorer
+
+    def _build_scorer(self, analysis: TemplateAnalysis) -> MatchScorer:
+        inventory = [term for terms in analysis.technologies.values() for term in terms]
+        return MatchScorer(inventory, self.taxonomy)
+
+    def select_jobs(self, jobs: List[Dict[str, Any]], min_score: Optional[float] = None,
+                    top_k: Optional[int] = None, profile: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rank jobs by local match score (no API calls), best first, keeping those at or
+        above min_score and at most top_k. Each kept job gets a 'match_score' key.
+        """
+        scores = self.scorer_for(profile).score_postings([job['job_description'] for job in jobs])['score']
+        selected = select_top(scores, min_score, top_k)
+        logger.info(f"🎯 Selected {len(selected)}/{len(jobs)} job(s) by match score")
+        return [{**jobs[index], 'match_score': round(float(scores[index]), 4)} for index in selected]
+
+    def rank_versions(self, job_description: str, versions: List[Dict[str, Any]],
+                      profile: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Score generated versions against the job locally and return them best first"""
+        scores = self.scorer_for(profile).score_variants(job_description, [version['content'] for version in versions])
+        ranked = [{**version, 'match_score': round(float(score), 4)} for version, score in zip(versions, scores)]
+        return sorted(ranked, key=lambda version: -version['match_score'])
+
+    async def __aenter__(self) -> "ResumeOptimizer":
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Release the pooled Gemini connections (only if this optimizer owns the client)"""
+        if self._owns_client:
+            await self.client.close()
         
     def _load_base_resume(self) -> str:
         """Load the base resume template (same as your extension)"""
@@ -214,163 +532,287 @@ class ResumeOptimizer:
 \\end{document}
 """
     
-    async def tailor_resume_for_job(self, job_description: str, company_info: Dict[str, Any] = None) -> str:
+    async def tailor_resume_for_job(self, job_description: str, company_info: Dict[str, Any] = None,
+                                    generation_config: Optional[Dict[str, Any]] = None,
+                                    bypass_cache: bool = False, profile: Optional[str] = None) -> str:
         """
         Tailor resume for specific job using Gemini AI with intelligent technology extraction
         Same logic as your Chrome extension but enhanced
+
+        generation_config overrides the default sampling settings (temperature/topK/topP);
+        bypass_cache skips the response cache when a fresh sample is wanted. On failure the
+        base template is returned; use tailor_resume_with_status to tell the cases apart.
+        profile selects a template from the registry instead of the base template.
+        """
+        result = await self.tailor_resume_with_status(job_description, company_info, generation_config,
+                                                      bypass_cache, profile=profile)
+        return result.content
+
+    async def tailor_resume_with_status(self, job_description: str, company_info: Dict[str, Any] = None,
+                                        generation_config: Optional[Dict[str, Any]] = None,
+                                        bypass_cache: bool = False, sections_only: bool = False,
+                                        profile: Optional[str] = None,
+                                        sections: Iterable[str] = MUTABLE_SECTIONS) -> TailorResult:
+        """
+        Tailor a resume and report how it went: 'success', 'fallback' (Gemini answered but the
+        output was unusable) or 'error' (the call itself failed). Both non-success statuses carry
+        the profile's template as content. An unknown or unloadable profile raises KeyError.
+        With sections_only, only the named sections are regenerated.
+
+        Successful output is checked against the template's invariants (see invariant_guard);
+        offending sections get one small repair request and the report is attached as .guard.
+        """
+        analysis = self.analysis_for(profile)
+        if sections_only:
+            tailor = functools.partial(self._tailor_sections, sections=sections)
+        else:
+            tailor = self._tailor_full
+        mode = 'sections' if sections_only else 'full'
+        with self.metrics.span('tailor', mode=mode) as span:
+            try:
+                content = await tailor(analysis, job_description, company_info, generation_config, bypass_cache)
+                content, report = await self._enforce_invariants(analysis, content, bypass_cache)
+                result = TailorResult(content, 'success', guard=report)
+            except TailoringFallback as e:
+                logger.warning(f"⚠️ Falling back to base resume: {str(e)}")
+                result = TailorResult(analysis.template, 'fallback', str(e))
+            except Exception as e:
+                logger.error(f"❌ Error tailoring resume: {str(e)}")
+                # Return original template as fallback
+                result = TailorResult(analysis.template, 'error', str(e))
+            span['outcome'] = result.status
+        self.metrics.inc('tailor_results_total', mode=mode, status=result.status)
+        return result
+
+    async def _tailor_full(self, analysis: TemplateAnalysis, job_description: str,
+                           company_info: Optional[Dict[str, Any]],
+                           generation_config: Optional[Dict[str, Any]], bypass_cache: bool) -> str:
+        prompt = self._build_prompt(analysis.prompt_prefix, analysis.prompt_suffix,
+                                    job_description, company_info)
+
+        # Make API call to Gemini over the pooled client
+        with call_labels(operation='tailor'):
+            tailored_content = await self.client.generate(
+                prompt, {**TAILOR_GENERATION_CONFIG, **(generation_config or {})}, bypass_cache=bypass_cache
+            )
+        if not tailored_content:
+            raise TailoringFallback("No content received from Gemini API")
+
+        # Clean up the response
+        cleaned_content = self._clean_latex_response(tailored_content)
+        logger.info("✅ Successfully tailored resume with AI")
+        return cleaned_content
+    
+    async def stream_tailored_resume(self, job_description: str, company_info: Dict[str, Any] = None,
+                                     generation_config: Optional[Dict[str, Any]] = None,
+                                     max_chars: Optional[int] = None,
+                                     profile: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream the tailored resume as Gemini generates it, yielding cleaned LaTeX fragments.
+
+        Code fences are stripped incrementally, so consumers can start validating or
+        rendering before the full completion arrives. Generation is aborted once
+        max_chars have been produced. Errors are raised rather than replaced by the
+        base template, since part of the document may already have been consumed.
         """
+        analysis = self.analysis_for(profile)
+        prompt = self._build_prompt(analysis.prompt_prefix, analysis.prompt_suffix, job_description, company_info)
+        cleaner = LatexStreamCleaner()
+        produced = 0
+        with call_labels(operation='tailor_stream'):
+            stream = self.client.stream_generate(prompt, {**TAILOR_GENERATION_CONFIG, **(generation_config or {})})
         try:
-            # Extract existing technologies from the resume
-            current_technologies = self._extract_resume_technologies(self.base_resume_template)
-            
-            # Create technology context for the prompt
-            tech_context = "\n\nCURRENT RESUME TECHNOLOGY INVENTORY:"
-            for category, techs in current_technologies.items():
-                if techs:
-                    tech_context += f"\n- {category.replace('_', ' ').title()}: {', '.join(techs)}"
-            
-            # Enhanced prompt with company research
-            company_context = ""
-            if company_info:
-                company_context = f"""
-                
-Company Information:
-- Company: {company_info.get('company_name', 'Unknown')}
-- Industry: {company_info.get('industry', 'Technology')}
-- Size: {company_info.get('size', 'Unknown')}
-- Values: {', '.join(company_info.get('values', []))}
-"""
-            
-            prompt = f"""As an expert resume writer and ATS optimization specialist, please intelligently tailor the following LaTeX resume to match the job description. 
+            async for fragment in stream:
+                produced += len(fragment)
+                if max_chars is not None and produced > max_chars:
+                    logger.warning(f"🛑 Aborting runaway generation after {produced} characters")
+                    return
+                text = cleaner.feed(fragment)
+                if text:
+                    yield text
+            tail = cleaner.finish()
+            if tail:
+                yield tail
+        finally:
+            await stream.aclose()
 
-CRITICAL ANALYSIS STEPS:
-1. **Extract Current Resume Assets**: Carefully analyze the existing resume to identify:
-   - All programming languages, frameworks, libraries, and technologies mentioned
-   - Project technologies and tools used (React, Node.js, Python, PyTorch, etc.)
-   - Existing skills from the Skills section
-   - Technical methodologies and approaches used in experience/projects
-   - Quantifiable achievements and metrics
+    def _build_prompt(self, prefix: str, suffix: str, job_description: str,
+                      company_info: Optional[Dict[str, Any]]) -> str:
+        """Assemble a prompt within the token budget and record its estimated size"""
+        with self.metrics.span('prompt_build'):
+            built: BuiltPrompt = self.prompt_builder.build(prefix, suffix, job_description, company_info)
+        self.metrics.observe('prompt_estimated_tokens', built.estimated_tokens, TOKEN_BUCKETS)
+        self.prompt_metrics['prompts'] += 1
+        self.prompt_metrics['estimated_tokens_total'] += built.estimated_tokens
+        self.prompt_metrics['last_estimated_tokens'] = built.estimated_tokens
+        if built.trimmed:
+            self.prompt_metrics['trimmed_job_descriptions'] += 1
+        logger.info(f"📏 Prompt ~{built.estimated_tokens} tokens "
+                    f"(job description {built.job_tokens_raw} -> {built.job_tokens_sent})")
+        return built.text
 
-2. **Job Requirements Analysis**: Extract from the job description:
-   - Required programming languages and technologies
-   - Preferred frameworks and tools
-   - Specific skills and qualifications needed
-   - Industry-specific terminology and keywords
+    async def tailor_sections_for_job(self, job_description: str, company_info: Dict[str, Any] = None,
+                                      sections: Iterable[str] = MUTABLE_SECTIONS,
+                                      generation_config: Optional[Dict[str, Any]] = None,
+                                      bypass_cache: bool = False, profile: Optional[str] = None) -> str:
+        """
+        Tailor only the given sections (MUTABLE_SECTIONS by default) of the resume and splice
+        them back into the cached preamble and heading. Sends and regenerates a fraction of the
+        tokens of tailor_resume_for_job; falls back to it when the template has no section structure.
+        """
+        result = await self.tailor_resume_with_status(job_description, company_info, generation_config,
+                                                      bypass_cache, sections_only=True, profile=profile,
+                                                      sections=sections)
+        return result.content
 
-3. **Strategic Enhancement**: Based on the analysis above:
-   - **Skills Section**: Reorganize and emphasize relevant technologies from the resume that match job requirements
-   - **Experience Bullets**: Rewrite to highlight relevant technologies and methodologies already present
-   - **Project Descriptions**: Emphasize project technologies that align with job requirements
-   - **Keyword Integration**: Naturally weave job description keywords using existing resume content as foundation
-   - **Technology Stacking**: If the resume shows experience with related technologies, subtly indicate familiarity with job-required ones
+    async def _tailor_sections(self, analysis: TemplateAnalysis, job_description: str,
+                               company_info: Optional[Dict[str, Any]],
+                               generation_config: Optional[Dict[str, Any]], bypass_cache: bool,
+                               sections: Iterable[str] = MUTABLE_SECTIONS) -> str:
+        document = analysis.document
+        if document is None:
+            return await self._tailor_full(analysis, job_description, company_info, generation_config, bypass_cache)
 
-FORMATTING REQUIREMENTS:
-- Keep the same LaTeX structure and formatting exactly
-- DO NOT change: graduation dates, company names, or position titles
-- MUST maximize content to fill exactly ONE PAGE
-- Maintain professional language and accuracy
-- Use quantifiable achievements and technical skills that match the role
-- Preserve all LaTeX document structure and commands
+        sections = list(sections)
+        targets = [document.section(name) for name in sections]
+        targets = [section for section in targets if section is not None]
+        if not targets:
+            raise TailoringFallback(f"Template has none of the sections {sections}")
 
-ENHANCEMENT STRATEGY:
-- If resume shows Python experience and job requires Django, emphasize Python web development experience
-- If resume shows JavaScript and job needs TypeScript, highlight JavaScript expertise and modern frameworks
-- If resume shows ML experience (PyTorch/TensorFlow) and job needs data science, emphasize AI/ML project aspects
-- Reorganize Skills section to lead with most relevant technologies for this role
-- Rewrite experience bullets to showcase relevant technical accomplishments using existing projects as proof points
-
-{tech_context}
-
-{company_context}
-
-Job Description:
-{job_description}
-
-Current Resume (LaTeX):
-{self.base_resume_template}
-
-Please return ONLY the tailored LaTeX code. Make this resume perfectly aligned with the job requirements while building upon the existing skills and experience foundation:"""
-
-            # Make API call to Gemini
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.7,
-                        "topK": 40,
-                        "topP": 0.95,
-                        "maxOutputTokens": 8192,
-                    }
-                }
-                
-                headers = {
-                    'Content-Type': 'application/json',
-                }
-                
-                url = f"{self.api_url}?key={self.api_key}"
-                
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        tailored_content = data.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
-                        
-                        if tailored_content:
-                            # Clean up the response
-                            cleaned_content = self._clean_latex_response(tailored_content)
-                            logger.info("✅ Successfully tailored resume with AI")
-                            return cleaned_content
-                        else:
-                            raise Exception("No content received from Gemini API")
-                    else:
-                        error_data = await response.json()
-                        raise Exception(f"Gemini API error: {error_data}")
-                        
-        except Exception as e:
-            logger.error(f"❌ Error tailoring resume: {str(e)}")
-            # Return original template as fallback
-            return self.base_resume_template
+        blocks = "\n\n".join(
+            f"%%% BEGIN SECTION: {section.name}\n{section.source.strip()}\n%%% END SECTION: {section.name}"
+            for section in targets
+        )
+        prompt = self._build_prompt(
+            f"{SECTION_INSTRUCTIONS}\n\n{analysis.tech_context}\n\n",
+            f"Resume sections (LaTeX):\n{blocks}\n\nReturn ONLY the tailored sections with their markers:",
+            job_description, company_info,
+        )
+
+        with call_labels(operation='tailor_sections'):
+            response = await self.client.generate(
+                prompt, {**SECTION_GENERATION_CONFIG, **(generation_config or {})}, bypass_cache=bypass_cache
+            )
+        replacements = {}
+        for match in SECTION_MARKER_RE.finditer(self._clean_latex_response(response)):
+            original = document.section(match.group('name'))
+            body = match.group('body').strip()
+            if original is not None and original in targets and '\\section' in body:
+                # Keep the original's surrounding whitespace so the splice stays tidy
+                trailing = original.source[len(original.source.rstrip()):]
+                replacements[original.name] = body + trailing
+
+        if not replacements:
+            raise TailoringFallback("No tailored sections found in Gemini response")
+        missing = [section.name for section in targets if section.name not in replacements]
+        if missing:
+            logger.warning(f"⚠️ Gemini skipped sections {missing}; keeping the originals")
+
+        logger.info(f"✅ Tailored {len(replacements)} resume section(s) with AI")
+        return document.with_sections(replacements).render()
     
+    async def _enforce_invariants(self, analysis: TemplateAnalysis, content: str,
+                                  bypass_cache: bool) -> Tuple[str, Optional[GuardReport]]:
+        """
+        Check tailored output locally. Heading/preamble/section-set drift is undone from the
+        template; sections breaking protected fields, structure or length (their own or the
+        document's budget) go into a single repair request, and any still broken afterwards
+        are reverted to the template's.
+        """
+        guard = analysis.guard
+        if guard is None or not self.enforce_invariants:
+            return content, None
+        with self.metrics.span('guard_check'):
+            try:
+                document, report = guard.check(content)
+            except LatexParseError as e:
+                raise TailoringFallback(f"Tailored output has no resume structure: {e}")
+        for violation in report.violations:
+            self.metrics.inc('guard_violations_total', kind=violation.kind)
+
+        if report.ok:
+            result = content
+        else:
+            offending = report.offending_sections
+            if offending:
+                replacements = await self._repair_sections(guard, document, report, offending, bypass_cache)
+                document = document.with_sections(replacements)
+            # Repairs are accepted section by section; the length budget is for the whole document
+            for name in guard.over_budget(document.sections):
+                document = document.with_sections({name: guard.template.section(name).source})
+                if name in report.repaired:
+                    report.repaired.remove(name)
+                report.reverted.append(name)
+                self.metrics.inc('guard_sections_total', result='reverted_budget')
+            result = document.render()
+            logger.warning(f"🛡️ Invariant guard: {len(report.violations)} violation(s), restored {report.restored}, "
+                           f"repaired {report.repaired}, reverted {report.reverted}")
+        self.metrics.inc('guard_results_total', outcome=report.outcome)
+        return result, report
+
+    async def _repair_sections(self, guard: InvariantGuard, document: ResumeDocument, report: GuardReport,
+                               names: List[str], bypass_cache: bool) -> Dict[str, str]:
+        """One repair request for just the offending sections; returns name -> section source"""
+        blocks = []
+        for name in names:
+            problems = "\n".join(f"- {violation.message}" for violation in report.for_section(name))
+            blocks.append(
+                f"Problems in {name}:\n{problems}\n\n"
+                f"Original version:\n{guard.template.section(name).source.strip()}\n\n"
+                f"Tailored version to fix:\n%%% BEGIN SECTION: {name}\n{document.section(name).source.strip()}\n"
+                f"%%% END SECTION: {name}"
+            )
+        prompt = f"{REPAIR_INSTRUCTIONS}\n\n" + "\n\n".join(blocks) + "\n\nReturn ONLY the fixed sections with their markers:"
+        self.metrics.observe('repair_prompt_estimated_tokens', estimate_tokens(prompt), buckets=TOKEN_BUCKETS)
+
+        repaired: Dict[str, str] = {}
+        with self.metrics.span('guard_repair', sections=len(names)) as span:
+            try:
+                with call_labels(operation='repair'):
+                    response = await self.client.generate(prompt, REPAIR_GENERATION_CONFIG, bypass_cache=bypass_cache)
+            except Exception as e:
+                logger.warning(f"⚠️ Section repair request failed: {str(e)}")
+                response = None
+                span['outcome'] = 'error'
+            wanted = {name.lower(): name for name in names}
+            for match in SECTION_MARKER_RE.finditer(self._clean_latex_response(response or '')):
+                name = wanted.get(match.group('name').strip().lower())
+                if name is None or name in repaired:
+                    continue
+                current = document.section(name).source
+                source = match.group('body').strip() + current[len(current.rstrip()):]
+                try:
+                    section = parse_section(name, source)
+                except LatexParseError:
+                    continue
+                if not guard.check_section(name, section):
+                    repaired[name] = source
+
+        replacements = {}
+        for name in names:
+            if name in repaired:
+                replacements[name] = repaired[name]
+                report.repaired.append(name)
+            else:
+                # Still broken: the template's section is always valid
+                replacements[name] = guard.template.section(name).source
+                report.reverted.append(name)
+            self.metrics.inc('guard_sections_total', result='repaired' if name in repaired else 'reverted')
+        return replacements
+
     def _extract_resume_technologies(self, resume_content: str) -> Dict[str, list]:
         """
         Extract technologies, skills, and tools from the existing resume
         """
-        import re
-        
-        technologies = {
-            'programming_languages': [],
-            'web_technologies': [],
-            'frameworks_libraries': [],
-            'databases': [],
-            'ai_ml_tools': [],
-            'cloud_platforms': [],
-            'tools_software': [],
-            'methodologies': []
-        }
-        
-        # Common technology patterns to look for
-        tech_patterns = {
-            'programming_languages': r'\b(Python|Java|JavaScript|TypeScript|C\+\+|C|C#|Go|Rust|Swift|Kotlin|PHP|Ruby|Scala|R|MATLAB|SQL)\b',
-            'web_technologies': r'\b(React|Angular|Vue\.js|Node\.js|Express|Flask|Django|HTML|CSS|SASS|SCSS|Bootstrap|Tailwind|jQuery)\b',
-            'frameworks_libraries': r'\b(PyTorch|TensorFlow|Pandas|NumPy|Selenium|YOLOv3|CLIP|CLAP|RoBERTa|DistilBERT|wav2vec2|Faiss|Spring|Laravel|Rails)\b',
-            'databases': r'\b(PostgreSQL|MySQL|MongoDB|Redis|SQLite|Oracle|SQL Server|Cassandra|DynamoDB)\b',
-            'ai_ml_tools': r'\b(PyTorch|TensorFlow|Keras|scikit-learn|OpenCV|NLTK|spaCy|Hugging Face|BERT|GPT|CLIP|YOLO)\b',
-            'cloud_platforms': r'\b(AWS|Azure|Google Cloud|GCP|Docker|Kubernetes|Jenkins|Git|GitHub|GitLab)\b',
-            'tools_software': r'\b(Git|Docker|Jenkins|VS Code|IntelliJ|Eclipse|Jira|Confluence|Slack|Teams)\b',
-            'methodologies': r'\b(Agile|Scrum|DevOps|CI/CD|REST|GraphQL|API|Microservices|ETL|RBAC|JWT)\b'
-        }
-        
-        for category, pattern in tech_patterns.items():
-            matches = re.findall(pattern, resume_content, re.IGNORECASE)
-            technologies[category] = list(set(matches))  # Remove duplicates
-        
-        return technologies
+        return self.taxonomy.by_category(resume_content)
     
     def _clean_latex_response(self, content: str) -> str:
         """Clean up AI response to extract pure LaTeX"""
+        with self.metrics.span('clean_latex'):
+            return self._strip_code_fences(content)
+
+    @staticmethod
+    def _strip_code_fences(content: str) -> str:
         # Remove markdown code blocks if present
         cleaned = content.strip()
         
@@ -385,88 +827,265 @@ Please return ONLY the tailored LaTeX code. Make this resume perfectly aligned w
             
         return cleaned.strip()
     
-    async def generate_multiple_versions(self, job_description: str, company_info: Dict[str, Any] = None, count: int = 3) -> list:
-        """Generate multiple resume versions for A/B testing"""
+    async def generate_multiple_versions(self, job_description: str, company_info: Dict[str, Any] = None,
+                                         count: int = 3, generation_configs: Optional[List[Dict[str, Any]]] = None,
+                                         max_concurrency: int = 3, profile: Optional[str] = None) -> list:
+        """
+        Generate multiple resume versions for A/B testing
+
+        Versions are requested concurrently (at most max_concurrency in flight), each
+        with its own generationConfig. Identical outputs are collapsed into one version,
+        and a request that fell back to the base template yields no version at all, so
+        the list may be shorter than count (or empty).
+        """
+        configs = generation_configs or VERSION_GENERATION_CONFIGS
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def generate(index: int) -> Dict[str, Any]:
+            config = configs[index % len(configs)]
+            async with semaphore:
+                # Repeated presets would just replay the cached sample, so ask for a fresh one
+                result = await self.tailor_resume_with_status(job_description, company_info, generation_config=config,
+                                                              bypass_cache=index >= len(configs), profile=profile)
+            return {'config': config, 'content': result.content, 'status': result.status}
+
+        results = await asyncio.gather(*(generate(i) for i in range(count)))
+
+        failed = [result for result in results if result['status'] != 'success']
+        if failed:
+            logger.warning(f"⚠️ Skipped {len(failed)} resume version(s) that fell back to the base template")
+
         versions = []
-        
-        for i in range(count):
-            # Vary the temperature and approach for different versions
-            version = await self.tailor_resume_for_job(job_description, company_info)
+        seen = set()
+        for result in results:
+            if result['status'] != 'success':
+                continue
+            if result['content'] in seen:
+                continue
+            seen.add(result['content'])
             versions.append({
-                'version': i + 1,
-                'content': version,
-                'approach': f'version_{i+1}'
+                'version': len(versions) + 1,
+                'content': result['content'],
+                'approach': f"temperature_{result['config'].get('temperature')}",
+                'generation_config': result['config'],
             })
-            
+
+        duplicates = count - len(failed) - len(versions)
+        if duplicates:
+            logger.info(f"♻️ Dropped {duplicates} duplicate resume version(s)")
         return versions
     
-    async def optimize_for_ats(self, resume_content: str) -> str:
-        """Optimize resume for ATS (Applicant Tracking Systems)"""
-        prompt = f"""Please intelligently optimize this LaTeX resume for Applicant Tracking Systems (ATS) while preserving and enhancing the existing content foundation.
-
-INTELLIGENT ATS OPTIMIZATION APPROACH:
-1. **Content Analysis**: Identify all existing technologies, skills, and achievements in the resume
-2. **ATS Enhancement**: Optimize structure and keywords while building upon existing content
-3. **Skill Amplification**: Use existing technical foundation to create ATS-friendly skill presentations
+    async def tailor_batch(self, jobs: Iterable[Dict[str, Any]], workers: int = 8,
+                           sections_only: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Tailor many job descriptions with a bounded worker pool.
 
-ATS OPTIMIZATION STRATEGIES:
-- **Section Headers**: Ensure standard, ATS-readable section names (Skills, Experience, Projects, Education)
-- **Technology Keywords**: Extract and emphasize existing technologies from projects and experience
-- **Skill Organization**: Reorganize Skills section for optimal ATS parsing and keyword density
-- **Achievement Quantification**: Ensure all quantifiable metrics are clearly formatted
-- **Keyword Integration**: Naturally integrate industry-standard terms based on existing experience
+        Each job is a dict with 'job_description' and optional 'id' / 'company_info' / 'profile';
+        a job without a description yields an 'error' result instead of stopping the batch.
+        Results are yielded as soon as they finish (not in input order) as
+        {'id', 'content', 'status', 'error', 'guard'} (see tailor_resume_with_status). Pacing
+        against the Gemini quota and retries are handled by the client's rate limiter
+        and backoff. sections_only switches to section-level tailoring.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, job in enumerate(jobs):
+            queue.put_nowait((index, job))
+        results: asyncio.Queue = asyncio.Queue()
 
-TECHNICAL REQUIREMENTS:
-- Use existing technical stack as foundation for keyword optimization
-- Maintain consistent formatting throughout for ATS parsing
-- Remove complex LaTeX formatting that might confuse ATS systems
-- Ensure proper keyword density without keyword stuffing
-- Keep the same overall structure and content length
-- Build upon existing achievements and technologies
+        async def worker() -> None:
+            while True:
+                try:
+                    index, job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if not isinstance(job, dict) or not job.get('job_description'):
+                    # A malformed job must still produce a result, or the consumer waits forever
+                    logger.error(f"❌ Job {index} has no job_description")
+                    job = job if isinstance(job, dict) else {}
+                    result = TailorResult('', 'error', "missing job_description")
+                else:
+                    try:
+                        result = await self.tailor_resume_with_status(job['job_description'], job.get('company_info'),
+                                                                      sections_only=sections_only,
+                                                                      profile=job.get('profile'))
+                    except KeyError as e:
+                        # Unknown or unloadable profile: there is no template to fall back to
+                        logger.error(f"❌ {e.args[0]}")
+                        result = TailorResult('', 'error', e.args[0])
+                    except Exception as e:
+                        # Anything else must still produce a result, or the consumer waits forever
+                        logger.error(f"❌ Job {index} failed: {str(e)}")
+                        result = TailorResult('', 'error', str(e))
+                await results.put({'id': job.get('id', index), 'content': result.content,
+                                   'status': result.status, 'error': result.error,
+                                   'guard': result.guard.to_dict() if result.guard is not None else None})
 
-CONTENT ENHANCEMENT RULES:
-- Use existing project technologies to create comprehensive skill listings
-- Leverage current experience patterns for industry-standard terminology
-- Ensure all technical terms are industry-standard and ATS-recognizable
-- Maintain authenticity - enhance rather than fabricate
-
-Resume to optimize:
+        tasks = [asyncio.create_task(worker()) for _ in range(max(1, min(workers, queue.qsize())))]
+        remaining = queue.qsize()
+        try:
+            for _ in range(remaining):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def optimize_for_ats(self, resume_content: str, bypass_cache: bool = False) -> str:
+        """Optimize resume for ATS (Applicant Tracking Systems)"""
+        prompt = f"""{ATS_INSTRUCTIONS}Resume to optimize:
 {resume_content}
 
 Return the ATS-optimized LaTeX code that maximizes the existing content for ATS success:"""
 
         try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.3,  # Lower temperature for consistency
-                        "topK": 20,
-                        "topP": 0.8,
-                        "maxOutputTokens": 8192,
-                    }
-                }
-                
-                headers = {'Content-Type': 'application/json'}
-                url = f"{self.api_url}?key={self.api_key}"
-                
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        optimized_content = data.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
-                        
-                        if optimized_content:
-                            return self._clean_latex_response(optimized_content)
+            with call_labels(operation='ats'):
+                optimized_content = await self.client.generate(prompt, ATS_GENERATION_CONFIG, bypass_cache=bypass_cache)
+            
+            if optimized_content:
+                self.metrics.inc('ats_results_total', outcome='optimized')
+                return self._clean_latex_response(optimized_content)
                             
         except Exception as e:
             logger.error(f"❌ Error optimizing for ATS: {str(e)}")
             
+        self.metrics.inc('ats_results_total', outcome='fallback')
         return resume_content  # Return original if optimization fails
 
+    async def optimize_for_ats_batch(self, resumes: List[str], max_items: int = 4,
+                                     max_output_tokens: int = ATS_GENERATION_CONFIG["maxOutputTokens"],
+                                     bypass_cache: bool = False) -> List[str]:
+        """
+        ATS-optimize many resumes (or resume sections) with as few requests as possible.
+
+        Items are packed greedily into requests of at most max_items whose estimated
+        output still fits max_output_tokens, and the model answers with a JSON array of
+        {"id", "latex"} objects. Any item that is missing from the answer or does not
+        parse goes through optimize_for_ats on its own. Results come back in input order.
+
+        This is not a throughput optimization for whole resumes: at the 8192-token output
+        limit only about two fit per request, and the model still has to write every
+        token of each one, so generation time is unchanged - it only saves request count
+        and per-request overhead. It pays off only for small items such as sections.
+        """
+        results: List[Optional[str]] = [None] * len(resumes)
+        batches: List[List[int]] = []
+        batch_tokens = 0
+        for index, resume in enumerate(resumes):
+            # The answer is about as long as the input, plus JSON escaping
+            tokens = int(estimate_tokens(resume) * 1.2) + 16
+            if not batches or len(batches[-1]) >= max_items or batch_tokens + tokens > max_output_tokens:
+                batches.append([])
+                batch_tokens = 0
+            batches[-1].append(index)
+            batch_tokens += tokens
+
+        async def run(batch: List[int]) -> None:
+            parsed: Dict[int, str] = {}
+            if len(batch) > 1:
+                parsed = await self._optimize_ats_packed([resumes[i] for i in batch], bypass_cache)
+            retry = [i for position, i in enumerate(batch) if position not in parsed]
+            if len(batch) > 1:
+                self.metrics.inc('ats_batch_items_total', len(parsed), result='parsed')
+                self.metrics.inc('ats_batch_items_total', len(retry), result='retried')
+            if len(batch) > 1 and retry:
+                logger.warning(f"⚠️ {len(retry)}/{len(batch)} ATS item(s) unparsed; retrying singly")
+            for position, i in enumerate(batch):
+                if position in parsed:
+                    results[i] = parsed[position]
+            singles = await asyncio.gather(*(self.optimize_for_ats(resumes[i], bypass_cache) for i in retry))
+            for i, content in zip(retry, singles):
+                results[i] = content
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        logger.info(f"✅ ATS-optimized {len(resumes)} item(s) in {len(batches)} batched request(s)")
+        return results
+
+    async def _optimize_ats_packed(self, resumes: List[str], bypass_cache: bool) -> Dict[int, str]:
+        """One JSON-structured request for several items; returns {position: latex} for those that parsed"""
+        items = json.dumps([{"id": position, "latex": resume} for position, resume in enumerate(resumes)],
+                           ensure_ascii=False)
+        prompt = f"""{ATS_INSTRUCTIONS}{ATS_BATCH_INSTRUCTIONS}
+
+Items to optimize (JSON):
+{items}"""
+        try:
+            with call_labels(operation='ats_batch'):
+                response = await self.client.generate(prompt, ATS_BATCH_GENERATION_CONFIG, bypass_cache=bypass_cache)
+            answer = json.loads(response)
+        except Exception as e:
+            logger.error(f"❌ Batched ATS request failed: {str(e)}")
+            return {}
+
+        parsed = {}
+        for item in answer if isinstance(answer, list) else []:
+            if not isinstance(item, dict):
+                continue
+            position, latex = item.get('id'), item.get('latex')
+            if not isinstance(position, int) or not 0 <= position < len(resumes) or not isinstance(latex, str):
+                continue
+            latex = self._clean_latex_response(latex)
+            # A whole document must still be a whole document
+            if not latex or (BEGIN_DOCUMENT in resumes[position]) != (BEGIN_DOCUMENT in latex):
+                continue
+            parsed[position] = latex
+        return parsed
+
+
+class AtsBatcher:
+    """
+    Collects single optimize_for_ats calls from concurrent callers and sends them
+    through optimize_for_ats_batch, flushing when max_items are waiting or after
+    max_wait seconds - whichever comes first.
+
+    Waiting adds up to max_wait of latency per item, and for whole resumes batching
+    gives no throughput benefit (see optimize_for_ats_batch); with max_items=1 every
+    call is sent on its own immediately.
+    """
+
+    def __init__(self, optimizer: ResumeOptimizer, max_items: int = 4, max_wait: float = 0.25):
+        self.optimizer = optimizer
+        self.max_items = max(1, max_items)
+        self.max_wait = max_wait
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def optimize(self, resume_content: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((resume_content, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.create_task(self._send(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: List[tuple]) -> None:
+        try:
+            # A batched request serves several jobs; it is not attributed to whichever one started it
+            with call_labels(job_hash=None):
+                results = await self.optimizer.optimize_for_ats_batch([resume for resume, _ in pending],
+                                                                      max_items=self.max_items)
+        except Exception as e:
+            results = [e] * len(pending)
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
 # Test the module
 if __name__ == "__main__":
     async def test_optimizer():
@@ -475,8 +1094,6 @@ if __name__ == "__main__":
             print("Please set GEMINI_API_KEY environment variable")
             return
             
-        optimizer = ResumeOptimizer(api_key)
-        
         test_job = """
         Software Engineer Intern at Google
         
@@ -491,7 +1108,8 @@ if __name__ == "__main__":
         You will work on cutting-edge projects involving AI and distributed systems.
         """
         
-        tailored_resume = await optimizer.tailor_resume_for_job(test_job)
+        async with ResumeOptimizer(api_key) as optimizer:
+            tailored_resume = await optimizer.tailor_resume_for_job(test_job)
         print("Tailored resume generated successfully!")
         print(f"Length: {len(tailored_resume)} characters")
         
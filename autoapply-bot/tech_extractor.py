@@ -0,0 +1,115 @@
+"""
+Technology Extractor Module - Single-pass, taxonomy-driven technology detection
+
+The taxonomy (term -> category) is compiled once into one regex whose
+alternation is factored as a character trie, so a scan costs roughly one step
+per character of text regardless of how many terms the taxonomy holds.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Iterable
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).with_name("tech_taxonomy.json")
+
+# Characters that may continue a technology token (C++, C#, Node.js); a match
+# touching one of these on either side is part of a longer word and is rejected.
+_WORD_EDGE = r"\w+#"
+
+
+@dataclass
+class TechMatch:
+    """One canonical technology found in a text"""
+    term: str
+    category: str
+    count: int = 0
+    positions: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Build a regex alternation factored by common prefixes (longest match preferred)"""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Optional continuation is greedy, so longer terms win over their prefixes
+            return '(?:' + body + ')?'
+        return body
+
+    return render(trie)
+
+
+class TechTaxonomy:
+    """A compiled technology taxonomy: one combined pattern plus canonical lookups"""
+
+    def __init__(self, categories: Dict[str, List[str]], case_sensitive: Iterable[str] = ()):
+        self.categories = list(categories)
+        self.case_sensitive = set(case_sensitive)
+        self._canonical: Dict[str, str] = {}
+        self._category: Dict[str, str] = {}
+        for category, terms in categories.items():
+            for term in terms:
+                # First category wins, so every term has exactly one home
+                self._category.setdefault(term, category)
+                self._canonical.setdefault(term.lower(), term)
+        pattern = _trie_pattern(sorted({term.lower() for term in self._category}))
+        self.pattern = re.compile(rf"(?<![{_WORD_EDGE}])(?:{pattern})(?![{_WORD_EDGE}])", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_TAXONOMY_PATH) -> "TechTaxonomy":
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['categories'], data.get('case_sensitive', ()))
+
+    def __len__(self) -> int:
+        return len(self._category)
+
+    @property
+    def terms(self) -> List[str]:
+        """Every canonical term, in taxonomy order"""
+        return list(self._category)
+
+    def scan(self, text: str) -> Dict[str, TechMatch]:
+        """Find every taxonomy term in one pass; returns canonical term -> TechMatch (first-seen order)"""
+        found: Dict[str, TechMatch] = {}
+        for match in self.pattern.finditer(text):
+            surface = match.group(0)
+            term = self._canonical[surface.lower()]
+            if term in self.case_sensitive and surface != term:
+                continue
+            entry = found.get(term)
+            if entry is None:
+                entry = found[term] = TechMatch(term, self._category[term])
+            entry.count += 1
+            entry.positions.append(match.span())
+        return found
+
+    def by_category(self, text: str) -> Dict[str, List[str]]:
+        """Group the canonical terms found in text by category (every category present, possibly empty)"""
+        grouped: Dict[str, List[str]] = {category: [] for category in self.categories}
+        for term, entry in self.scan(text).items():
+            grouped[entry.category].append(term)
+        return grouped
+
+
+_default_taxonomy: Optional[TechTaxonomy] = None
+
+
+def default_taxonomy() -> TechTaxonomy:
+    """The bundled taxonomy, compiled on first use and shared afterwards"""
+    global _default_taxonomy
+    if _default_taxonomy is None:
+        _default_taxonomy = TechTaxonomy.from_file()
+    return _default_taxonomy
@@ -0,0 +1,137 @@
+"""
+Template Registry Module - Lazily loaded, per-profile resume templates
+
+Each candidate profile is a `<name>.tex` file in a directory. Startup only
+lists the directory; a profile's template is read (and interned, so
+identical templates share one string) and analysed on first use. Loaded profiles live in an LRU bounded by
+max_active, so memory follows the profiles in use rather than the number on
+disk, and an edited file is picked up on its next use. A profile whose file has
+gone missing or does not decode raises TemplateLoadError, a KeyError, just
+like an unknown profile.
+"""
+
+import logging
+import os
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+logger = logging.getLogger("autoapply.template_registry")
+
+TEMPLATE_SUFFIX = ".tex"
+
+
+class TemplateLoadError(KeyError):
+    """A listed profile's template could not be read (deleted, unreadable or not UTF-8)"""
+
+
+@dataclass
+class TemplateProfile:
+    """One loaded profile: its template text and whatever was derived from it"""
+    name: str
+    template: str
+    analysis: Any
+    fingerprint: Tuple[float, int]
+    # Other per-profile caches (e.g. the match scorer), filled on demand by their users
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+def read_template(path: Path) -> str:
+    """Read and intern a UTF-8 template"""
+    return sys.intern(path.read_text(encoding='utf-8'))
+
+
+class TemplateRegistry:
+    """
+    Profile name -> TemplateProfile, loaded on first use.
+
+    `analyzer` turns template text into the per-profile analysis (ResumeOptimizer
+    supplies TemplateAnalysis.build). Profiles registered in memory with add()
+    are never evicted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_active: int = 128,
+                 analyzer: Optional[Callable[[str], Any]] = None, auto_reload: bool = True):
+        self.directory = Path(directory) if directory else None
+        self.max_active = max(1, max_active)
+        self.analyzer = analyzer
+        self.auto_reload = auto_reload
+        self._paths: Dict[str, Path] = {}
+        self._pinned: Dict[str, TemplateProfile] = {}
+        self._active: "OrderedDict[str, TemplateProfile]" = OrderedDict()
+        self._builtin: Dict[str, str] = {}
+        self.loads = 0
+        if self.directory is not None:
+            self.rescan()
+
+    def rescan(self) -> int:
+        """Refresh the list of profiles on disk (names only; nothing is read)"""
+        if self.directory is None:
+            return 0
+        self._paths = {entry.name[:-len(TEMPLATE_SUFFIX)]: Path(entry.path)
+                       for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(TEMPLATE_SUFFIX)}
+        logger.info(f"📚 {len(self._paths)} template profile(s) in {self.directory}")
+        return len(self._paths)
+
+    def add(self, name: str, template: str) -> None:
+        """Register an in-memory template (e.g. the built-in default); it is analysed lazily"""
+        self._builtin[name] = sys.intern(template)
+        self._pinned.pop(name, None)
+
+    def names(self) -> List[str]:
+        return sorted(set(self._paths) | set(self._builtin))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._paths or name in self._builtin
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    @property
+    def active(self) -> List[str]:
+        """Profiles currently held in memory"""
+        return list(self._pinned) + list(self._active)
+
+    def fingerprint(self, name: str) -> Tuple[float, int]:
+        """Cheap change marker (mtime, size) without reading the template"""
+        if name in self._paths:
+            stat = self._paths[name].stat()
+            return stat.st_mtime, stat.st_size
+        if name in self._builtin:
+            return 0.0, len(self._builtin[name])
+        raise KeyError(f"Unknown template profile: {name}")
+
+    def get(self, name: str) -> TemplateProfile:
+        """The loaded profile, reading and analysing it on first use (or after an edit)"""
+        if name in self._paths:
+            try:
+                profile = self._active.get(name)
+                if profile is not None and (not self.auto_reload or profile.fingerprint == self.fingerprint(name)):
+                    self._active.move_to_end(name)
+                    return profile
+                profile = self._load(name, read_template(self._paths[name]))
+            except (OSError, UnicodeDecodeError) as e:
+                # Drop the stale copy so a fixed file is read again on the next use
+                self._active.pop(name, None)
+                logger.error(f"❌ Template profile {name} could not be loaded: {e}")
+                raise TemplateLoadError(f"Template profile {name} could not be loaded: {e}") from e
+            self._active[name] = profile
+            self._active.move_to_end(name)
+            while len(self._active) > self.max_active:
+                evicted, _ = self._active.popitem(last=False)
+                logger.debug(f"♻️ Evicted template profile {evicted}")
+            return profile
+        if name in self._builtin:
+            profile = self._pinned.get(name)
+            if profile is None:
+                profile = self._pinned[name] = self._load(name, self._builtin[name])
+            return profile
+        raise KeyError(f"Unknown template profile: {name}")
+
+    def _load(self, name: str, template: str) -> TemplateProfile:
+        self.loads += 1
+        analysis = self.analyzer(template) if self.analyzer is not None else None
+        return TemplateProfile(name, template, analysis, self.fingerprint(name))
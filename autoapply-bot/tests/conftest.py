@@ -0,0 +1,9 @@
+"""
+Test configuration - the bot's modules import each other as top-level modules,
+so the package directory goes on sys.path before any test imports them.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,121 @@
+"""
+Application automator tests - form-field mapping heuristics on the three mock
+job-board layouts, and (when a Chromium build is installed) full submissions
+through ApplicationAutomator.submit against the local job board
+"""
+
+import asyncio
+
+import pytest
+
+from application_automator import (Applicant, ApplicationAutomator, ApplicationRequest, BrowserUnavailableError,
+                                   FormMapping, map_fields, site_key)
+from benchmark import start_job_board_server, stub_base_url, stub_stats
+from metrics import MetricsRegistry
+
+APPLICANT = Applicant("Ada", "Lovelace", "ada@example.com", "+1 555 0100", linkedin="https://linkedin.com/in/ada")
+
+
+def field(selector, **attributes):
+    return {'selector': selector, 'tag': 'input', 'type': 'text', 'name': '', 'id': '', 'label': '',
+            'placeholder': '', 'autocomplete': '', 'accept': '', **attributes}
+
+
+# What DISCOVER_FORM_JS reports for JOB_BOARD_LAYOUTS
+DISCOVERED = {
+    'a': [field('#candidate-name', name='name', id='candidate-name', label='Full name'),
+          field('#candidate-email', type='email', name='email', id='candidate-email', label='Email'),
+          field('#candidate-phone', type='tel', name='phone', id='candidate-phone', label='Phone'),
+          field('#candidate-resume', type='file', name='resume', id='candidate-resume', label='Resume')],
+    'b': [field('input[name="first_name"]', name='first_name', placeholder='First name'),
+          field('input[name="last_name"]', name='last_name', placeholder='Last name'),
+          field('input[name="contact"]', name='contact', placeholder='E-mail address'),
+          field('input[name="cv"]', type='file', name='cv', accept='.pdf'),
+          field('input[name="linkedin_url"]', name='linkedin_url', placeholder='LinkedIn profile')],
+    'c': [field('body > div:nth-of-type(1) > input:nth-of-type(1)', label='Your name'),
+          field('body > div:nth-of-type(1) > input:nth-of-type(2)', label='Email'),
+          field('body > div:nth-of-type(1) > label:nth-of-type(1) > input:nth-of-type(1)', type='file',
+                label='Upload your résumé ')],
+}
+
+EXPECTED_ROLES = {
+    'a': {'full_name', 'email', 'phone', 'resume'},
+    'b': {'first_name', 'last_name', 'email', 'resume', 'linkedin'},
+    'c': {'full_name', 'email', 'resume'},
+}
+
+
+@pytest.mark.parametrize("layout", sorted(DISCOVERED))
+def test_map_fields_understands_each_layout(layout):
+    mapping = map_fields(DISCOVERED[layout], submit='#send')
+    assert set(mapping.fields) == EXPECTED_ROLES[layout]
+    assert mapping.usable
+
+
+def test_map_fields_needs_email_resume_and_submit():
+    assert not map_fields(DISCOVERED['a']).usable
+    assert not map_fields(DISCOVERED['a'][:2], submit='#go').usable
+    # A text box asking about the resume is a free-text answer, not the upload
+    assert 'resume' not in map_fields([field('#why', label='Why does your resume fit?')]).fields
+
+
+def test_site_key_wildcards_posting_ids():
+    assert site_key("https://Jobs.Example.com/acme/jobs/12345/") == site_key("https://jobs.example.com/acme/jobs/678")
+    assert site_key("https://jobs.example.com/acme/jobs/12345") != site_key("https://jobs.example.com/globex/jobs/1")
+
+
+def submit_all(tmp_path, urls_for, prepare=None):
+    """Start the job board and an automator (skipping without a browser); submit and report"""
+    resume = tmp_path / "resume.pdf"
+    resume.write_bytes(b"%PDF-1.4\n%stub\n")
+
+    async def main():
+        runner = await start_job_board_server()
+        try:
+            automator = ApplicationAutomator(APPLICANT, pool_size=2, timeout=5, metrics=MetricsRegistry())
+            try:
+                await automator.start()
+            except BrowserUnavailableError as e:
+                pytest.skip(str(e))
+            try:
+                if prepare is not None:
+                    prepare(automator, stub_base_url(runner))
+                requests = [ApplicationRequest(url, str(resume)) for url in urls_for(stub_base_url(runner))]
+                results = [await automator.submit(request) for request in requests]
+            finally:
+                await automator.close()
+            return results, automator, stub_stats(runner)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_submit_fills_all_three_layouts_and_blocks_assets(tmp_path):
+    results, automator, stats = submit_all(tmp_path, lambda base: [f"{base}/{layout}/jobs/100" for layout in 'abc'])
+    assert [result.status for result in results] == ['submitted'] * 3, [result.error for result in results]
+    assert stats['submissions'] == 3 and stats['rejected'] == 0
+    for layout in 'abc':
+        assert set(automator.mappings.get(results['abc'.index(layout)].url).fields) == EXPECTED_ROLES[layout]
+    # Every page references an image and a web font; neither reaches the server
+    assert stats['asset_requests'] == 0
+    assert automator.pool.blocked_requests >= 3
+
+
+def test_submit_reuses_the_mapping_for_the_same_form(tmp_path):
+    results, _, stats = submit_all(tmp_path, lambda base: [f"{base}/a/jobs/{job}" for job in (1, 2, 3)])
+    assert [result.mapping_cached for result in results] == [False, True, True]
+    assert stats['submissions'] == 3
+
+
+def test_submit_remaps_when_a_cached_selector_is_stale(tmp_path):
+    def prepare(automator, base):
+        automator.mappings.put(f"{base}/b/jobs/1", FormMapping(
+            fields={'email': '#gone', 'resume': 'input[name="cv"]'}, submit='button'))
+
+    results, automator, stats = submit_all(tmp_path, lambda base: [f"{base}/b/jobs/2"], prepare)
+    [result] = results
+    assert result.ok, result.error
+    assert not result.mapping_cached
+    assert automator.mappings.get(result.url).fields['email'] == 'input[name="contact"]'
+    assert stats['submissions'] == 1
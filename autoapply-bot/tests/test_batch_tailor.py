@@ -0,0 +1,69 @@
+"""
+Batch tailor tests - JSONL job parsing and checkpointed resumes of run_batch
+"""
+
+import asyncio
+import io
+import json
+
+from batch_tailor import read_jobs, run_batch
+from benchmark import start_stub_server, stub_base_url
+from checkpoint import CheckpointJournal
+from resume_optimizer import ResumeOptimizer
+from template_registry import TemplateRegistry
+
+TEMPLATE = ResumeOptimizer("k").base_resume_template
+
+
+def test_read_jobs_skips_malformed_lines():
+    lines = ['{"id": "a", "job_description": "Backend role"}', '"Bare description"', '', '{not json',
+             '[1, 2]', '42', 'null', '{"id": "b"}', '{"job_description": "Data role"}']
+    jobs = read_jobs(io.StringIO("\n".join(lines) + "\n"))
+    assert [(job['id'], job['job_description']) for job in jobs] == [
+        ('a', "Backend role"), (2, "Bare description"), (9, "Data role")]
+
+
+def test_read_jobs_rejects_colliding_and_unhashable_ids():
+    lines = ['{"job_description": "First"}', '{"id": 1, "job_description": "Claims line 1\'s id"}',
+             '{"id": [1], "job_description": "List id"}', '{"id": "x", "job_description": "Second"}',
+             '{"id": "x", "job_description": "Same id again"}']
+    jobs = read_jobs(io.StringIO("\n".join(lines) + "\n"))
+    assert [(job['id'], job['job_description']) for job in jobs] == [(1, "First"), ('x', "Second")]
+
+
+def run_journaled(tmp_path, jobs, runs):
+    """Run the same batch `runs` times against one stub (the model URL is part of the key)"""
+    async def main():
+        runner = await start_stub_server(response_text=TEMPLATE)
+        outputs = []
+        try:
+            for _ in range(runs):
+                output = io.StringIO()
+                journal = CheckpointJournal(str(tmp_path / "journal.jsonl"))
+                try:
+                    await run_batch(jobs, "k", output, workers=2, requests_per_minute=6000,
+                                    tokens_per_minute=None, max_retries=0, journal=journal,
+                                    base_url=stub_base_url(runner), templates=TemplateRegistry(str(tmp_path)))
+                finally:
+                    journal.close()
+                outputs.append([json.loads(line) for line in output.getvalue().splitlines()])
+        finally:
+            await runner.cleanup()
+        return outputs
+
+    return asyncio.run(asyncio.wait_for(main(), 20))
+
+
+def test_resume_with_duplicate_ids_checkpoints_each_job_separately(tmp_path):
+    # The second job's template does not decode, so it fails; both jobs share an id
+    (tmp_path / "broken.tex").write_bytes(b"\xff\xfe")
+    jobs = [{'id': 'dup', 'job_description': "Backend role"},
+            {'id': 'dup', 'job_description': "Data role", 'profile': 'broken'}]
+
+    first, second = run_journaled(tmp_path, jobs, 2)
+    assert sorted(result['status'] for result in first) == ['error', 'success']
+    assert {result['id'] for result in first} == {'dup'}
+    # Only the failed job is retried: its error was not recorded as the other job's
+    # checkpoint, nor the other job's success as its own
+    assert [result['status'] for result in second] == ['error']
+    assert "could not be loaded" in second[0]['error']
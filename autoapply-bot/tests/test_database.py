@@ -0,0 +1,74 @@
+"""
+Database tests - job upserts and the batching AsyncStoreWriter
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from database import ApplicationStore, AsyncStoreWriter, apply_delta, make_delta
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ApplicationStore(str(tmp_path / "store.sqlite3"))
+    yield store
+    store.close()
+
+
+def job(status='new'):
+    return {'job_hash': 'h1', 'company': 'Acme', 'title': 'Engineer', 'url': 'https://x', 'description': 'desc',
+            'status': status}
+
+
+def test_rescrape_resets_only_initial_statuses(store):
+    store.upsert_jobs([job('new')])
+    store.upsert_jobs([job('queued')])
+    assert store.get_job('h1')['status'] == 'queued'
+
+    store.set_job_status([('h1', 'applied')])
+    store.upsert_jobs([job('new')])
+    assert store.get_job('h1')['status'] == 'applied'
+
+
+def test_writer_survives_a_failing_batch(store):
+    async def main():
+        async with AsyncStoreWriter(store, batch_size=1, flush_interval=0.01, max_pending=2) as writer:
+            # Missing 'description' fails inside the write, not in put()
+            await writer.put('job', {'job_hash': 'broken'})
+            for index in range(5):
+                await writer.put('job', {**job(), 'job_hash': f'ok{index}'})
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+    assert store.get_job('broken') is None
+    assert all(store.get_job(f'ok{index}') for index in range(5))
+
+
+def test_delta_round_trip():
+    base = "a\nb\nc\n"
+    text = "a\nB\nc\nd\n"
+    assert apply_delta(base, make_delta(base, text)) == text
+
+
+def test_resume_status_and_error_are_stored(store):
+    template_id = store.register_template("a\nb\n")
+    store.add_resumes([{'job_hash': 'h1', 'template_id': template_id, 'content': "a\nb\n",
+                        'status': 'fallback', 'error': "No content received from Gemini API"}])
+    assert store.latest_resume_status('h1') == {'status': 'fallback', 'error': "No content received from Gemini API"}
+
+
+def test_old_store_gains_the_error_column(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE resumes (id INTEGER PRIMARY KEY, job_hash TEXT NOT NULL, template_id INTEGER NOT NULL,"
+               " version INTEGER NOT NULL DEFAULT 1, status TEXT NOT NULL, delta BLOB NOT NULL,"
+               " created REAL NOT NULL)")
+    db.close()
+    store = ApplicationStore(path)
+    try:
+        template_id = store.register_template("t\n")
+        store.add_resumes([{'job_hash': 'h1', 'template_id': template_id, 'content': "t\n", 'error': None}])
+        assert store.latest_resume_status('h1') == {'status': 'success', 'error': None}
+    finally:
+        store.close()
@@ -0,0 +1,92 @@
+"""
+Gemini client tests - per-call token usage for concurrent generate and stream calls,
+and the call records that feed the store's call_metrics table
+"""
+
+import asyncio
+import json
+
+from aiohttp import web
+
+from benchmark import stub_url
+from database import ApplicationStore, AsyncStoreWriter
+from gemini_client import GeminiClient, call_labels
+from metrics import MetricsRegistry
+
+
+async def _usage_server():
+    """Answers with usage derived from the prompt ("<n>" -> n prompt tokens), slower for smaller n"""
+    async def handler(request):
+        payload = await request.json()
+        n = int(payload['contents'][0]['parts'][0]['text'])
+        await asyncio.sleep(0.01 * (10 - n))
+        event = {"candidates": [{"content": {"parts": [{"text": f"answer {n}"}]}}],
+                 "usageMetadata": {"promptTokenCount": n, "candidatesTokenCount": 2 * n, "totalTokenCount": 3 * n}}
+        if request.query.get('alt') == 'sse':
+            response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await response.prepare(request)
+            await response.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            await response.write_eof()
+            return response
+        return web.json_response(event)
+
+    app = web.Application()
+    app.router.add_post('/v1beta/models/{model}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+def test_concurrent_calls_each_get_their_own_usage():
+    async def stream(client, n):
+        fragments = client.stream_generate(str(n), {})
+        text = "".join([fragment async for fragment in fragments])
+        return text, fragments.usage
+
+    async def main():
+        runner = await _usage_server()
+        try:
+            async with GeminiClient("k", stub_url(runner), metrics=MetricsRegistry()) as client:
+                generated = await asyncio.gather(*(client.generate_result(str(n), {}) for n in range(1, 6)))
+                streamed = await asyncio.gather(*(stream(client, n) for n in range(1, 6)))
+                return generated, streamed, client.metrics
+        finally:
+            await runner.cleanup()
+
+    generated, streamed, metrics = asyncio.run(main())
+    for n, result in enumerate(generated, 1):
+        assert result.text == f"answer {n}"
+        assert result.usage == {'prompt': n, 'output': 2 * n, 'total': 3 * n}
+    for n, (text, usage) in enumerate(streamed, 1):
+        assert text == f"answer {n}" and usage == {'prompt': n, 'output': 2 * n, 'total': 3 * n}
+    assert metrics.counter('gemini_tokens_total', kind='prompt') == 2 * sum(range(1, 6))
+
+
+def test_call_records_reach_the_store_through_the_writer(tmp_path):
+    store = ApplicationStore(str(tmp_path / "store.sqlite3"))
+
+    async def main():
+        runner = await _usage_server()
+        try:
+            async with GeminiClient("k", stub_url(runner), metrics=MetricsRegistry()) as client, \
+                    AsyncStoreWriter(store, flush_interval=0.01) as writer:
+                client.add_call_listener(lambda record: writer.put('metric', record))
+                with call_labels(operation='tailor', job_hash='h1'):
+                    await asyncio.gather(client.generate_result("2", {}), client.generate_result("3", {}))
+                with call_labels(operation='tailor_stream'):
+                    stream = client.stream_generate("4", {})
+                # Labels stick to where the stream was opened
+                assert [fragment async for fragment in stream] == ["answer 4"]
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(asyncio.wait_for(main(), 10))
+        summary = {row['operation']: row for row in store.metrics_summary()}
+    finally:
+        store.close()
+    assert summary['tailor']['calls'] == 2 and summary['tailor']['status'] == 'success'
+    assert summary['tailor']['prompt_tokens'] == 5 and summary['tailor']['output_tokens'] == 10
+    assert summary['tailor']['avg_latency_ms'] > 0
+    assert summary['tailor_stream']['prompt_tokens'] == 4
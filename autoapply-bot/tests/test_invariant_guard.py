@@ -0,0 +1,118 @@
+"""
+Invariant guard tests - protected fields, section set, length budgets and the
+repair / revert / fallback paths of ResumeOptimizer against the local Gemini stub
+"""
+
+import asyncio
+
+import pytest
+
+from benchmark import start_stub_server, stub_base_url
+from invariant_guard import InvariantGuard
+from latex_model import parse_resume
+from metrics import MetricsRegistry
+from resume_optimizer import ResumeOptimizer
+
+TEMPLATE = ResumeOptimizer("k").base_resume_template
+DATE = "May 2025 – Present"
+
+
+@pytest.fixture
+def guard():
+    return InvariantGuard(parse_resume(TEMPLATE))
+
+
+def section_source(name, source=TEMPLATE):
+    return parse_resume(source).section(name).source
+
+
+def marked(name, body):
+    return f"%%% BEGIN SECTION: {name}\n{body.strip()}\n%%% END SECTION: {name}"
+
+
+def enforce(content, response_text):
+    """Run the optimizer's guard on content, with the stub answering any repair request"""
+    async def main():
+        runner = await start_stub_server(response_text=response_text)
+        try:
+            async with ResumeOptimizer("k", base_url=stub_base_url(runner), metrics=MetricsRegistry()) as optimizer:
+                return await optimizer._enforce_invariants(optimizer.template_analysis, content, True)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_template_passes(guard):
+    _, report = guard.check(TEMPLATE)
+    assert report.ok and report.outcome == 'clean'
+
+
+def test_changed_date_is_repaired():
+    tailored = TEMPLATE.replace(DATE, "Jan 2023 – Present")
+    content, report = enforce(tailored, marked('Experience', section_source('Experience')))
+    assert [v.kind for v in report.violations] == ['protected', 'protected']
+    assert report.repaired == ['Experience'] and report.outcome == 'repaired'
+    assert DATE in content and "Jan 2023" not in content
+
+
+def test_changed_date_is_reverted_when_the_repair_fails():
+    tailored = TEMPLATE.replace(DATE, "Jan 2023 – Present")
+    content, report = enforce(tailored, "I could not fix that.")
+    assert report.reverted == ['Experience'] and report.outcome == 'reverted'
+    assert section_source('Experience', content) == section_source('Experience')
+
+
+def test_dropped_and_extra_sections_are_restored(guard):
+    projects = section_source('Projects')
+    tailored = TEMPLATE.replace(projects, "")
+    tailored = tailored.replace(section_source('Skills'),
+                                section_source('Skills') + "\\section{Hobbies}\nChess\n")
+    document, report = guard.check(tailored)
+    assert sorted(report.restored) == ['Hobbies', 'Projects']
+    assert not report.offending_sections
+    assert document.section_names() == ['Education', 'Experience', 'Projects', 'Skills']
+    assert document.section('Projects').source == projects
+
+
+def test_output_without_document_structure_falls_back():
+    async def main():
+        runner = await start_stub_server(response_text="Sorry, I can only answer in prose.")
+        try:
+            async with ResumeOptimizer("k", base_url=stub_base_url(runner), metrics=MetricsRegistry()) as optimizer:
+                return await optimizer.tailor_resume_with_status("Backend role", bypass_cache=True)
+        finally:
+            await runner.cleanup()
+
+    result = asyncio.run(main())
+    assert result.status == 'fallback' and "no resume structure" in result.error
+    assert result.content == TEMPLATE
+
+
+def _grow(source, name, factor):
+    """Pad one section's last item so it is about factor times its template length"""
+    original = section_source(name, source)
+    padding = "x" * int(len(' '.join(original.split())) * (factor - 1))
+    index = original.rindex('\\resumeItem{') + len('\\resumeItem{')
+    return source.replace(original, original[:index] + padding + " " + original[index:])
+
+
+def test_sections_within_their_limit_can_still_break_the_document_budget(guard):
+    tailored = TEMPLATE
+    for name in ('Experience', 'Projects'):
+        tailored = _grow(tailored, name, 1.2)
+    _, per_section = InvariantGuard(parse_resume(TEMPLATE), max_total_growth=None).check(tailored)
+    assert per_section.ok
+
+    _, report = guard.check(tailored)
+    assert {v.kind for v in report.violations} == {'length'}
+    assert report.offending_sections and set(report.offending_sections) <= {'Experience', 'Projects'}
+
+
+def test_over_budget_output_is_reverted_when_the_repair_does_not_shrink_it():
+    tailored = TEMPLATE
+    for name in ('Experience', 'Projects'):
+        tailored = _grow(tailored, name, 1.2)
+    content, report = enforce(tailored, "no markers here")
+    assert report.outcome == 'reverted'
+    assert InvariantGuard(parse_resume(TEMPLATE)).over_budget(parse_resume(content).sections) == []
@@ -0,0 +1,63 @@
+"""
+Prompt builder tests - job description compaction keeps requirements and drops boilerplate
+"""
+
+from prompt_builder import compact_job_description
+
+POSTING = """About the role
+We build developer tooling for payments.
+
+Requirements:
+- Experience with cookie-cutter templates and Cookiecutter
+- Familiarity with privacy policy enforcement in data pipelines
+- Built "Apply now" flows for a careers site
+- 3+ years of Python
+
+Privacy Engineer
+- Design consent and cookie storage for our web SDK
+
+Legal Operations Analyst
+- Automate contract review with Python
+
+Benefits Platform Lead
+- Own the benefits enrollment service (Go, PostgreSQL)
+
+**Benefits:**
+- Unlimited PTO
+- 401(k) matching
+
+Equal Employment Opportunity
+Acme is an equal opportunity employer. All qualified applicants will receive consideration.
+
+Nice to have:
+- Kubernetes
+Apply now
+Share this job
+© 2026 Acme Inc. All rights reserved.
+Acme participates in E-Verify.
+Powered by Greenhouse
+"""
+
+
+def test_requirement_lines_survive_compaction():
+    compacted = compact_job_description(POSTING).splitlines()
+    for line in ("- Experience with cookie-cutter templates and Cookiecutter",
+                 "- Familiarity with privacy policy enforcement in data pipelines",
+                 '- Built "Apply now" flows for a careers site',
+                 "Privacy Engineer", "- Design consent and cookie storage for our web SDK",
+                 "Legal Operations Analyst", "- Automate contract review with Python",
+                 "Benefits Platform Lead", "- Own the benefits enrollment service (Go, PostgreSQL)",
+                 "Nice to have:", "- Kubernetes"):
+        assert line in compacted
+
+
+def test_boilerplate_sections_and_lines_are_dropped():
+    compacted = compact_job_description(POSTING)
+    for text in ("Unlimited PTO", "401(k)", "**Benefits:**", "Equal Employment Opportunity",
+                 "equal opportunity employer", "Share this job", "©", "E-Verify", "Greenhouse"):
+        assert text not in compacted
+    assert "Apply now" not in compacted.splitlines()
+
+
+def test_duplicate_lines_are_dropped():
+    assert compact_job_description("Python\n  python  \nGo") == "Python\nGo"
@@ -0,0 +1,54 @@
+"""
+Resume version tests - generate_multiple_versions keeps only successful tailorings
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from benchmark import stub_base_url
+from metrics import MetricsRegistry
+from resume_optimizer import ResumeOptimizer
+
+TEMPLATE = ResumeOptimizer("k").base_resume_template
+
+
+async def _per_temperature_server(answers):
+    """Answers with answers[temperature], or a 400 for temperatures it has no answer for"""
+    async def handler(request):
+        payload = await request.json()
+        text = answers.get(payload['generationConfig']['temperature'])
+        if text is None:
+            return web.json_response({'error': {'message': 'bad request'}}, status=400)
+        return web.json_response({'candidates': [{'content': {'parts': [{'text': text}]}}]})
+
+    app = web.Application()
+    app.router.add_post('/v1beta/models/{model}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner
+
+
+def versions_for(answers, count=3):
+    async def main():
+        runner = await _per_temperature_server(answers)
+        try:
+            async with ResumeOptimizer("k", base_url=stub_base_url(runner), metrics=MetricsRegistry()) as optimizer:
+                return await optimizer.generate_multiple_versions("Data engineer, PySpark", count=count)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_failed_tailorings_are_not_returned_as_versions():
+    tailored = TEMPLATE.replace("10+ Databricks notebooks", "12+ Databricks notebooks").strip()
+    versions = versions_for({0.7: tailored})
+    assert [v['content'] for v in versions] == [tailored]
+    assert versions[0]['version'] == 1 and versions[0]['generation_config']['temperature'] == 0.7
+
+
+def test_all_failures_yield_no_versions():
+    assert versions_for({}) == []
@@ -0,0 +1,194 @@
+"""
+Streaming tests - SSE parsing in GeminiClient.stream_generate and fence stripping /
+truncation in ResumeOptimizer.stream_tailored_resume, against the local Gemini stub
+"""
+
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from benchmark import start_stub_server, stub_base_url, stub_url
+from gemini_client import GeminiClient, GeminiAPIError
+from latex_model import LatexStreamCleaner
+from metrics import MetricsRegistry
+from rate_limiter import RateLimiter
+from resume_optimizer import ResumeOptimizer
+
+FENCED = "```latex\n\\documentclass{article}\n\\begin{document}\nHi\n\\end{document}\n```\n"
+CLEAN = "\\documentclass{article}\n\\begin{document}\nHi\n\\end{document}"
+TEMPLATE = ResumeOptimizer("k").base_resume_template
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def split_every(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("text", [FENCED, FENCED.replace("\n```", "\n\n\n```")])
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 13, 1000])
+def test_cleaner_strips_fences_split_across_chunks(text, size):
+    cleaner = LatexStreamCleaner()
+    out = "".join(cleaner.feed(chunk) for chunk in split_every(text, size)) + cleaner.finish()
+    assert out == CLEAN == ResumeOptimizer._strip_code_fences(text)
+
+
+def test_cleaner_passes_unfenced_text_through():
+    cleaner = LatexStreamCleaner()
+    out = "".join(cleaner.feed(chunk) for chunk in split_every(CLEAN + "\n", 4)) + cleaner.finish()
+    assert out == CLEAN
+
+
+async def _collect(client, prompt="p"):
+    return [fragment async for fragment in client.stream_generate(prompt, {})]
+
+
+@pytest.mark.parametrize("chunks", [1, 3, 16])
+def test_stream_generate_reassembles_stub_events(chunks):
+    async def main():
+        runner = await start_stub_server(stream_chunks=chunks, response_text=CLEAN)
+        metrics = MetricsRegistry()
+        try:
+            async with GeminiClient("k", stub_url(runner), metrics=metrics) as client:
+                fragments = await _collect(client)
+        finally:
+            await runner.cleanup()
+        return fragments, metrics
+
+    fragments, metrics = run(main())
+    assert "".join(fragments) == f"```latex\n{CLEAN}\n```"
+    assert len(fragments) >= min(chunks, 2)
+    # usageMetadata rides on the last event only
+    assert metrics.counter('gemini_tokens_total', kind='total') == 30
+
+
+async def _raw_sse_server(body: bytes):
+    async def handler(request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        for piece in (body[i:i + 7] for i in range(0, len(body), 7)):
+            await response.write(piece)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post('/v1beta/models/{model}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+def _event(text):
+    return json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+def test_stream_generate_handles_sse_framing_variants():
+    # LF-only line endings, a comment line, one JSON event split over two data: lines,
+    # and a final event without the terminating blank line
+    first = _event("Hello, ")
+    split = first.index(' ')  # data lines are joined with newlines, so split between JSON tokens
+    body = (f": keep-alive\n\ndata: {first[:split]}\ndata: {first[split:]}\n\n"
+            f"data: {_event('world')}\n\n"
+            f"data: {_event('!')}").encode('utf-8')
+
+    async def main():
+        runner = await _raw_sse_server(body)
+        try:
+            async with GeminiClient("k", stub_url(runner), metrics=MetricsRegistry()) as client:
+                return await _collect(client)
+        finally:
+            await runner.cleanup()
+
+    assert run(main()) == ["Hello, ", "world", "!"]
+
+
+def _optimizer(runner):
+    return ResumeOptimizer("k", base_url=stub_base_url(runner), metrics=MetricsRegistry())
+
+
+@pytest.mark.parametrize("chunks", [1, 7, 64])
+def test_stream_tailored_resume_matches_non_streaming_clean(chunks):
+    async def main():
+        # The stub wraps streamed text in a ```latex fence itself
+        runner = await start_stub_server(stream_chunks=chunks, response_text=TEMPLATE)
+        try:
+            async with _optimizer(runner) as optimizer:
+                streamed = "".join([text async for text in optimizer.stream_tailored_resume("Backend role")])
+        finally:
+            await runner.cleanup()
+        return streamed
+
+    streamed = run(main())
+    assert streamed == ResumeOptimizer._strip_code_fences(f"```latex\n{TEMPLATE}\n```") == TEMPLATE.strip()
+    assert "```" not in streamed
+
+
+def test_stream_tailored_resume_stops_at_max_chars():
+    async def main():
+        runner = await start_stub_server(stream_chunks=50, response_text=TEMPLATE, latency=0.2)
+        try:
+            async with _optimizer(runner) as optimizer:
+                return "".join([text async for text in optimizer.stream_tailored_resume("role", max_chars=2000)])
+        finally:
+            await runner.cleanup()
+
+    streamed = run(main())
+    assert 0 < len(streamed) <= 2000
+    assert len(streamed) < len(TEMPLATE) // 2
+
+
+@pytest.mark.parametrize("mode, error", [('event', GeminiAPIError), ('disconnect', aiohttp.ClientError)])
+def test_stream_errors_mid_stream_are_raised(mode, error):
+    async def main():
+        runner = await start_stub_server(stream_chunks=10, response_text=TEMPLATE,
+                                         stream_error_after=3, stream_error_mode=mode)
+        received = []
+        try:
+            async with _optimizer(runner) as optimizer:
+                with pytest.raises(error):
+                    async for text in optimizer.stream_tailored_resume("role"):
+                        received.append(text)
+        finally:
+            await runner.cleanup()
+        return received
+
+    received = run(main())
+    # Part of the document was already delivered before the failure
+    assert "".join(received)
+
+
+def test_stream_error_status_before_first_event():
+    async def main():
+        runner = await start_stub_server(error_rate=1.0, error_statuses=(400,))
+        try:
+            async with GeminiClient("k", stub_url(runner), metrics=MetricsRegistry()) as client:
+                with pytest.raises(GeminiAPIError) as info:
+                    await _collect(client)
+        finally:
+            await runner.cleanup()
+        return info.value.status
+
+    assert run(main()) == 400
+
+
+def test_stream_rate_limit_wait_is_timed():
+    async def main():
+        runner = await start_stub_server(stream_chunks=2, response_text=CLEAN)
+        metrics = MetricsRegistry()
+        try:
+            async with GeminiClient("k", stub_url(runner), metrics=metrics, rate_limiter=RateLimiter(60)) as client:
+                await asyncio.gather(_collect(client), _collect(client))
+        finally:
+            await runner.cleanup()
+        return metrics
+
+    metrics = run(main())
+    assert metrics.histogram('gemini_rate_limit_wait_seconds').count == 2
+    # Each stream counts its own usage; concurrent calls do not overwrite each other
+    assert metrics.counter('gemini_tokens_total', kind='total') == 60
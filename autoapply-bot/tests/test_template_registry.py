@@ -0,0 +1,59 @@
+"""
+Template registry tests - lazy loading, reloads and profiles whose file breaks
+"""
+
+import asyncio
+
+import pytest
+
+from resume_optimizer import ResumeOptimizer
+from template_registry import TemplateLoadError, TemplateRegistry
+
+
+@pytest.fixture
+def profiles(tmp_path):
+    (tmp_path / "backend.tex").write_text("\\documentclass{article}\n% backend\n", encoding='utf-8')
+    (tmp_path / "data.tex").write_text("\\documentclass{article}\n% data\n", encoding='utf-8')
+    return tmp_path
+
+
+def test_profiles_load_lazily_and_reload_after_edit(profiles):
+    registry = TemplateRegistry(str(profiles))
+    assert registry.names() == ['backend', 'data'] and registry.loads == 0
+    assert "% backend" in registry.get('backend').template
+    registry.get('backend')
+    assert registry.loads == 1
+
+    (profiles / "backend.tex").write_text("\\documentclass{article}\n% backend, edited\n", encoding='utf-8')
+    assert "edited" in registry.get('backend').template
+    assert registry.loads == 2
+
+
+def test_deleted_or_undecodable_template_raises_template_load_error(profiles):
+    registry = TemplateRegistry(str(profiles))
+    registry.get('backend')
+    (profiles / "backend.tex").unlink()
+    (profiles / "data.tex").write_bytes(b"\\documentclass{article}\n\xff\xfe\n")
+
+    for name in ('backend', 'data'):
+        with pytest.raises(TemplateLoadError):
+            registry.get(name)
+    assert registry.active == []
+    with pytest.raises(KeyError):
+        registry.get('missing')
+
+
+def test_tailor_batch_reports_broken_profiles_instead_of_hanging(profiles):
+    (profiles / "data.tex").write_bytes(b"\xff")
+    jobs = [{'id': 'gone', 'job_description': "Backend role", 'profile': 'backend'},
+            {'id': 'binary', 'job_description': "Data role", 'profile': 'data'},
+            {'id': 'unknown', 'job_description': "Any role", 'profile': 'nope'}]
+
+    async def main():
+        async with ResumeOptimizer("k", templates=str(profiles)) as optimizer:
+            (profiles / "backend.tex").unlink()
+            return [result async for result in optimizer.tailor_batch(jobs, workers=2)]
+
+    results = asyncio.run(asyncio.wait_for(main(), 10))
+    assert sorted(result['id'] for result in results) == ['binary', 'gone', 'unknown']
+    assert all(result['status'] == 'error' and result['error'] for result in results)
@@ -1,61 +1,180 @@
 from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+import argparse
+import hashlib
+import json
 import os
+import numpy as np
 
-def create_icon(size):
-    # Create a new image with transparent background
-    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+# Gradient from purple to blue (667eea to 764ba2)
+GRADIENT_START = (102, 126, 234)
+GRADIENT_END = (118, 75, 162)
+TEXT = "RT"
+ACCENT_MIN_SIZE = 48
+# Bump when the drawing code changes, so existing icons are regenerated
+RENDER_VERSION = 3
+
+FONT_CANDIDATES = [
+    "/System/Library/Fonts/Arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+
+PRESETS = {
+    'extension': [16, 48, 128],
+    'store': [128, 256, 512],
+    'hidpi': [32, 96, 256],
+}
+
+MANIFEST = '.icons.json'
+
+
+@lru_cache(maxsize=None)
+def find_font():
+    # Probe the candidate paths once per process
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_font(font_size):
+    path = find_font()
+    if path:
+        try:
+            return ImageFont.truetype(path, font_size)
+        except OSError:
+            pass
+    try:
+        # Pillow >= 10.1 ships a scalable default font
+        return ImageFont.load_default(size=font_size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def gradient(size):
+    # One row of colors, interpolated along x and repeated down every row
+    steps = np.arange(size, dtype=np.float64) / size
+    start = np.array(GRADIENT_START, dtype=np.float64)
+    end = np.array(GRADIENT_END, dtype=np.float64)
+    row = np.empty((size, 4), dtype=np.uint8)
+    row[:, :3] = start + (end - start) * steps[:, None]
+    row[:, 3] = 255
+    return Image.fromarray(np.repeat(row[None, :, :], size, axis=0), 'RGBA')
+
+
+def create_icon(size, accent=None):
+    image = gradient(size)
     draw = ImageDraw.Draw(image)
-    
-    # Create gradient effect with solid colors
-    # Background with gradient-like effect
-    for i in range(size):
-        for j in range(size):
-            # Create gradient from purple to blue
-            r = int(102 + (118 - 102) * i / size)  # 667eea to 764ba2
-            g = int(126 + (75 - 126) * i / size)
-            b = int(234 + (162 - 234) * i / size)
-            draw.point((i, j), (r, g, b, 255))
-    
+
     # Add text
-    try:
-        # Try to use a system font
-        font_size = max(8, size // 4)
-        font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-    except:
-        # Fallback to default font
-        font_size = max(8, size // 4)
-        font = ImageFont.load_default()
-    
-    # Calculate text position
-    text = "RT"
-    bbox = draw.textbbox((0, 0), text, font=font)
+    font = load_font(max(8, size // 4))
+    bbox = draw.textbbox((0, 0), TEXT, font=font)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     x = (size - text_width) // 2
     y = (size - text_height) // 2
-    
-    # Draw text
-    draw.text((x, y), text, fill=(255, 255, 255, 255), font=font)
-    
+    draw.text((x, y), TEXT, fill=(255, 255, 255, 255), font=font)
+
     # Add accent dot for larger icons
-    if size >= 48:
+    if accent is None:
+        accent = size >= ACCENT_MIN_SIZE
+    if accent:
         accent_x = int(size * 0.75)
         accent_y = int(size * 0.25)
         accent_radius = max(2, int(size * 0.08))
-        draw.ellipse([accent_x - accent_radius, accent_y - accent_radius, 
-                     accent_x + accent_radius, accent_y + accent_radius], 
-                    fill=(255, 255, 255, 200))
-    
+        draw.ellipse([accent_x - accent_radius, accent_y - accent_radius,
+                      accent_x + accent_radius, accent_y + accent_radius],
+                     fill=(255, 255, 255, 200))
+
     return image
 
-# Create icons directory if it doesn't exist
-os.makedirs('icons', exist_ok=True)
 
-# Generate icons
-sizes = [16, 48, 128]
-for size in sizes:
-    icon = create_icon(size)
-    icon.save(f'icons/icon{size}.png', 'PNG')
-    print(f'Generated icon{size}.png')
+def render_icons(sizes):
+    # Every size is drawn natively: the text keeps its max(8, size // 4) floor and
+    # an icon does not depend on which other sizes were requested. The gradient is
+    # vectorized and fonts are cached, so this stays cheap
+    return {size: create_icon(size) for size in sorted(set(sizes))}
+
+
+def parameters_hash(sizes):
+    params = {
+        'version': RENDER_VERSION,
+        'sizes': sorted(set(sizes)),
+        'gradient': [GRADIENT_START, GRADIENT_END],
+        'text': TEXT,
+        'accent_min_size': ACCENT_MIN_SIZE,
+        'font': find_font(),
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def up_to_date(out_dir, sizes, params_hash):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifest.get('params') != params_hash:
+        return False
+    files = manifest.get('files', {})
+    for size in sizes:
+        path = os.path.join(out_dir, f'icon{size}.png')
+        if not os.path.exists(path) or files.get(f'icon{size}.png') != file_hash(path):
+            return False
+    return True
+
+
+def generate(sizes, out_dir='icons', force=False):
+    # Create icons directory if it doesn't exist
+    os.makedirs(out_dir, exist_ok=True)
+    params_hash = parameters_hash(sizes)
+    if not force and up_to_date(out_dir, sizes, params_hash):
+        print('Icons are up to date')
+        return False
+
+    files = {}
+    for size, icon in sorted(render_icons(sizes).items()):
+        name = f'icon{size}.png'
+        path = os.path.join(out_dir, name)
+        icon.save(path, 'PNG')
+        files[name] = file_hash(path)
+        print(f'Generated {name}')
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump({'params': params_hash, 'files': files}, f, indent=2)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the extension icons')
+    parser.add_argument('--sizes', type=int, nargs='+', help='Icon sizes in pixels, e.g. --sizes 16 32 48 128')
+    parser.add_argument('--preset', choices=sorted(PRESETS), action='append',
+                        help='Named size set (can be repeated)')
+    parser.add_argument('--out', default='icons', help='Output directory')
+    parser.add_argument('--force', action='store_true', help='Regenerate even if the icons are up to date')
+    args = parser.parse_args()
+
+    sizes = set(args.sizes or [])
+    for preset in args.preset or []:
+        sizes.update(PRESETS[preset])
+    if not sizes:
+        sizes.update(PRESETS['extension'])
+    if min(sizes) < 1:
+        parser.error('sizes must be positive')
+
+    if generate(sorted(sizes), args.out, args.force):
+        print('All icons generated successfully!')
+
 
-print('All icons generated successfully!')
+if __name__ == '__main__':
+    main()